@@ -0,0 +1,2 @@
+-- AlterTable
+ALTER TABLE "social_mentions" ADD COLUMN "duplicateCount" INTEGER NOT NULL DEFAULT 0;
@@ -1,18 +1,55 @@
 from __future__ import annotations
 
+import asyncio
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
 from pydantic import BaseModel, Field
 
-from signals.aggregation import aggregate_signals
-from signals.storage import append_signal, load_signals
+from scrapers.dossiers import DossierCache, DossierStore
+from signals.admission import IngestAdmission
+from signals.aggregation import aggregate_signals, count_groups
+from signals.chartcache import CONTENT_TYPES, RENDER_TIMEOUT, ChartCache, parse_chart_file
+from signals.charts import ChartUnavailableError
+from signals.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    REGISTRY,
+    endpoint_label,
+)
+from signals.profiling import profiled
+from signals.sketches import parse_fields
+from signals.storage import (
+    append_signal,
+    data_generation,
+    event_counts,
+    load_stats_inputs,
+    recover_storage,
+)
 from signals.types import SIGNAL_TYPES
-from signals.validation import validate_and_normalize
+from signals.validation import MAX_EVENT_ID_LENGTH, validate_and_normalize
+from signals.windows import WindowSpec, parse_window
 
 DATA_PATH = Path(__file__).parent / "data" / "signals.json"
+INGEST_ADMISSION = IngestAdmission.from_env()
+CHART_CACHE = ChartCache()
+DOSSIER_CACHE = DossierCache(DossierStore())
+WINDOW_PATTERN = r"^(day|week|month|hour|\d+min)$"
+
+
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Replay the write-ahead log before serving, so a crashed writer never breaks /stats."""
+    recover_storage(DATA_PATH)
+    yield
+
 
 app = FastAPI(
     title="Integrity Signals API",
@@ -22,6 +59,7 @@ app = FastAPI(
     docs_url="/docs",
     redoc_url="/redoc",
     openapi_url="/openapi.json",
+    lifespan=_lifespan,
 )
 
 # In production, restrict this to your real frontend origin(s).
@@ -34,6 +72,27 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-endpoint latency histogram and in-flight gauge for GET /metrics."""
+    endpoint = endpoint_label(request.url.path.rstrip("/") or "/")
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            endpoint=endpoint,
+            method=request.method,
+            status=str(status),
+        )
+
+
 # --- Pydantic models for request/response schemas ---
 
 
@@ -93,6 +152,9 @@ class AggregatedStatOut(BaseModel):
     baseline: float
     trend: str
     status: str
+    distinct: Optional[Dict[str, int]] = Field(
+        None, description="Approximate distinct values per requested field (HyperLogLog)"
+    )
 
 
 # --- Endpoints ---
@@ -109,6 +171,19 @@ def health() -> Dict[str, str]:
     return {"status": "ok"}
 
 
+@app.get(
+    "/metrics",
+    response_class=Response,
+    summary="Service metrics",
+    tags=["Health"],
+    description="Request latency, storage and aggregation timings, cache hit rates and "
+    "in-flight requests in the Prometheus text exposition format.",
+)
+def metrics() -> Response:
+    """Expose process-local metrics for scraping."""
+    return Response(content=REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 @app.get(
     "/signal-types",
     response_model=List[SignalTypeOut],
@@ -131,10 +206,32 @@ def list_signal_types() -> List[Dict[str, str]]:
     responses={
         201: {"description": "Signal submitted successfully"},
         400: {"description": "Validation error (invalid type, timestamp, etc.)"},
+        429: {"description": "Per-client or global submission rate exceeded; see Retry-After"},
+        503: {"description": "Ingest queue is full; see Retry-After"},
     },
 )
-def submit_signal(payload: SignalIn) -> Dict[str, Any]:
-    """Accept JSON, validate, normalize, then store."""
+async def submit_signal(payload: SignalIn, request: Request) -> Dict[str, Any]:
+    """Accept JSON, validate, normalize, then store.
+
+    Waiting for the write slot happens on the event loop; only the write itself
+    takes a threadpool thread, so queued ingests never starve /stats or /health.
+    """
+    client = request.client.host if request.client else "unknown"
+    admission = await INGEST_ADMISSION.admit_async(client)
+    if not admission.allowed:
+        raise HTTPException(
+            status_code=admission.status,
+            detail=f"Ingest is saturated, retry later ({admission.reason})",
+            headers={"Retry-After": str(admission.retry_after)},
+        )
+    try:
+        return await run_in_threadpool(_store_signal, payload)
+    finally:
+        INGEST_ADMISSION.release()
+
+
+@profiled("http POST /signals")
+def _store_signal(payload: SignalIn) -> Dict[str, Any]:
     try:
         normalized = validate_and_normalize(
             {
@@ -155,24 +252,190 @@ def submit_signal(payload: SignalIn) -> Dict[str, Any]:
 @app.get(
     "/stats",
     response_model=List[AggregatedStatOut],
+    response_model_exclude_none=True,
     summary="Get aggregated stats",
     tags=["Stats"],
     description="Returns group-only aggregated counts and trends by window and signal type. "
     "Never exposes individual records.",
     responses={
         200: {"description": "List of aggregated stats"},
-        400: {"description": "Invalid window parameter"},
+        400: {"description": "Invalid window, tz or distinct parameter"},
+        404: {"description": "eventId is not indexed"},
     },
 )
+@profiled("http GET /stats")
 def get_stats(
     window: str = Query(
         "day",
-        pattern="^(day|week)$",
-        description="Aggregation window: 'day' or 'week'",
+        pattern=WINDOW_PATTERN,
+        description="Aggregation window: 'day', 'week', 'month', 'hour' or '<N>min'",
+    ),
+    tz: Optional[str] = Query(
+        None,
+        description="IANA time zone for window boundaries, e.g. Africa/Nairobi (default UTC)",
+    ),
+    event_id: Optional[str] = Query(
+        None,
+        alias="eventId",
+        max_length=MAX_EVENT_ID_LENGTH,
+        description="Only count signals whose context.eventId matches (served from the event index)",
+    ),
+    distinct: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to estimate distinct values for: eventId, source",
     ),
 ) -> List[Dict[str, Any]]:
     """Group-only reporting: returns aggregated counts/trends, not individual records."""
-    signals = load_signals(DATA_PATH)
-    stats = aggregate_signals(signals, window=window)
+    spec = _window_spec(window, tz)
+    event_id = (event_id or "").strip()
+    try:
+        fields = parse_fields(distinct)
+        if event_id:
+            if fields:
+                raise HTTPException(
+                    status_code=400, detail="distinct is not available with eventId"
+                )
+            counts = event_counts(DATA_PATH, event_id)
+            if counts is None:
+                raise HTTPException(status_code=404, detail="eventId is not indexed")
+            stats = aggregate_signals([], window=spec, rollups=counts)
+        else:
+            stats = _load_stats(spec, fields)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
     return [stat.to_dict() for stat in stats]
 
+
+def _window_spec(window: str, tz: Optional[str]) -> WindowSpec:
+    try:
+        return parse_window(window, tz)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+def _load_stats(window: WindowSpec, distinct: Tuple[str, ...] = ()) -> List[Any]:
+    inputs = load_stats_inputs(DATA_PATH, sketches=bool(distinct))
+    return aggregate_signals(
+        inputs.records,
+        window=window,
+        rollups=inputs.history,
+        distinct=distinct,
+        sketches=inputs.sketches,
+    )
+
+
+@app.get(
+    "/stats/partial",
+    summary="Get this node's partial aggregate",
+    tags=["Stats"],
+    description="Returns this instance's mergeable group counts per window and type, without "
+    "baselines or status, for a coordinator to merge with other nodes (app.py merge-stats).",
+    responses={
+        200: {"description": "Partial aggregate: {version, window, tz, counts: {window: {type: n}}}"},
+        400: {"description": "Invalid window, tz or distinct parameter"},
+    },
+)
+@profiled("http GET /stats/partial")
+def get_partial_stats(
+    window: str = Query(
+        "day",
+        pattern=WINDOW_PATTERN,
+        description="Aggregation window: 'day', 'week', 'month', 'hour' or '<N>min'",
+    ),
+    tz: Optional[str] = Query(
+        None,
+        description="IANA time zone for window boundaries, e.g. Africa/Nairobi (default UTC)",
+    ),
+    distinct: Optional[str] = Query(
+        None,
+        description="Comma-separated fields to estimate distinct values for: eventId, source",
+    ),
+) -> Dict[str, Any]:
+    spec = _window_spec(window, tz)
+    try:
+        fields = parse_fields(distinct)
+        inputs = load_stats_inputs(DATA_PATH, sketches=bool(fields))
+        return count_groups(
+            inputs.records,
+            window=spec,
+            rollups=inputs.history,
+            distinct=fields,
+            sketches=inputs.sketches,
+        ).to_dict()
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+@app.get(
+    "/charts/{chart_file}",
+    response_class=Response,
+    summary="Render a chart",
+    tags=["Stats"],
+    description="Renders counts_by_window, stacked_by_type or totals_by_type as .png or .svg "
+    "from the group-only aggregates. Images are cached per window and data generation; "
+    "SVG works without matplotlib.",
+    responses={
+        200: {"content": {"image/png": {}, "image/svg+xml": {}}},
+        400: {"description": "Invalid window or tz parameter"},
+        404: {"description": "Unknown chart name or format"},
+        501: {"description": "PNG requested but matplotlib is not installed"},
+    },
+)
+async def get_chart(
+    chart_file: str,
+    window: str = Query(
+        "day",
+        pattern=WINDOW_PATTERN,
+        description="Aggregation window: 'day', 'week', 'month', 'hour' or '<N>min'",
+    ),
+    tz: Optional[str] = Query(
+        None,
+        description="IANA time zone for window boundaries, e.g. Africa/Nairobi (default UTC)",
+    ),
+) -> Response:
+    """Serve a cached chart image; rendering happens on a background thread."""
+    try:
+        name, fmt = parse_chart_file(chart_file)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+
+    spec = _window_spec(window, tz)
+    future = CHART_CACHE.get(
+        name,
+        fmt,
+        spec.key,
+        data_generation(DATA_PATH),
+        lambda: _load_stats(spec),
+    )
+    try:
+        # The future is shared with other requests; a timeout or disconnect here must not cancel it.
+        body = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), RENDER_TIMEOUT)
+    except ChartUnavailableError as exc:
+        raise HTTPException(status_code=501, detail=str(exc))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=503,
+            detail="Chart rendering timed out",
+            headers={"Retry-After": "5"},
+        )
+    return Response(content=body, media_type=CONTENT_TYPES[fmt])
+
+
+@app.get(
+    "/dossiers/{politician_id}",
+    response_model=Dict[str, Any],
+    summary="Politician dossier",
+    tags=["Dossiers"],
+    description="Case counts by status, verified and rumour mention counts and the latest "
+    "cases and mentions for one politician, as built by the scraper after each run. "
+    "Served from an in-memory LRU; entries are evicted as the scraper rewrites them.",
+    responses={404: {"description": "No dossier has been built for this politician"}},
+)
+def get_dossier(politician_id: str) -> Dict[str, Any]:
+    """Return the precomputed dossier of one politician."""
+    dossier = DOSSIER_CACHE.get(politician_id)
+    if dossier is None:
+        raise HTTPException(status_code=404, detail=f"No dossier for politician {politician_id}")
+    return dossier
@@ -6,16 +6,27 @@ from __future__ import annotations
 
 import argparse
 import json
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from signals.aggregation import aggregate_signals
+from signals.aggregation import aggregate_signals, count_groups, finalize_partial, merge_partials
 from signals.charts import render_basic_charts
+from signals.detectors import available_detectors, parse_detector_spec
 from signals.form import prompt_for_signal
-from signals.storage import append_signal, load_signals
+from signals.importer import DEFAULT_CHUNK_SIZE, FORMATS, import_signals
+from signals.models import PartialAggregate
+from signals.profiling import PROFILER
+from signals.rollups import DEFAULT_RETENTION_DAYS, compact_signals
+from signals.segments import DEFAULT_SEAL_AGE_DAYS, PARTITIONS, seal_signals
+from signals.sketches import parse_fields
+from signals.storage import append_signal, load_stats_inputs
 from signals.utils import format_iso8601
 from signals.validation import validate_and_normalize
+from signals.windows import WindowSpec, parse_window
 
 DATA_PATH = Path(__file__).parent / "data" / "signals.json"
 OUTPUT_DIR = Path(__file__).parent / "output"
@@ -56,25 +67,157 @@ def _handle_submit(args: argparse.Namespace) -> int:
     return 0
 
 
+def _add_window_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--window",
+        default="day",
+        help="Aggregation window: day, week, month, hour or <N>min (e.g. 15min)",
+    )
+    parser.add_argument(
+        "--tz",
+        help="IANA time zone for window boundaries, e.g. Africa/Nairobi (default UTC)",
+    )
+
+
+def _add_distinct_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--distinct",
+        help="Estimate distinct values per window and type for these fields, e.g. 'eventId,source'",
+    )
+
+
 def _handle_aggregate(args: argparse.Namespace) -> int:
-    signals = load_signals(DATA_PATH)
-    stats = aggregate_signals(signals, window=args.window)
-    payload = [stat.to_dict() for stat in stats]
+    try:
+        window = parse_window(args.window, args.tz)
+        distinct = parse_fields(args.distinct)
+        detectors = parse_detector_spec(args.detectors) if args.detectors else None
+    except ValueError as exc:
+        print(exc)
+        return 1
+    if args.partial:
+        try:
+            partial = _local_partial(window, distinct)
+        except ValueError as exc:
+            print(exc)
+            return 1
+        _emit_json(partial.to_dict(), args.output)
+        return 0
+    try:
+        inputs = load_stats_inputs(DATA_PATH, sketches=bool(distinct))
+        stats = aggregate_signals(
+            inputs.records,
+            window=window,
+            detectors=detectors,
+            rollups=inputs.history,
+            distinct=distinct,
+            sketches=inputs.sketches,
+        )
+    except ValueError as exc:
+        print(exc)
+        return 1
+    _emit_json([stat.to_dict() for stat in stats], args.output)
+    return 0
+
 
-    if args.output:
-        output_path = Path(args.output)
+def _local_partial(window: WindowSpec, distinct: Tuple[str, ...] = ()) -> PartialAggregate:
+    inputs = load_stats_inputs(DATA_PATH, sketches=bool(distinct))
+    return count_groups(
+        inputs.records,
+        window=window,
+        rollups=inputs.history,
+        distinct=distinct,
+        sketches=inputs.sketches,
+    )
+
+
+def _emit_json(payload: Any, output: Optional[str]) -> None:
+    if output:
+        output_path = Path(output)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         with output_path.open("w", encoding="utf-8") as handle:
             json.dump(payload, handle, indent=2)
         print(f"Aggregates saved to {output_path}")
 
     print(json.dumps(payload, indent=2))
+
+
+def _read_partial(
+    source: str,
+    window: WindowSpec,
+    distinct: Tuple[str, ...],
+    timeout: float,
+) -> PartialAggregate:
+    """Load a partial aggregate from a JSON file or a peer's /stats/partial endpoint."""
+    if source.startswith(("http://", "https://")):
+        base = source.rstrip("/")
+        if not base.endswith("/stats/partial"):
+            base += "/stats/partial"
+        params = {"window": window.name, "tz": window.tz}
+        if distinct:
+            params["distinct"] = ",".join(distinct)
+        query = urllib.parse.urlencode(params)
+        with urllib.request.urlopen(f"{base}?{query}", timeout=timeout) as response:
+            payload = json.load(response)
+    else:
+        with Path(source).open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    partial = PartialAggregate.from_dict(payload)
+    if partial.window != window:
+        raise ValueError(
+            f"partial is for window '{partial.window.key}', expected '{window.key}'"
+        )
+    if partial.distinct_fields != distinct:
+        raise ValueError(
+            f"partial has distinct fields {list(partial.distinct_fields)}, expected {list(distinct)}"
+        )
+    return partial
+
+
+def _handle_merge_stats(args: argparse.Namespace) -> int:
+    try:
+        window = parse_window(args.window, args.tz)
+        distinct = parse_fields(args.distinct)
+        detectors = parse_detector_spec(args.detectors) if args.detectors else None
+    except ValueError as exc:
+        print(exc)
+        return 1
+
+    partials: List[PartialAggregate] = []
+    if args.local:
+        try:
+            partials.append(_local_partial(window, distinct))
+        except ValueError as exc:
+            print(exc)
+            return 1
+    with ThreadPoolExecutor(max_workers=max(1, min(len(args.sources), 16))) as pool:
+        futures = {
+            source: pool.submit(_read_partial, source, window, distinct, args.timeout)
+            for source in args.sources
+        }
+        for source, future in futures.items():
+            try:
+                partials.append(future.result())
+            except (OSError, ValueError) as exc:
+                print(f"Could not read partial from {source}: {exc}")
+                return 1
+
+    try:
+        stats = finalize_partial(merge_partials(partials), detectors=detectors)
+    except ValueError as exc:
+        print(exc)
+        return 1
+    _emit_json([stat.to_dict() for stat in stats], args.output)
     return 0
 
 
 def _handle_charts(args: argparse.Namespace) -> int:
-    signals = load_signals(DATA_PATH)
-    stats = aggregate_signals(signals, window=args.window)
+    try:
+        window = parse_window(args.window, args.tz)
+        inputs = load_stats_inputs(DATA_PATH)
+        stats = aggregate_signals(inputs.records, window=window, rollups=inputs.history)
+    except ValueError as exc:
+        print(exc)
+        return 1
     outputs = render_basic_charts(stats, OUTPUT_DIR)
     if outputs:
         print("Charts written:")
@@ -85,8 +228,71 @@ def _handle_charts(args: argparse.Namespace) -> int:
     return 0
 
 
+def _handle_import(args: argparse.Namespace) -> int:
+    source = Path(args.path)
+    if not source.exists():
+        print(f"Import file not found: {source}")
+        return 1
+
+    try:
+        summary = import_signals(
+            source,
+            DATA_PATH,
+            fmt=args.format,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            rejects_path=Path(args.rejects) if args.rejects else None,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"Import failed: {exc}")
+        return 1
+
+    print(f"Rows read: {summary.rows}")
+    print(f"Accepted: {summary.accepted} (stored in {DATA_PATH})")
+    print(f"Rejected: {summary.rejected}")
+    if summary.rejects_path:
+        print(f"Rejects written to {summary.rejects_path}")
+    return 0
+
+
+def _handle_compact(args: argparse.Namespace) -> int:
+    try:
+        summary = compact_signals(DATA_PATH, older_than_days=args.older_than)
+    except ValueError as exc:
+        print(f"Compaction failed: {exc}")
+        return 1
+    if summary.segment is None:
+        print(f"Nothing older than {args.older_than} days to compact.")
+    else:
+        print(f"Rolled up {summary.rolled} signals into {summary.segment}")
+    print(f"Raw signals kept: {summary.kept}")
+    return 0
+
+
+def _handle_seal(args: argparse.Namespace) -> int:
+    try:
+        summary = seal_signals(
+            DATA_PATH,
+            older_than_days=args.older_than,
+            partition=args.partition,
+        )
+    except ValueError as exc:
+        print(f"Sealing failed: {exc}")
+        return 1
+    for path in summary.segments:
+        print(f"- {path}")
+    print(f"Sealed {summary.sealed} signals into {len(summary.segments)} segment(s)")
+    print(f"Raw signals kept: {summary.kept}")
+    return 0
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Integrity signal utilities")
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile this run and write cProfile, folded stacks and allocations to output/profiles",
+    )
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     submit_parser = subparsers.add_parser("submit", help="Submit a signal")
@@ -102,26 +308,117 @@ def build_parser() -> argparse.ArgumentParser:
     submit_parser.set_defaults(func=_handle_submit)
 
     aggregate_parser = subparsers.add_parser("aggregate", help="Aggregate signals")
-    aggregate_parser.add_argument(
-        "--window",
-        choices=["day", "week"],
-        default="day",
-        help="Aggregation window",
-    )
+    _add_window_arguments(aggregate_parser)
+    _add_distinct_argument(aggregate_parser)
     aggregate_parser.add_argument(
         "--output",
         help="Optional path to save aggregates as JSON",
     )
+    aggregate_parser.add_argument(
+        "--detectors",
+        help="Detector per signal type, e.g. 'sudden_score_spikes=zscore,*=threshold' "
+        f"({', '.join(available_detectors())}; defaults to SIGNALS_DETECTORS)",
+    )
+    aggregate_parser.add_argument(
+        "--partial",
+        action="store_true",
+        help="Output this node's mergeable group counts instead of final stats",
+    )
     aggregate_parser.set_defaults(func=_handle_aggregate)
 
+    merge_parser = subparsers.add_parser(
+        "merge-stats",
+        help="Merge partial aggregates from files or peer URLs into global stats",
+    )
+    merge_parser.add_argument(
+        "sources",
+        nargs="+",
+        help="Partial JSON files (from 'aggregate --partial') or peer base URLs",
+    )
+    _add_window_arguments(merge_parser)
+    _add_distinct_argument(merge_parser)
+    merge_parser.add_argument(
+        "--local",
+        action="store_true",
+        help="Also include this node's own signals",
+    )
+    merge_parser.add_argument(
+        "--timeout",
+        type=float,
+        default=10.0,
+        help="Seconds to wait for each peer",
+    )
+    merge_parser.add_argument(
+        "--detectors",
+        help="Detector per signal type, as for 'aggregate'",
+    )
+    merge_parser.add_argument(
+        "--output",
+        help="Optional path to save merged stats as JSON",
+    )
+    merge_parser.set_defaults(func=_handle_merge_stats)
+
     chart_parser = subparsers.add_parser("charts", help="Render basic charts")
-    chart_parser.add_argument(
-        "--window",
-        choices=["day", "week"],
+    _add_window_arguments(chart_parser)
+    chart_parser.set_defaults(func=_handle_charts)
+
+    import_parser = subparsers.add_parser(
+        "import",
+        help="Bulk import signals from a JSON, JSONL or CSV file",
+    )
+    import_parser.add_argument("path", help="File to import")
+    import_parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        help="Input format (default: inferred from the file extension)",
+    )
+    import_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Validation processes (default: CPU count; 1 disables the pool)",
+    )
+    import_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Rows validated per worker task",
+    )
+    import_parser.add_argument(
+        "--rejects",
+        help="Where to write rejected rows (default: <file>.rejects.jsonl)",
+    )
+    import_parser.set_defaults(func=_handle_import)
+
+    compact_parser = subparsers.add_parser(
+        "compact",
+        help="Roll old raw signals into per-day count segments",
+    )
+    compact_parser.add_argument(
+        "--older-than",
+        type=int,
+        default=DEFAULT_RETENTION_DAYS,
+        help=f"Retention for raw signals in days (default {DEFAULT_RETENTION_DAYS})",
+    )
+    compact_parser.set_defaults(func=_handle_compact)
+
+    seal_parser = subparsers.add_parser(
+        "seal",
+        help="Move raw signals from closed days or weeks into columnar segment files",
+    )
+    seal_parser.add_argument(
+        "--older-than",
+        type=int,
+        default=DEFAULT_SEAL_AGE_DAYS,
+        help="Seal partitions that ended at least this many days ago "
+        f"(default {DEFAULT_SEAL_AGE_DAYS})",
+    )
+    seal_parser.add_argument(
+        "--partition",
+        choices=PARTITIONS,
         default="day",
-        help="Aggregation window",
+        help="One segment file per day or per week",
     )
-    chart_parser.set_defaults(func=_handle_charts)
+    seal_parser.set_defaults(func=_handle_seal)
 
     return parser
 
@@ -129,6 +426,15 @@ def build_parser() -> argparse.ArgumentParser:
 def main() -> int:
     parser = build_parser()
     args = parser.parse_args()
+    if args.profile:
+        PROFILER.configure(
+            enabled=True,
+            sample_rate=1.0,
+            slow_ms=0.0,
+            output_dir=OUTPUT_DIR / "profiles",
+        )
+        with PROFILER.capture(f"cli {args.command}"):
+            return args.func(args)
     return args.func(args)
 
 
@@ -0,0 +1,4 @@
+"""Benchmarks and load tests for the integrity signals service.
+
+Run ``python -m bench --help`` from ``python-service/``.
+"""
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from signals.types import SIGNAL_TYPES
+from signals.utils import format_iso8601
+from signals.validation import MAX_DAYS_PAST
+
+from .http_load import DEFAULT_WRITE_RATIO, SERVERS, run_http
+from .micro import BENCHMARKS, run_micro
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_OUTPUT = BENCH_DIR / "results.json"
+DEFAULT_BASELINE = BENCH_DIR / "baseline.json"
+
+
+def _metric(result: Dict[str, Any]) -> Tuple[str, float]:
+    # Lower is better for both metrics.
+    if result["name"].startswith("http:"):
+        return "p95Millis", float(result["p95Millis"])
+    return "seconds", float(result["seconds"])
+
+
+def compare_to_baseline(
+    results: List[Dict[str, Any]],
+    baseline: Dict[str, Any],
+    tolerance: float,
+) -> List[Dict[str, Any]]:
+    previous = {(item["name"], item["size"]): item for item in baseline.get("results", [])}
+    regressions: List[Dict[str, Any]] = []
+    for result in results:
+        before = previous.get((result["name"], result["size"]))
+        if before is None:
+            continue
+        metric, current = _metric(result)
+        _, reference = _metric(before)
+        if reference <= 0:
+            continue
+        ratio = current / reference
+        result["baselineRatio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(
+                {"name": result["name"], "size": result["size"], "metric": metric, "ratio": ratio}
+            )
+    return regressions
+
+
+def parse_type_mix(value: str) -> Dict[str, float]:
+    """``"type_a=3,type_b=1"`` (weight defaults to 1) as a generator type mix."""
+    known = {signal_type.key for signal_type in SIGNAL_TYPES}
+    mix: Dict[str, float] = {}
+    for item in value.split(","):
+        key, _, weight = item.strip().partition("=")
+        if not key:
+            continue
+        if key not in known:
+            raise argparse.ArgumentTypeError(
+                f"unknown signal type {key!r} (expected one of {', '.join(sorted(known))})"
+            )
+        try:
+            mix[key] = float(weight) if weight else 1.0
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight for {key!r} must be a number") from None
+        if mix[key] <= 0:
+            raise argparse.ArgumentTypeError(f"weight for {key!r} must be positive")
+    if not mix:
+        raise argparse.ArgumentTypeError("name at least one signal type")
+    return mix
+
+
+def parse_spread(value: str) -> int:
+    try:
+        days = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError("spread must be a whole number of days") from None
+    # Older signals would be rejected by validation and the HTTP writes would all fail.
+    if not 1 <= days <= MAX_DAYS_PAST:
+        raise argparse.ArgumentTypeError(f"spread must be between 1 and {MAX_DAYS_PAST} days")
+    return days
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the integrity signals service")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000],
+        help="Record counts to benchmark (e.g. 1000 100000 10000000)",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=sorted(BENCHMARKS),
+        help="Run a subset of the microbenchmarks",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of repetitions")
+    parser.add_argument(
+        "--types",
+        type=parse_type_mix,
+        help="Synthetic signal type mix, e.g. 'sudden_score_spikes=3,suspicious_timing_pattern=1' "
+        "(default: every signal type, equally weighted)",
+    )
+    parser.add_argument(
+        "--spread",
+        type=parse_spread,
+        help="Days of history the synthetic timestamps cover (default: 90 for microbenchmarks; "
+        "30 preloaded and 7 submitted for HTTP)",
+    )
+    parser.add_argument("--skip-micro", action="store_true", help="Skip microbenchmarks")
+    parser.add_argument(
+        "--http",
+        nargs="*",
+        choices=sorted(SERVERS),
+        help="Run the HTTP load driver against these servers (default: none)",
+    )
+    parser.add_argument("--http-sizes", type=int, nargs="+", default=[1_000])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--write-ratio",
+        type=float,
+        default=DEFAULT_WRITE_RATIO,
+        help="Fraction of HTTP requests that submit signals",
+    )
+    parser.add_argument("--output", default=str(DEFAULT_OUTPUT), help="Results JSON path")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON path")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed slowdown versus baseline before failing (0.2 = 20%%)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="Store these results as the new baseline",
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    results: List[Dict[str, Any]] = []
+
+    if not args.skip_micro:
+        results.extend(
+            run_micro(
+                args.only or list(BENCHMARKS),
+                args.sizes,
+                args.repeat,
+                type_mix=args.types,
+                days=args.spread,
+            )
+        )
+    if args.http is not None:
+        servers = args.http or sorted(SERVERS)
+        results.extend(
+            run_http(
+                servers,
+                args.http_sizes,
+                requests=args.requests,
+                concurrency=args.concurrency,
+                write_ratio=args.write_ratio,
+                type_mix=args.types,
+                days=args.spread,
+            )
+        )
+
+    report: Dict[str, Any] = {
+        "createdAt": format_iso8601(datetime.now(timezone.utc)),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "typeMix": args.types,
+        "spreadDays": args.spread,
+        "results": results,
+    }
+
+    baseline_path = Path(args.baseline)
+    regressions: List[Dict[str, Any]] = []
+    if baseline_path.exists() and not args.save_baseline:
+        with baseline_path.open("r", encoding="utf-8") as handle:
+            regressions = compare_to_baseline(results, json.load(handle), args.tolerance)
+    report["regressions"] = regressions
+
+    output_path = Path(args.output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with output_path.open("w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+    print(f"Results saved to {output_path}")
+
+    if args.save_baseline:
+        with baseline_path.open("w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Baseline saved to {baseline_path}")
+
+    for regression in regressions:
+        print(
+            f"REGRESSION {regression['name']} n={regression['size']}: "
+            f"{regression['metric']} x{regression['ratio']:.2f}"
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import http.client
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from signals.admission import IngestAdmission
+
+from .synthetic import generate_payloads, generate_signals
+
+# Fraction of requests that are POST /signals; the rest are GET /stats.
+DEFAULT_WRITE_RATIO = 0.2
+
+
+def _unlimited_admission() -> IngestAdmission:
+    # The load driver is a single client; measure the server, not the rate limiter.
+    return IngestAdmission(client_rate=0, global_rate=0, max_pending=1_000_000, max_wait=60.0)
+
+
+@contextmanager
+def _simple_api_server(data_path: Path) -> Iterator[Tuple[str, int]]:
+    from http.server import ThreadingHTTPServer
+
+    import simple_api
+
+    previous = simple_api.DATA_PATH, simple_api.INGEST_ADMISSION
+    simple_api.DATA_PATH = data_path
+    simple_api.INGEST_ADMISSION = _unlimited_admission()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), simple_api.Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server.server_address[0], server.server_address[1]
+    finally:
+        server.shutdown()
+        server.server_close()
+        simple_api.DATA_PATH, simple_api.INGEST_ADMISSION = previous
+
+
+@contextmanager
+def _fastapi_server(data_path: Path) -> Iterator[Tuple[str, int]]:
+    import socket
+
+    import uvicorn
+
+    import api
+
+    previous = api.DATA_PATH, api.INGEST_ADMISSION
+    api.DATA_PATH = data_path
+    api.INGEST_ADMISSION = _unlimited_admission()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield "127.0.0.1", port
+    finally:
+        server.should_exit = True
+        thread.join()
+        api.DATA_PATH, api.INGEST_ADMISSION = previous
+
+
+SERVERS = {
+    "simple_api": _simple_api_server,
+    "api": _fastapi_server,
+}
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _drive(
+    host: str,
+    port: int,
+    requests: int,
+    concurrency: int,
+    write_ratio: float,
+    type_mix: Optional[Mapping[str, float]] = None,
+    days: Optional[int] = None,
+) -> Dict[str, Any]:
+    payloads = generate_payloads(requests, type_mix=type_mix, days=days or 7, seed=1)
+    writes_every = int(1 / write_ratio) if write_ratio > 0 else 0
+    latencies: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker(indices: range) -> None:
+        nonlocal errors
+        connection = http.client.HTTPConnection(host, port, timeout=30)
+        local: List[float] = []
+        local_errors = 0
+        for index in indices:
+            start = time.perf_counter()
+            try:
+                if writes_every and index % writes_every == 0:
+                    body = json.dumps(payloads[index])
+                    connection.request(
+                        "POST", "/signals", body, {"Content-Type": "application/json"}
+                    )
+                else:
+                    connection.request("GET", "/stats?window=day")
+                response = connection.getresponse()
+                response.read()
+                failed = response.status >= 400
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                failed = True
+            local.append(time.perf_counter() - start)
+            if failed:
+                local_errors += 1
+        connection.close()
+        with lock:
+            latencies.extend(local)
+            errors += local_errors
+
+    per_worker = max(1, requests // concurrency)
+    chunks = [
+        range(start, min(requests, start + per_worker))
+        for start in range(0, requests, per_worker)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, chunks))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50Millis": _percentile(latencies, 0.50) * 1e3,
+        "p95Millis": _percentile(latencies, 0.95) * 1e3,
+        "p99Millis": _percentile(latencies, 0.99) * 1e3,
+    }
+
+
+def run_http(
+    servers: List[str],
+    sizes: List[int],
+    *,
+    requests: int = 500,
+    concurrency: int = 8,
+    write_ratio: float = DEFAULT_WRITE_RATIO,
+    type_mix: Optional[Mapping[str, float]] = None,
+    days: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """``type_mix`` and ``days`` shape both the preloaded signals and the submitted ones."""
+    results: List[Dict[str, Any]] = []
+    for server_name in servers:
+        for size in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                data_path = Path(tmp) / "signals.json"
+                with data_path.open("w", encoding="utf-8") as handle:
+                    json.dump(generate_signals(size, type_mix=type_mix, days=days or 30), handle)
+                try:
+                    with SERVERS[server_name](data_path) as (host, port):
+                        summary = _drive(
+                            host, port, requests, concurrency, write_ratio, type_mix, days
+                        )
+                except ImportError as exc:
+                    print(f"http:{server_name:<15} skipped ({exc})")
+                    continue
+            result: Dict[str, Any] = {"name": f"http:{server_name}", "size": size}
+            result.update(summary)
+            print(
+                f"http:{server_name:<15} n={size:<10} {summary['rps']:.1f} req/s "
+                f"p50={summary['p50Millis']:.1f}ms p99={summary['p99Millis']:.1f}ms "
+                f"errors={summary['errors']}"
+            )
+            results.append(result)
+    return results
+
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import json
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional
+
+from signals.aggregation import aggregate_signals
+from signals.charts import render_basic_charts
+from signals.storage import append_signal
+from signals.utils import parse_iso8601
+from signals.validation import SignalValidator, validate_and_normalize
+from signals.wal import wal_path
+
+from .synthetic import generate_payloads, generate_signals
+
+APPEND_SAMPLES = 5
+
+
+def _best_of(func: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _result(name: str, size: int, seconds: float, operations: int) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "size": size,
+        "seconds": seconds,
+        "perOpMicros": seconds / max(1, operations) * 1e6,
+    }
+
+
+def bench_validate_and_normalize(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    payloads = generate_payloads(size, **synthetic)
+
+    def run() -> None:
+        for payload in payloads:
+            validate_and_normalize(payload)
+
+    return _result("validate_and_normalize", size, _best_of(run, repeat), size)
+
+
+def bench_signal_validator(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Batch path: compiled validator with a fixed clock, one timestamp parse per record."""
+    payloads = generate_payloads(size, **synthetic)
+    now = datetime.now(timezone.utc)
+    validator = SignalValidator(clock=lambda: now)
+
+    def run() -> None:
+        for payload in payloads:
+            validator.normalize(payload)
+
+    return _result("SignalValidator.normalize", size, _best_of(run, repeat), size)
+
+
+def bench_parse_iso8601(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    payloads = generate_payloads(size, event_ids=0, **synthetic)
+    timestamps = [payload["timestamp"] for payload in payloads]
+
+    def run() -> None:
+        for value in timestamps:
+            parse_iso8601(value)
+
+    return _result("parse_iso8601", size, _best_of(run, repeat), size)
+
+
+def bench_aggregate_signals(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    records = generate_signals(size, **synthetic)
+    seconds = _best_of(lambda: aggregate_signals(records, window="day"), repeat)
+    return _result("aggregate_signals", size, seconds, size)
+
+
+def bench_append_signal(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Cost of one append against a store that already holds ``size`` records."""
+    records = generate_signals(size + APPEND_SAMPLES, **synthetic)
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "signals.json"
+        for _ in range(max(1, repeat)):
+            with path.open("w", encoding="utf-8") as handle:
+                json.dump(records[:size], handle)
+            wal_path(path).unlink(missing_ok=True)
+            start = time.perf_counter()
+            for record in records[size:]:
+                append_signal(path, record)
+            best = min(best, time.perf_counter() - start)
+    return _result("append_signal", size, best, APPEND_SAMPLES)
+
+
+def bench_render_basic_charts(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Cold renders: a fresh output directory each run, so the manifest cache never hits."""
+    stats = aggregate_signals(generate_signals(size, **synthetic), window="day")
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            render_basic_charts(stats, Path(tmp))
+            best = min(best, time.perf_counter() - start)
+    return _result("render_basic_charts", size, best, 1)
+
+
+def bench_render_basic_charts_cached(
+    size: int, repeat: int, synthetic: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Repeat renders of unchanged stats into the same directory: the manifest cache hit."""
+    stats = aggregate_signals(generate_signals(size, **synthetic), window="day")
+    with tempfile.TemporaryDirectory() as tmp:
+        render_basic_charts(stats, Path(tmp))
+        seconds = _best_of(lambda: render_basic_charts(stats, Path(tmp)), repeat)
+    return _result("render_basic_charts_cached", size, seconds, 1)
+
+
+BENCHMARKS: Dict[str, Callable[[int, int, Mapping[str, Any]], Dict[str, Any]]] = {
+    "validate_and_normalize": bench_validate_and_normalize,
+    "SignalValidator.normalize": bench_signal_validator,
+    "parse_iso8601": bench_parse_iso8601,
+    "aggregate_signals": bench_aggregate_signals,
+    "append_signal": bench_append_signal,
+    "render_basic_charts": bench_render_basic_charts,
+    "render_basic_charts_cached": bench_render_basic_charts_cached,
+}
+
+
+def run_micro(
+    names: List[str],
+    sizes: List[int],
+    repeat: int,
+    *,
+    type_mix: Optional[Mapping[str, float]] = None,
+    days: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """``type_mix`` and ``days`` override the synthetic generator's defaults."""
+    synthetic: Dict[str, Any] = {}
+    if type_mix:
+        synthetic["type_mix"] = type_mix
+    if days is not None:
+        synthetic["days"] = days
+    results: List[Dict[str, Any]] = []
+    for name in names:
+        for size in sizes:
+            result = BENCHMARKS[name](size, repeat, synthetic)
+            print(f"{name:<28} n={size:<10} {result['seconds']:.4f}s ({result['perOpMicros']:.2f}us/op)")
+            results.append(result)
+    return results
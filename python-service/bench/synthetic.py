@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional
+
+from signals.types import SIGNAL_TYPES
+from signals.utils import format_iso8601
+
+
+def _type_population(type_mix: Optional[Mapping[str, float]]):
+    if not type_mix:
+        keys = [signal_type.key for signal_type in SIGNAL_TYPES]
+        return keys, [1.0] * len(keys)
+    return list(type_mix.keys()), list(type_mix.values())
+
+
+def generate_payloads(
+    count: int,
+    *,
+    type_mix: Optional[Mapping[str, float]] = None,
+    days: int = 90,
+    end: Optional[datetime] = None,
+    event_ids: int = 50,
+    note_ratio: float = 0.3,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Raw submission payloads, as clients would send them."""
+    rng = random.Random(seed)
+    keys, weights = _type_population(type_mix)
+    end = end or datetime.now(timezone.utc)
+    spread = max(1, days * 86400)
+    chosen_types = rng.choices(keys, weights=weights, k=count)
+
+    payloads: List[Dict[str, Any]] = []
+    for index in range(count):
+        timestamp = end - timedelta(seconds=rng.randrange(spread))
+        context: Dict[str, Any] = {}
+        if event_ids:
+            context["eventId"] = f"event-{rng.randrange(event_ids)}"
+        if rng.random() < note_ratio:
+            context["note"] = f"  synthetic note {index}  "
+        payloads.append(
+            {
+                "type": chosen_types[index],
+                "timestamp": format_iso8601(timestamp),
+                "context": context,
+                "source": "import",
+                "version": 1,
+            }
+        )
+    return payloads
+
+
+def generate_signals(count: int, **kwargs: Any) -> List[Dict[str, Any]]:
+    """Normalized records, shaped like the contents of ``data/signals.json``."""
+    records = generate_payloads(count, **kwargs)
+    for index, record in enumerate(records):
+        record["signalId"] = f"bench-{index:08d}"
+        note = record["context"].get("note")
+        if note:
+            record["context"]["note"] = note.strip()
+    return records
@@ -1,90 +1,269 @@
+import argparse
 import asyncio
+import time
+from collections import defaultdict
 from datetime import datetime
 from prisma import Prisma
+from scrapers.dossiers import DossierStore, refresh_dossiers
 from scrapers.iebc_scraper import scrape_iebc_cleared_politicians
 from scrapers.judiciary_scraper import scrape_judiciary_cases
+from scrapers.near_duplicates import MentionIndex
+from scrapers.rumour_classifier import tag_mentions
+from scrapers.scheduler import REQUESTS_PER_HOUR, REQUESTS_PER_SCRAPE, ScrapeScheduler
 from scrapers.twitter_scraper import scrape_twitter_mentions
 
-async def main():
-    print("Initializing Prisma Client...")
-    db = Prisma()
-    await db.connect()
+# The daemon re-reads the IEBC list this often to catch clearance changes.
+IEBC_SYNC_INTERVAL = 6 * 3600
+# Upper bound on one idle sleep, so a stopped daemon never looks hung for long.
+MAX_SLEEP = 300
 
-    print("--- 1. Scraping IEBC Candidates ---")
-    candidates = scrape_iebc_cleared_politicians()
-    
-    for candidate in candidates:
-        # Upsert Politician to ensure we don't have duplicates
-        politician = await db.politician.upsert(
-            where={
-                "id": candidate.get("id", "none") # we don't have a unique field so let's rely on name matching or create
-            },
-            data={
-                "create": {
+
+def _parse_date(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+async def sync_candidates(db):
+    """
+    Create or update every IEBC candidate.
+    Returns the politicians and the ids of those whose isCleared status changed.
+    """
+    politicians = []
+    changed = []
+    for candidate in scrape_iebc_cleared_politicians():
+        # There is no unique field on Politician, so candidates are matched by name.
+        politician = await db.politician.find_first(where={"name": candidate["name"]})
+        if not politician:
+            politician = await db.politician.create(
+                data={
                     "name": candidate["name"],
                     "office": candidate["office"],
                     "county": candidate.get("county"),
                     "party": candidate.get("party"),
                     "isCleared": candidate["isCleared"]
-                },
-                "update": {
-                    "office": candidate["office"],
-                    "isCleared": candidate["isCleared"]
                 }
-            }
-        )
-        
-        # If upsert by ID is tricky without unique constraints on name,
-        # let's write a safer way: check if name exists, otherwise create.
-        existing_pol = await db.politician.find_first(where={"name": candidate["name"]})
-        if not existing_pol:
-            existing_pol = await db.politician.create(
+            )
+        elif politician.isCleared != candidate["isCleared"] or politician.office != candidate["office"]:
+            if politician.isCleared != candidate["isCleared"]:
+                changed.append(politician.id)
+            politician = await db.politician.update(
+                where={"id": politician.id},
                 data={
-                    "name": candidate["name"],
                     "office": candidate["office"],
-                    "county": candidate.get("county"),
-                    "party": candidate.get("party"),
                     "isCleared": candidate["isCleared"]
                 }
             )
+        politicians.append(politician)
+    return politicians, changed
 
-        print(f"--- 2. Scraping Judiciary for {existing_pol.name} ---")
-        cases = scrape_judiciary_cases(existing_pol.name)
-        for case in cases:
-            # Check for unique case number
-            existing_case = await db.courtcase.find_unique(where={"caseNumber": case["caseNumber"]})
-            if not existing_case:
-                await db.courtcase.create(
-                    data={
-                        "caseNumber": case["caseNumber"],
-                        "courtName": case["courtName"],
-                        "description": case["description"],
-                        "status": case["status"],
-                        "dateFiled": datetime.fromisoformat(case["dateFiled"].replace("Z", "+00:00")),
-                        "url": case.get("url"),
-                        "isVerified": case["isVerified"],
-                        "politicianId": existing_pol.id
-                    }
-                )
 
-        print(f"--- 3. Scraping Twitter Mentions for {existing_pol.name} ---")
-        tweets = scrape_twitter_mentions(existing_pol.name)
-        for tweet in tweets:
-            existing_tweet = await db.socialmention.find_unique(where={"url": tweet["url"]})
-            if not existing_tweet:
-                await db.socialmention.create(
-                    data={
-                        "platform": tweet["platform"],
-                        "content": tweet["content"],
-                        "url": tweet["url"],
-                        "postedAt": datetime.fromisoformat(tweet["postedAt"].replace("Z", "+00:00")),
-                        "isRumour": tweet["isRumour"],
-                        "politicianId": existing_pol.id
-                    }
-                )
+async def load_known_cases(db):
+    """
+    Case numbers per politician id, so a mention citing one of them is not a rumour.
+    """
+    known_cases = defaultdict(set)
+    for case in await db.courtcase.find_many():
+        known_cases[case.politicianId].add(case.caseNumber)
+    return known_cases
+
+
+async def scrape_cases(db, politician_id, name, known_cases):
+    """
+    Store new court cases for one politician; returns how many were new.
+    """
+    print(f"--- 2. Scraping Judiciary for {name} ---")
+    new_cases = 0
+    for case in scrape_judiciary_cases(name):
+        # Check for unique case number
+        existing_case = await db.courtcase.find_unique(where={"caseNumber": case["caseNumber"]})
+        if not existing_case:
+            await db.courtcase.create(
+                data={
+                    "caseNumber": case["caseNumber"],
+                    "courtName": case["courtName"],
+                    "description": case["description"],
+                    "status": case["status"],
+                    "dateFiled": _parse_date(case["dateFiled"]),
+                    "url": case.get("url"),
+                    "isVerified": case["isVerified"],
+                    "politicianId": politician_id
+                }
+            )
+            new_cases += 1
+        known_cases[politician_id].add(case["caseNumber"])
+    return new_cases
+
+
+def scrape_mentions(politician_id, name):
+    print(f"--- 3. Scraping Twitter Mentions for {name} ---")
+    return [(politician_id, tweet) for tweet in scrape_twitter_mentions(name)]
+
+
+async def store_mentions(db, scraped_mentions, known_cases, mention_index):
+    """
+    Classify, cluster and persist (politicianId, mention) pairs.
+    Returns how many mentions were new, near-duplicates included.
+    """
+    print("--- 4. Classifying Social Mentions ---")
+    # A post citing one of its politician's known cases counts as verified, not rumour.
+    tag_mentions(
+        [tweet for _, tweet in scraped_mentions],
+        known_case_numbers=known_cases,
+        politician_ids=[politician_id for politician_id, _ in scraped_mentions],
+    )
+
+    print("--- 5. Clustering Near-Duplicate Mentions ---")
+    # Retweets and copy-pasted posts are stored once, as a canonical row with a duplicate count.
+    canonical_mentions = {}
+    duplicate_counts = defaultdict(int)
+    for politician_id, tweet in scraped_mentions:
+        match = mention_index.observe(politician_id, tweet["url"], tweet["content"])
+        if match.seen:
+            continue
+        if match.canonical_url == tweet["url"]:
+            canonical_mentions[tweet["url"]] = (politician_id, tweet)
+        else:
+            duplicate_counts[match.canonical_url] += 1
+    new_mentions = len(canonical_mentions) + sum(duplicate_counts.values())
+    print(f"{len(canonical_mentions)} new mentions, "
+          f"{sum(duplicate_counts.values())} near-duplicates folded into canonical rows")
+
+    for url, (politician_id, tweet) in canonical_mentions.items():
+        existing_tweet = await db.socialmention.find_unique(where={"url": url})
+        if not existing_tweet:
+            await db.socialmention.create(
+                data={
+                    "platform": tweet["platform"],
+                    "content": tweet["content"],
+                    "url": url,
+                    "postedAt": _parse_date(tweet["postedAt"]),
+                    "isRumour": tweet["isRumour"],
+                    "duplicateCount": duplicate_counts.pop(url, 0),
+                    "politicianId": politician_id
+                }
+            )
+
+    # Duplicates of rows stored by earlier runs.
+    for url, count in duplicate_counts.items():
+        await db.socialmention.update_many(
+            where={"url": url},
+            data={"duplicateCount": {"increment": count}},
+        )
+
+    # Saved only once the rows exist. A failed run re-clusters its mentions next time,
+    # as long as the caller drops this in-memory index (run_daemon reloads it).
+    mention_index.save()
+    return new_mentions
+
+
+async def scrape_politician(db, politician_id, name, known_cases, mention_index):
+    """
+    One scheduled scrape: returns (new court cases, new mentions).
+    """
+    new_cases = await scrape_cases(db, politician_id, name, known_cases)
+    new_mentions = await store_mentions(
+        db, scrape_mentions(politician_id, name), known_cases, mention_index
+    )
+    return new_cases, new_mentions
+
+
+async def main():
+    print("Initializing Prisma Client...")
+    db = Prisma()
+    await db.connect()
+
+    print("--- 1. Scraping IEBC Candidates ---")
+    politicians, _ = await sync_candidates(db)
+    known_cases = await load_known_cases(db)
+    # (politicianId, mention) pairs, tagged in one batch once every politician is scraped.
+    scraped_mentions = []
+
+    for politician in politicians:
+        await scrape_cases(db, politician.id, politician.name, known_cases)
+        scraped_mentions.extend(scrape_mentions(politician.id, politician.name))
+
+    await store_mentions(db, scraped_mentions, known_cases, MentionIndex.load())
+
+    print("--- 6. Building Dossiers ---")
+    changed = await refresh_dossiers(db, [politician.id for politician in politicians], DossierStore())
+    print(f"{changed} of {len(politicians)} dossiers changed")
 
     await db.disconnect()
     print("Daily Scraping Completed Successfully.")
 
+
+async def run_daemon(requests_per_hour=REQUESTS_PER_HOUR):
+    """
+    Scrape politicians one at a time as they fall due, within the request budget.
+
+    Politicians with new cases or mentions are polled again sooner, quiet ones
+    less and less often, and an isCleared change in the IEBC list moves a
+    politician to the front of the queue. The queue survives restarts.
+    """
+    print("Initializing Prisma Client...")
+    db = Prisma()
+    await db.connect()
+    scheduler = ScrapeScheduler.load(per_hour=requests_per_hour)
+    mention_index = MentionIndex.load()
+    dossier_store = DossierStore()
+    known_cases = await load_known_cases(db)
+
+    try:
+        while True:
+            now = time.time()
+            if now >= scheduler.next_sync and not scheduler.budget.wait_time(1, now):
+                print("--- 1. Scraping IEBC Candidates ---")
+                scheduler.budget.spend(1, now)
+                politicians, changed = await sync_candidates(db)
+                for politician in politicians:
+                    scheduler.ensure(politician.id, politician.name, now)
+                for politician_id in changed:
+                    scheduler.bump(politician_id, now)
+                await refresh_dossiers(db, changed, dossier_store)
+                scheduler.next_sync = now + IEBC_SYNC_INTERVAL
+                scheduler.save()
+                continue
+
+            wake = scheduler.wake_time(now)
+            if wake > now:
+                await asyncio.sleep(min(wake - now, MAX_SLEEP))
+                continue
+
+            entry = scheduler.pop_due(now)
+            scheduler.budget.spend(REQUESTS_PER_SCRAPE, now)
+            try:
+                new_cases, new_mentions = await scrape_politician(
+                    db, entry.politician_id, entry.name, known_cases, mention_index
+                )
+            except Exception as exc:
+                print(f"Scrape failed for {entry.name}: {exc}")
+                # observe() already indexed the failed batch in memory; go back to the
+                # last saved index so those mentions are clustered and stored next time.
+                mention_index = MentionIndex.load()
+                entry = scheduler.record(entry.politician_id, time.time(), failed=True)
+            else:
+                entry = scheduler.record(
+                    entry.politician_id, time.time(), new_cases=new_cases, new_mentions=new_mentions
+                )
+                # Duplicate counts change without new rows; an unchanged dossier is not rewritten.
+                await refresh_dossiers(db, [entry.politician_id], dossier_store)
+            print(f"Next scrape for {entry.name} in {entry.interval / 60:.0f} min")
+            scheduler.save()
+    finally:
+        scheduler.save()
+        await db.disconnect()
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Scrape IEBC, judiciary and Twitter data into the database.")
+    parser.add_argument("--daemon", action="store_true", help="keep running, scraping each politician as it falls due")
+    parser.add_argument(
+        "--requests-per-hour",
+        type=float,
+        default=REQUESTS_PER_HOUR,
+        help="upstream request budget for the daemon (default: SCRAPE_REQUESTS_PER_HOUR or 600)",
+    )
+    args = parser.parse_args()
+    if args.daemon:
+        asyncio.run(run_daemon(args.requests_per_hour))
+    else:
+        asyncio.run(main())
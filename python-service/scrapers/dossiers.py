@@ -0,0 +1,242 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Newest cases and mentions kept in each dossier.
+LATEST_ITEMS = 5
+CACHE_SIZE = int(os.getenv("DOSSIER_CACHE_SIZE", "1024"))
+# How often the API looks for rewritten dossiers, in seconds.
+REFRESH_SECONDS = float(os.getenv("DOSSIER_REFRESH_SECONDS", "1.0"))
+DEFAULT_STORE_PATH = Path(
+    os.getenv(
+        "DOSSIER_STORE_PATH",
+        str(Path(__file__).resolve().parent.parent / "data" / "dossiers.db"),
+    )
+)
+
+
+def _iso(value) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def summarize(politician, cases, latest_mentions, mention_count: int, rumour_count: int) -> Dict:
+    """
+    Dossier for one politician from its Prisma rows; cases newest first.
+    """
+    by_status: Dict[str, int] = {}
+    for case in cases:
+        by_status[case.status] = by_status.get(case.status, 0) + 1
+    return {
+        "politician": {
+            "id": politician.id,
+            "name": politician.name,
+            "office": politician.office,
+            "county": politician.county,
+            "party": politician.party,
+            "isCleared": politician.isCleared,
+        },
+        "cases": {
+            "total": len(cases),
+            "byStatus": dict(sorted(by_status.items())),
+            "latest": [
+                {
+                    "caseNumber": case.caseNumber,
+                    "courtName": case.courtName,
+                    "status": case.status,
+                    "dateFiled": _iso(case.dateFiled),
+                    "url": case.url,
+                    "isVerified": case.isVerified,
+                }
+                for case in cases[:LATEST_ITEMS]
+            ],
+        },
+        "mentions": {
+            "total": mention_count,
+            "verified": mention_count - rumour_count,
+            "rumour": rumour_count,
+            "latest": [
+                {
+                    "platform": mention.platform,
+                    "content": mention.content,
+                    "url": mention.url,
+                    "postedAt": _iso(mention.postedAt),
+                    "isRumour": mention.isRumour,
+                    "duplicateCount": mention.duplicateCount,
+                }
+                for mention in latest_mentions
+            ],
+        },
+    }
+
+
+async def build_dossier(db, politician_id: str) -> Optional[Dict]:
+    politician = await db.politician.find_unique(where={"id": politician_id})
+    if politician is None:
+        return None
+    cases = await db.courtcase.find_many(
+        where={"politicianId": politician_id},
+        order={"dateFiled": "desc"},
+    )
+    # Postgres sorts NULL first in descending order; undated cases go last instead.
+    cases.sort(key=lambda case: case.dateFiled is None)
+    latest_mentions = await db.socialmention.find_many(
+        where={"politicianId": politician_id},
+        order={"postedAt": "desc"},
+        take=LATEST_ITEMS,
+    )
+    mention_count = await db.socialmention.count(where={"politicianId": politician_id})
+    rumour_count = await db.socialmention.count(
+        where={"politicianId": politician_id, "isRumour": True}
+    )
+    return summarize(politician, cases, latest_mentions, mention_count, rumour_count)
+
+
+async def refresh_dossiers(db, politician_ids: Iterable[str], store: "DossierStore") -> int:
+    """
+    Rebuild the dossiers of the given politicians; returns how many changed.
+    """
+    dossiers = {}
+    for politician_id in politician_ids:
+        dossier = await build_dossier(db, politician_id)
+        if dossier is not None:
+            dossiers[politician_id] = dossier
+    return store.put_many(dossiers)
+
+
+class DossierStore:
+    """
+    Dossiers as compact JSON in a local SQLite key-value table.
+
+    Every write that changes a dossier gives it the next sequence number, so
+    readers find what changed since their last look with one indexed query.
+    Rewriting an identical dossier is a no-op and invalidates nothing.
+    """
+
+    def __init__(self, path: Path = DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._ready:
+            return sqlite3.connect(self.path, timeout=30)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path, timeout=30)
+        # WAL lets the API read while the scraper writes; the mode sticks to the file.
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS dossiers ("
+            "politician_id TEXT PRIMARY KEY, seq INTEGER NOT NULL, body TEXT NOT NULL)"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS dossiers_seq ON dossiers (seq)")
+        connection.commit()
+        self._ready = True
+        return connection
+
+    def put_many(self, dossiers: Dict[str, Dict]) -> int:
+        if not dossiers:
+            return 0
+        with closing(self._connect()) as connection, connection:
+            changed = 0
+            for politician_id, dossier in dossiers.items():
+                body = json.dumps(dossier, separators=(",", ":"), ensure_ascii=False)
+                cursor = connection.execute(
+                    "INSERT INTO dossiers (politician_id, seq, body) "
+                    "VALUES (?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM dossiers), ?) "
+                    "ON CONFLICT (politician_id) DO UPDATE SET seq = excluded.seq, body = excluded.body "
+                    "WHERE dossiers.body != excluded.body",
+                    (politician_id, body),
+                )
+                changed += cursor.rowcount
+            return changed
+
+    def get(self, politician_id: str) -> Optional[Tuple[int, Dict]]:
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                "SELECT seq, body FROM dossiers WHERE politician_id = ?", (politician_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def changes(self, since: int) -> Tuple[List[Tuple[str, int]], int]:
+        """
+        (politician_id, seq) pairs written after ``since``, and the latest sequence number.
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(
+                "SELECT politician_id, seq FROM dossiers WHERE seq > ?", (since,)
+            ).fetchall()
+            latest = connection.execute("SELECT COALESCE(MAX(seq), 0) FROM dossiers").fetchone()[0]
+        return rows, latest
+
+
+class DossierCache:
+    """
+    In-memory LRU of decoded dossiers in front of a DossierStore.
+
+    At most every ``refresh_seconds`` a lookup asks the store what changed
+    since the last sequence number it saw and evicts just those politicians;
+    everything else keeps being served from memory.
+    """
+
+    def __init__(
+        self,
+        store: DossierStore,
+        max_entries: int = CACHE_SIZE,
+        refresh_seconds: float = REFRESH_SECONDS,
+    ):
+        self.store = store
+        self.max_entries = max_entries
+        self.refresh_seconds = refresh_seconds
+        self._entries: "OrderedDict[str, Tuple[int, Dict]]" = OrderedDict()
+        # Newest sequence number seen per politician in the change feed, so a
+        # lookup that raced a rewrite never caches the older dossier.
+        self._latest: Dict[str, int] = {}
+        self._seq = 0
+        self._checked = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, politician_id: str) -> Optional[Dict]:
+        self._invalidate()
+        with self._lock:
+            cached = self._entries.get(politician_id)
+            if cached is not None:
+                self._entries.move_to_end(politician_id)
+                return cached[1]
+        loaded = self.store.get(politician_id)
+        if loaded is None:
+            return None
+        seq, dossier = loaded
+        with self._lock:
+            if seq >= self._latest.get(politician_id, 0):
+                self._entries[politician_id] = loaded
+                self._entries.move_to_end(politician_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return dossier
+
+    def _invalidate(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked < self.refresh_seconds:
+                return
+            self._checked = now
+            since = self._seq
+        rows, latest = self.store.changes(since)
+        with self._lock:
+            if latest < since:
+                # The store was rebuilt from scratch; nothing cached is trustworthy.
+                self._entries.clear()
+                self._latest.clear()
+            for politician_id, seq in rows:
+                self._latest[politician_id] = max(seq, self._latest.get(politician_id, 0))
+                cached = self._entries.get(politician_id)
+                if cached is not None and cached[0] < seq:
+                    del self._entries[politician_id]
+            self._seq = latest
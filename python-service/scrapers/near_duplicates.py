@@ -0,0 +1,211 @@
+import base64
+import hashlib
+import json
+import os
+import re
+import tempfile
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Posts whose estimated Jaccard similarity (word 3-gram shingles) reaches this are one story.
+# One edited word in a 20-word post still scores about 0.75.
+SIMILARITY_THRESHOLD = 0.7
+NUM_PERM = 128
+# 32 bands of 4 rows: pairs at 0.7 similarity share a band >99% of the time,
+# pairs below 0.3 rarely do; candidates are then checked against the threshold.
+BANDS = 32
+SHINGLE_WORDS = 3
+MAX_ENTRIES = int(os.getenv("MENTION_INDEX_MAX_ENTRIES", "50000"))
+INDEX_VERSION = 1
+DEFAULT_INDEX_PATH = Path(
+    os.getenv(
+        "MENTION_INDEX_PATH",
+        str(Path(__file__).resolve().parent.parent / "data" / "mention_index.json"),
+    )
+)
+
+_PRIME = (1 << 61) - 1
+_MASK = 0xFFFFFFFF
+_RETWEET = re.compile(r"^rt\s+@\w+:?\s*")
+_NOISE = re.compile(r"https?://\S+|@\w+")
+_NON_WORD = re.compile(r"[^\w\s]+")
+
+
+def _permutations(count: int) -> List[Tuple[int, int]]:
+    # Fixed, seed-derived coefficients so signatures stay comparable across runs.
+    coefficients = []
+    for index in range(count):
+        digest = hashlib.blake2b(f"minhash-{index}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "little") % (_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "little") % _PRIME
+        coefficients.append((a, b))
+    return coefficients
+
+
+_PERMUTATIONS = _permutations(NUM_PERM)
+
+
+def normalize_content(text: str) -> str:
+    """
+    Lowercase, drop a leading "RT @user:", links and @handles, strip punctuation.
+    """
+    text = _RETWEET.sub("", (text or "").lower().strip())
+    text = _NOISE.sub(" ", text)
+    text = _NON_WORD.sub(" ", text)
+    return " ".join(text.split())
+
+
+def _shingles(normalized: str) -> List[int]:
+    words = normalized.split()
+    if len(words) <= SHINGLE_WORDS:
+        grams = [" ".join(words)]
+    else:
+        grams = {" ".join(words[i : i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+    return [
+        int.from_bytes(hashlib.blake2b(gram.encode(), digest_size=8).digest(), "little")
+        for gram in grams
+    ]
+
+
+def minhash(content: str) -> Optional[array]:
+    """
+    128 x uint32 MinHash signature of the normalized content; None for empty posts.
+    """
+    normalized = normalize_content(content)
+    if not normalized:
+        return None
+    hashes = _shingles(normalized)
+    return array(
+        "I",
+        (min((a * value + b) % _PRIME for value in hashes) & _MASK for a, b in _PERMUTATIONS),
+    )
+
+
+def similarity(left: array, right: array) -> float:
+    return sum(1 for x, y in zip(left, right) if x == y) / len(left)
+
+
+@dataclass
+class Match:
+    canonical_url: str
+    similarity: float
+    # True when this url was already indexed by an earlier batch or run.
+    seen: bool = False
+
+
+class MentionIndex:
+    """
+    Locality-sensitive hashing index of MinHash signatures, one per canonical mention.
+
+    A new post is compared only with canonical posts of the same politician that
+    share at least one band of its signature, instead of with every stored post.
+    Duplicate urls are remembered as aliases, so re-scraping a post never counts
+    it twice. The oldest entries are evicted past ``max_entries``.
+    """
+
+    def __init__(self, path: Path = DEFAULT_INDEX_PATH, max_entries: int = MAX_ENTRIES):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        # url -> (politicianId, signature), oldest first.
+        self.entries: Dict[str, Tuple[str, array]] = {}
+        self.aliases: Dict[str, str] = {}
+        self._buckets: Dict[Tuple[str, int, bytes], List[str]] = {}
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_INDEX_PATH, max_entries: int = MAX_ENTRIES) -> "MentionIndex":
+        index = cls(path, max_entries)
+        try:
+            with index.path.open("r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except FileNotFoundError:
+            return index
+        except ValueError:
+            print(f"Ignoring unreadable mention index at {index.path}")
+            return index
+        if payload.get("version") != INDEX_VERSION or payload.get("numPerm") != NUM_PERM:
+            return index
+        for url, politician_id, encoded in payload.get("entries", []):
+            signature = array("I")
+            signature.frombytes(base64.b64decode(encoded))
+            index._add(url, politician_id, signature)
+        index.aliases = dict(payload.get("aliases", {}))
+        return index
+
+    def save(self) -> None:
+        """
+        Write the index next to the scraper data, atomically.
+        """
+        payload = {
+            "version": INDEX_VERSION,
+            "numPerm": NUM_PERM,
+            "entries": [
+                [url, politician_id, base64.b64encode(signature.tobytes()).decode("ascii")]
+                for url, (politician_id, signature) in self.entries.items()
+            ],
+            "aliases": self.aliases,
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, separators=(",", ":"))
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def observe(self, politician_id: str, url: str, content: str) -> Match:
+        """
+        Find the canonical mention for a post, indexing it as canonical when it is new.
+        """
+        if url in self.entries:
+            return Match(url, 1.0, seen=True)
+        if url in self.aliases:
+            return Match(self.aliases[url], 1.0, seen=True)
+        signature = minhash(content)
+        if signature is None:
+            return Match(url, 1.0)
+
+        best_url, best = None, 0.0
+        checked = set()
+        for key in self._band_keys(politician_id, signature):
+            for candidate in self._buckets.get(key, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                score = similarity(signature, self.entries[candidate][1])
+                if score > best:
+                    best_url, best = candidate, score
+        if best_url is not None and best >= SIMILARITY_THRESHOLD:
+            self.aliases[url] = best_url
+            while len(self.aliases) > self.max_entries * 4:
+                del self.aliases[next(iter(self.aliases))]
+            return Match(best_url, best)
+
+        self._add(url, politician_id, signature)
+        while len(self.entries) > self.max_entries:
+            self._drop(next(iter(self.entries)))
+        return Match(url, 1.0)
+
+    def _band_keys(self, politician_id: str, signature: array) -> List[Tuple[str, int, bytes]]:
+        rows = len(signature) // BANDS
+        return [
+            (politician_id, band, signature[band * rows : (band + 1) * rows].tobytes())
+            for band in range(BANDS)
+        ]
+
+    def _add(self, url: str, politician_id: str, signature: array) -> None:
+        self.entries[url] = (politician_id, signature)
+        for key in self._band_keys(politician_id, signature):
+            self._buckets.setdefault(key, []).append(url)
+
+    def _drop(self, url: str) -> None:
+        politician_id, signature = self.entries.pop(url)
+        for key in self._band_keys(politician_id, signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.remove(url)
+                if not bucket:
+                    del self._buckets[key]
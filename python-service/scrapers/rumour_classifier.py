@@ -0,0 +1,243 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Mapping, Optional, Pattern, Sequence, Union
+
+# Handles whose posts count as official statements rather than rumours.
+# Extend with OFFICIAL_HANDLES="handle1,handle2" without touching the code.
+DEFAULT_OFFICIAL_HANDLES = (
+    "EACCKenya",
+    "ODPP_KE",
+    "Kenyajudiciary",
+    "IEBCKenya",
+    "NPSOfficial_KE",
+    "DCI_Kenya",
+    "StateHouseKenya",
+)
+
+# Hedged language: the claim is unconfirmed.
+RUMOUR_CUES = (
+    "allegedly",
+    "alleged",
+    "reportedly",
+    "rumour",
+    "rumor",
+    "unconfirmed",
+    "sources say",
+    "word is",
+    "leaked",
+    "whispers",
+    "inasemekana",
+)
+
+# Claims about investigations or prosecutions; they need an official source or a known case.
+INSTITUTION_CUES = (
+    "EACC",
+    "DPP",
+    "ODPP",
+    "DCI",
+    "arrested",
+    "arraigned",
+    "indicted",
+    "investigation",
+)
+
+# Everyday words too ("a charged debate", "took them to court"): a claim only with a second cue.
+WEAK_INSTITUTION_CUES = (
+    "charged",
+    "court",
+)
+
+# Anything shaped like a court case number ("HCC-123-2024", "ACEC 12/2023"); an unknown one is a claim.
+CASE_NUMBER = r"(?-i:[A-Z]{2,8})[-/ ]\d{1,20}[-/]\d{4}"
+
+CHUNK_SIZE = 5000
+
+_HANDLE = re.compile(r"https?://(?:www\.)?(?:twitter|x)\.com/([A-Za-z0-9_]{1,15})/", re.IGNORECASE)
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Longest first so "alleged" never shadows "allegedly".
+    escaped = sorted((re.escape(phrase) for phrase in phrases), key=len, reverse=True)
+    return "|".join(escaped)
+
+
+def _official_handles() -> frozenset:
+    extra = [handle.strip() for handle in os.getenv("OFFICIAL_HANDLES", "").split(",")]
+    return frozenset(handle.lower() for handle in (*DEFAULT_OFFICIAL_HANDLES, *extra) if handle)
+
+
+def _case_number_pattern(case_number: str) -> Optional[str]:
+    # "HC.ACEC/12/2023" also matches "HC ACEC 12/2023"; only letters and digits must agree.
+    tokens = re.findall(r"[A-Za-z]+|\d+", case_number)
+    return r"[\s./-]*".join(tokens) if tokens else None
+
+
+def _known_case_pattern(case_numbers: Iterable[str]) -> Optional[Pattern]:
+    alternatives = {_case_number_pattern(number) for number in case_numbers}
+    alternatives.discard(None)
+    if not alternatives:
+        return None
+    return re.compile(
+        rf"(?<![A-Za-z0-9])(?:{'|'.join(sorted(alternatives, key=len, reverse=True))})(?![A-Za-z0-9])",
+        re.IGNORECASE,
+    )
+
+
+KnownCases = Union[Iterable[str], Mapping[str, Iterable[str]]]
+
+
+class RumourClassifier:
+    """
+    Tags social mentions as rumours in one pass over each post.
+
+    All cues are compiled into a single case-insensitive pattern when the
+    classifier is built. Known CourtCase.caseNumber values are compiled into one
+    escaped alternation per politician (``known_case_numbers`` maps politician
+    ids to their case numbers; a plain iterable applies to every mention), so
+    any numbering scheme ("HC.ACEC/12/2023", "E123 of 2024") is recognised. A
+    mention is not a rumour if it comes from an official handle or cites one of
+    its politician's known cases. Otherwise it is a rumour when it hedges
+    ("allegedly") or makes claims about investigations or prosecutions
+    ("EACC", "DPP", an unknown case number, or "charged" together with "court").
+    """
+
+    def __init__(
+        self,
+        known_case_numbers: KnownCases = (),
+        official_handles: Optional[Iterable[str]] = None,
+    ):
+        if isinstance(known_case_numbers, Mapping):
+            self.known_case_numbers = {
+                politician_id: frozenset(numbers)
+                for politician_id, numbers in known_case_numbers.items()
+            }
+        else:
+            self.known_case_numbers = {None: frozenset(known_case_numbers)}
+        self.official_handles = (
+            frozenset(handle.lower() for handle in official_handles)
+            if official_handles is not None
+            else _official_handles()
+        )
+        self._pattern = re.compile(
+            rf"(?P<case>\b{CASE_NUMBER}\b)"
+            rf"|\b(?P<rumour>{_alternation(RUMOUR_CUES)})\b"
+            rf"|\b(?P<institution>{_alternation(INSTITUTION_CUES)})\b"
+            rf"|\b(?P<weak>{_alternation(WEAK_INSTITUTION_CUES)})\b",
+            re.IGNORECASE,
+        )
+        # Compiled on first use, once per politician.
+        self._known_patterns: Dict[Optional[str], Optional[Pattern]] = {}
+
+    def _known_pattern(self, politician_id: Optional[str]) -> Optional[Pattern]:
+        if None in self.known_case_numbers:
+            politician_id = None
+        if politician_id not in self._known_patterns:
+            self._known_patterns[politician_id] = _known_case_pattern(
+                self.known_case_numbers.get(politician_id, ())
+            )
+        return self._known_patterns[politician_id]
+
+    def is_official(self, url: str) -> bool:
+        match = _HANDLE.match(url or "")
+        return bool(match) and match.group(1).lower() in self.official_handles
+
+    def is_rumour(self, mention: Dict, politician_id: Optional[str] = None) -> bool:
+        if self.is_official(mention.get("url", "")):
+            return False
+        content = mention.get("content") or ""
+        known = self._known_pattern(politician_id)
+        if known is not None and known.search(content):
+            return False
+        hedged = claims = False
+        weak = set()
+        for match in self._pattern.finditer(content):
+            kind = match.lastgroup
+            if kind == "rumour":
+                hedged = True
+            elif kind == "weak":
+                weak.add(match.group().lower())
+            else:
+                claims = True
+        return hedged or claims or len(weak) > 1
+
+    def classify(
+        self,
+        mentions: Iterable[Dict],
+        politician_ids: Optional[Sequence[Optional[str]]] = None,
+    ) -> List[bool]:
+        if politician_ids is None:
+            return [self.is_rumour(mention) for mention in mentions]
+        return [
+            self.is_rumour(mention, politician_id)
+            for mention, politician_id in zip(mentions, politician_ids)
+        ]
+
+
+# One classifier per pool worker, built once from the initializer arguments.
+_WORKER_CLASSIFIER: Optional[RumourClassifier] = None
+
+
+def _init_worker(known_case_numbers: Dict, official_handles: frozenset):
+    global _WORKER_CLASSIFIER
+    _WORKER_CLASSIFIER = RumourClassifier(known_case_numbers, official_handles)
+
+
+def _classify_chunk(chunk: List[Dict]) -> List[bool]:
+    return _WORKER_CLASSIFIER.classify(chunk, [mention["politicianId"] for mention in chunk])
+
+
+def tag_mentions(
+    mentions: List[Dict],
+    known_case_numbers: KnownCases = (),
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    politician_ids: Optional[Sequence[str]] = None,
+) -> List[Dict]:
+    """
+    Set "isRumour" on every mention, overriding whatever the scraper guessed.
+
+    With ``known_case_numbers`` keyed by politician id, ``politician_ids``
+    names each mention's politician, so only that politician's cases count.
+    Batches larger than one chunk are split across a process pool; the
+    classifier is compiled once per worker, never per mention.
+    """
+    classifier = RumourClassifier(known_case_numbers)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    if workers <= 1 or len(mentions) <= chunk_size:
+        flags = classifier.classify(mentions, politician_ids)
+    else:
+        ids = politician_ids if politician_ids is not None else [None] * len(mentions)
+        # Only the fields the classifier reads are pickled to the workers.
+        slim = [
+            {"url": m.get("url", ""), "content": m.get("content", ""), "politicianId": politician_id}
+            for m, politician_id in zip(mentions, ids)
+        ]
+        chunks = [slim[i : i + chunk_size] for i in range(0, len(slim), chunk_size)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(classifier.known_case_numbers, classifier.official_handles),
+        ) as pool:
+            flags = [flag for chunk_flags in pool.map(_classify_chunk, chunks) for flag in chunk_flags]
+    for mention, flag in zip(mentions, flags):
+        mention["isRumour"] = flag
+    return mentions
+
+
+if __name__ == "__main__":
+    sample = [
+        {
+            "content": "John Doe was seen allegedly bribing voters in the county center.",
+            "url": "https://twitter.com/user/status/1",
+        },
+        {
+            "content": "EACC has officially forwarded the file to the DPP concerning John Doe.",
+            "url": "https://twitter.com/EACCKenya/status/2",
+        },
+        {
+            "content": "Hearing in HCC-42-2024 against John Doe resumes on Monday.",
+            "url": "https://twitter.com/user/status/3",
+        },
+    ]
+    print(tag_mentions(sample, known_case_numbers=["HCC-42-2024"]))
@@ -0,0 +1,227 @@
+import heapq
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Poll intervals in seconds: active politicians approach MIN, quiet ones back off to MAX.
+MIN_INTERVAL = float(os.getenv("SCRAPE_MIN_INTERVAL", str(15 * 60)))
+BASE_INTERVAL = float(os.getenv("SCRAPE_BASE_INTERVAL", str(6 * 3600)))
+MAX_INTERVAL = float(os.getenv("SCRAPE_MAX_INTERVAL", str(7 * 24 * 3600)))
+BACKOFF = 2.0
+# Share of the activity score kept after each scrape, so old bursts fade.
+ACTIVITY_DECAY = 0.5
+# An IEBC clearance change says more than one new tweet.
+CLEARANCE_WEIGHT = 5.0
+CASE_WEIGHT = 3.0
+REQUESTS_PER_HOUR = float(os.getenv("SCRAPE_REQUESTS_PER_HOUR", "600"))
+# Upstream requests one politician scrape costs (judiciary + Twitter).
+REQUESTS_PER_SCRAPE = 2
+STATE_VERSION = 1
+DEFAULT_STATE_PATH = Path(
+    os.getenv(
+        "SCRAPE_SCHEDULE_PATH",
+        str(Path(__file__).resolve().parent.parent / "data" / "scrape_schedule.json"),
+    )
+)
+
+
+@dataclass
+class ScheduleEntry:
+    politician_id: str
+    name: str
+    next_run: float
+    interval: float = BASE_INTERVAL
+    activity: float = 0.0
+    last_run: Optional[float] = None
+    failures: int = 0
+
+
+@dataclass
+class RequestBudget:
+    """
+    Token bucket holding at most one hour of requests, refilled continuously.
+    """
+
+    per_hour: float = REQUESTS_PER_HOUR
+    tokens: float = REQUESTS_PER_HOUR
+    updated: float = 0.0
+
+    def _refill(self, now: float) -> None:
+        if self.updated:
+            elapsed = max(0.0, now - self.updated)
+            self.tokens = min(self.per_hour, self.tokens + elapsed * self.per_hour / 3600)
+        self.updated = now
+
+    def wait_time(self, cost: float, now: float) -> float:
+        """
+        Seconds until ``cost`` requests fit in the budget; 0 when they fit now.
+        """
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0.0
+        return (cost - self.tokens) * 3600 / self.per_hour
+
+    def spend(self, cost: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= cost
+
+
+class ScrapeScheduler:
+    """
+    Persisted priority queue of politicians ordered by their next scrape time.
+
+    After each scrape the interval shrinks with the politician's recent activity
+    (new court cases, new mentions, clearance changes) and doubles after a scrape
+    that found nothing, between MIN_INTERVAL and MAX_INTERVAL. Superseded heap
+    items are skipped lazily instead of being removed from the heap.
+    """
+
+    def __init__(self, path: Path = DEFAULT_STATE_PATH, budget: Optional[RequestBudget] = None):
+        self.path = Path(path)
+        self.budget = budget or RequestBudget()
+        self.entries: Dict[str, ScheduleEntry] = {}
+        self.next_sync = 0.0
+        self._heap: List[Tuple[float, str]] = []
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_STATE_PATH, per_hour: float = REQUESTS_PER_HOUR) -> "ScrapeScheduler":
+        scheduler = cls(path, RequestBudget(per_hour, per_hour))
+        try:
+            with scheduler.path.open("r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+        except FileNotFoundError:
+            return scheduler
+        except ValueError:
+            print(f"Ignoring unreadable scrape schedule at {scheduler.path}")
+            return scheduler
+        if payload.get("version") != STATE_VERSION:
+            return scheduler
+        for item in payload.get("entries", []):
+            scheduler._push(ScheduleEntry(**item))
+        budget = payload.get("budget", {})
+        # A restart must not hand out a fresh hour of requests.
+        scheduler.budget.tokens = min(per_hour, budget.get("tokens", per_hour))
+        scheduler.budget.updated = budget.get("updated", 0.0)
+        scheduler.next_sync = payload.get("nextSync", 0.0)
+        return scheduler
+
+    def save(self) -> None:
+        payload = {
+            "version": STATE_VERSION,
+            "nextSync": self.next_sync,
+            "budget": {"tokens": self.budget.tokens, "updated": self.budget.updated},
+            "entries": [asdict(entry) for entry in self.entries.values()],
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                json.dump(payload, handle, separators=(",", ":"))
+            os.replace(tmp_name, self.path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    def _push(self, entry: ScheduleEntry) -> None:
+        self.entries[entry.politician_id] = entry
+        heapq.heappush(self._heap, (entry.next_run, entry.politician_id))
+
+    def ensure(self, politician_id: str, name: str, now: float) -> None:
+        """
+        Schedule a politician seen for the first time right away.
+        """
+        entry = self.entries.get(politician_id)
+        if entry is None:
+            self._push(ScheduleEntry(politician_id, name, next_run=now))
+        else:
+            entry.name = name
+
+    def bump(self, politician_id: str, now: float) -> None:
+        """
+        Pull a politician forward after an out-of-band change (IEBC clearance status).
+        """
+        entry = self.entries.get(politician_id)
+        if entry is None:
+            return
+        entry.activity += CLEARANCE_WEIGHT
+        entry.interval = MIN_INTERVAL
+        if entry.next_run > now:
+            entry.next_run = now
+            heapq.heappush(self._heap, (now, politician_id))
+
+    def peek(self) -> Optional[ScheduleEntry]:
+        while self._heap:
+            next_run, politician_id = self._heap[0]
+            entry = self.entries.get(politician_id)
+            if entry is not None and entry.next_run == next_run:
+                return entry
+            heapq.heappop(self._heap)
+        return None
+
+    def pop_due(self, now: float) -> Optional[ScheduleEntry]:
+        entry = self.peek()
+        if entry is None or entry.next_run > now:
+            return None
+        heapq.heappop(self._heap)
+        return entry
+
+    def record(
+        self,
+        politician_id: str,
+        now: float,
+        new_cases: int = 0,
+        new_mentions: int = 0,
+        failed: bool = False,
+    ) -> ScheduleEntry:
+        """
+        Reschedule a politician after a scrape, from what that scrape found.
+        """
+        entry = self.entries[politician_id]
+        entry.last_run = now
+        changes = CASE_WEIGHT * new_cases + new_mentions
+        entry.activity = entry.activity * ACTIVITY_DECAY + changes
+        if failed:
+            entry.failures += 1
+            entry.interval = min(MAX_INTERVAL, max(entry.interval, MIN_INTERVAL) * BACKOFF)
+        elif changes:
+            entry.failures = 0
+            entry.interval = max(MIN_INTERVAL, BASE_INTERVAL / (1 + entry.activity))
+        else:
+            entry.failures = 0
+            entry.interval = min(MAX_INTERVAL, max(entry.interval, MIN_INTERVAL) * BACKOFF)
+        entry.next_run = now + entry.interval
+        heapq.heappush(self._heap, (entry.next_run, politician_id))
+        return entry
+
+    def wake_time(self, now: float) -> float:
+        """
+        When the next scrape can start, given both the queue and the request budget.
+        """
+        entry = self.peek()
+        due = entry.next_run if entry is not None else now + MAX_INTERVAL
+        due = min(due, self.next_sync)
+        return max(due, now + self.budget.wait_time(REQUESTS_PER_SCRAPE, now))
+
+
+if __name__ == "__main__":
+    # Simulate one hot and one quiet politician for a day.
+    scheduler = ScrapeScheduler(Path(tempfile.gettempdir()) / "scrape_schedule_demo.json")
+    clock = time.time()
+    scheduler.next_sync = clock + 10 * 24 * 3600
+    scheduler.ensure("hot", "Hot Politician", clock)
+    scheduler.ensure("cold", "Quiet Politician", clock)
+    runs = {"hot": 0, "cold": 0}
+    end = clock + 24 * 3600
+    while True:
+        clock = scheduler.wake_time(clock)
+        if clock > end:
+            break
+        entry = scheduler.pop_due(clock)
+        scheduler.budget.spend(REQUESTS_PER_SCRAPE, clock)
+        runs[entry.politician_id] += 1
+        scheduler.record(entry.politician_id, clock, new_mentions=3 if entry.politician_id == "hot" else 0)
+    print(runs)
@@ -11,6 +11,7 @@ def scrape_twitter_mentions(politician_name: str):
     """
     Mock integration for scraping Twitter/X data using Apify's Twitter scrapers.
     It separates rumoured tweets from verified facts based on simple heuristics or AI tagging (mocked here).
+    main_scraper re-tags "isRumour" in batch with scrapers.rumour_classifier before persisting.
     """
     print(f"Scraping Twitter for mentions of: {politician_name}...")
     
@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .metrics import REGISTRY
+
+ADMISSION_REJECTED = REGISTRY.counter(
+    "signals_admission_rejected_total",
+    "Ingest requests shed by admission control, by reason.",
+)
+INGEST_PENDING = REGISTRY.gauge(
+    "signals_ingest_pending",
+    "Ingest requests admitted and waiting for or holding a write slot.",
+)
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` tokens per second up to ``burst``."""
+
+    def __init__(self, rate: float, burst: float, clock: Callable[[], float]) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = burst
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until one token is available (0 when one is available now)."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self) -> None:
+        self._tokens -= 1
+
+
+@dataclass(frozen=True)
+class Admission:
+    allowed: bool
+    status: int = 200
+    retry_after: int = 0
+    reason: str = ""
+
+
+class IngestAdmission:
+    """Per-client and global rate limits plus a bounded ingest queue.
+
+    Only writes go through here, so reads (/health, /stats) never queue behind
+    a burst of submissions: excess writes get 429 (rate limit) or 503 (queue
+    full / write slot not free in time) with a Retry-After hint instead.
+    A rate of 0 disables that limit.
+    """
+
+    def __init__(
+        self,
+        *,
+        client_rate: float = 5.0,
+        client_burst: float = 10.0,
+        global_rate: float = 100.0,
+        global_burst: float = 200.0,
+        max_pending: int = 32,
+        max_writers: int = 1,
+        max_wait: float = 2.0,
+        max_clients: int = 10_000,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self.max_clients = max_clients
+        self._clock = clock
+        self._global: Optional[TokenBucket] = (
+            TokenBucket(global_rate, global_burst, clock) if global_rate > 0 else None
+        )
+        self._clients: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._writers = threading.BoundedSemaphore(max_writers)
+        self._pending = 0
+
+    @classmethod
+    def from_env(cls) -> "IngestAdmission":
+        def number(name: str, default: float) -> float:
+            return float(os.environ.get(name, default))
+
+        return cls(
+            client_rate=number("SIGNALS_RATE_CLIENT", 5.0),
+            client_burst=number("SIGNALS_RATE_CLIENT_BURST", 10.0),
+            global_rate=number("SIGNALS_RATE_GLOBAL", 100.0),
+            global_burst=number("SIGNALS_RATE_GLOBAL_BURST", 200.0),
+            max_pending=int(number("SIGNALS_INGEST_MAX_PENDING", 32)),
+            max_writers=int(number("SIGNALS_INGEST_MAX_WRITERS", 1)),
+            max_wait=number("SIGNALS_INGEST_MAX_WAIT", 2.0),
+        )
+
+    def _client_bucket(self, client: str) -> Optional[TokenBucket]:
+        if self.client_rate <= 0:
+            return None
+        bucket = self._clients.get(client)
+        if bucket is None:
+            bucket = TokenBucket(self.client_rate, self.client_burst, self._clock)
+            self._clients[client] = bucket
+            if len(self._clients) > self.max_clients:
+                self._clients.popitem(last=False)
+        else:
+            self._clients.move_to_end(client)
+        return bucket
+
+    def _reject(self, status: int, retry_after: float, reason: str) -> Admission:
+        ADMISSION_REJECTED.inc(reason=reason)
+        return Admission(False, status, max(1, math.ceil(retry_after)), reason)
+
+    def admit(self, client: str) -> Admission:
+        """Reserve a write slot for ``client``; call ``release`` once done when allowed."""
+        admission = self._enter(client)
+        if not admission.allowed:
+            return admission
+        if not self._writers.acquire(timeout=self.max_wait):
+            self._leave()
+            return self._reject(503, self.max_wait, "write_timeout")
+        return admission
+
+    async def admit_async(self, client: str) -> Admission:
+        """Like ``admit``, but waits for the write slot on the event loop.
+
+        A waiting submission holds no worker thread, so a burst of ingests
+        cannot starve the threadpool that serves reads.
+        """
+        admission = self._enter(client)
+        if not admission.allowed:
+            return admission
+        deadline = time.monotonic() + self.max_wait
+        delay = 0.001
+        while not self._writers.acquire(blocking=False):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self._leave()
+                return self._reject(503, self.max_wait, "write_timeout")
+            await asyncio.sleep(min(delay, remaining))
+            delay = min(delay * 2, 0.05)
+        return admission
+
+    def _enter(self, client: str) -> Admission:
+        """Rate limits and queue bound; counts the request as pending when it passes."""
+        with self._lock:
+            client_bucket = self._client_bucket(client)
+            if client_bucket is not None:
+                wait = client_bucket.wait_time()
+                if wait > 0:
+                    return self._reject(429, wait, "client_rate")
+            if self._global is not None:
+                wait = self._global.wait_time()
+                if wait > 0:
+                    return self._reject(429, wait, "global_rate")
+            if self._pending >= self.max_pending:
+                return self._reject(503, self.max_wait, "queue_full")
+            if client_bucket is not None:
+                client_bucket.take()
+            if self._global is not None:
+                self._global.take()
+            self._pending += 1
+            INGEST_PENDING.set(self._pending)
+        return Admission(True)
+
+    def release(self) -> None:
+        self._writers.release()
+        self._leave()
+
+    def _leave(self) -> None:
+        with self._lock:
+            self._pending -= 1
+            INGEST_PENDING.set(self._pending)
@@ -5,31 +5,23 @@
 # - It helps with circular imports and improves compatibility with static analysis tools.
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import datetime, timedelta
-from typing import Any, Dict, Iterable, List, Tuple
+from collections import defaultdict, deque
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
 
-from .models import AggregatedStat
-from .normality import evaluate_normality
-from .utils import parse_iso8601
+from .detectors import CONFIGURED_DETECTORS, detector_for
+from .metrics import AGGREGATION_SECONDS, RECORDS_SCANNED
+from .models import AggregatedStat, PartialAggregate
+from .profiling import profiled
+from .sketches import HyperLogLog, field_value, merge_sketch, parse_fields
+from .utils import parse_hour_key, parse_iso8601
+from .windows import MAX_WINDOWS, WindowSpec, resolve_window
 
 TREND_DELTA = 0.1
 BASELINE_WINDOWS = 7
 
 
-def _window_key(timestamp: datetime, window: str) -> str:
-    if window == "day":
-        return timestamp.date().isoformat()
-    if window == "week":
-        week_start = timestamp.date() - timedelta(days=timestamp.weekday())
-        return week_start.isoformat()
-    raise ValueError("Window must be 'day' or 'week'.")
-
-
-def _parse_window_key(window_key: str) -> datetime.date:
-    return datetime.fromisoformat(window_key).date()
-
-
 def _compute_trend(count: int, baseline: float) -> str:
     if baseline <= 0:
         return "up" if count > 0 else "steady"
@@ -40,17 +32,109 @@ def _compute_trend(count: int, baseline: float) -> str:
     return "steady"
 
 
+@profiled("aggregate_signals")
 def aggregate_signals(
     records: Iterable[Dict[str, Any]],
     *,
-    window: str = "day",
+    window: Union[str, WindowSpec] = "day",
+    detectors: Optional[Mapping[str, str]] = None,
+    rollups: Optional[Mapping[Tuple[str, str], int]] = None,
+    distinct: Union[None, str, Sequence[str]] = None,
+    sketches: Optional[Mapping[Tuple[str, str, str], HyperLogLog]] = None,
 ) -> List[AggregatedStat]:
-    """Aggregate only on groups (window + type), never on individuals."""
-    counts: Dict[Tuple[str, str], int] = defaultdict(int)
-    windows = set()
-    types = set()
+    """Aggregate only on groups (window + type), never on individuals.
 
+    ``window`` is a name understood by ``signals.windows.parse_window`` or a
+    ``WindowSpec`` carrying a time zone.
+    ``detectors`` maps signal types (or ``"*"``) to a detector name from
+    ``signals.detectors``; it defaults to the ``SIGNALS_DETECTORS`` setting.
+    ``rollups`` adds pre-counted ``{(hour, type): count}`` groups keyed by UTC
+    hour (``YYYY-MM-DDTHH``) from compaction, sealing or the event index.
+    Windows they cannot be re-bucketed into exactly (sub-hour windows, time
+    zones off UTC by a fraction of an hour, or any but UTC day, week and month
+    for older per-day rollups) raise ``ValueError`` instead of dropping them.
+    ``distinct`` names fields (``eventId``, ``source``) to estimate distinct
+    values for in each group, with ``sketches`` holding the matching
+    ``{(hour, type, field): sketch}`` history for ``rollups``.
+    """
+    spec = resolve_window(window)
+    with AGGREGATION_SECONDS.time(window=spec.name):
+        partial = _count(records, spec, rollups or {}, parse_fields(distinct), sketches or {})
+        return _finalize(partial, detectors)
+
+
+def count_groups(
+    records: Iterable[Dict[str, Any]],
+    *,
+    window: Union[str, WindowSpec] = "day",
+    rollups: Optional[Mapping[Tuple[str, str], int]] = None,
+    distinct: Union[None, str, Sequence[str]] = None,
+    sketches: Optional[Mapping[Tuple[str, str, str], HyperLogLog]] = None,
+) -> PartialAggregate:
+    """Map phase: group counts (and sketches) for this node's data, safe to ship and merge."""
+    return _count(
+        records, resolve_window(window), rollups or {}, parse_fields(distinct), sketches or {}
+    )
+
+
+def merge_partials(partials: Iterable[PartialAggregate]) -> PartialAggregate:
+    """Sum partial counts from several nodes; all partials must share one window and fields."""
+    window: Optional[WindowSpec] = None
+    fields: Tuple[str, ...] = ()
+    counts: Dict[Tuple[int, str], int] = defaultdict(int)
+    merged: Dict[Tuple[int, str, str], HyperLogLog] = {}
+    for partial in partials:
+        if window is None:
+            window = partial.window
+            fields = partial.distinct_fields
+        elif partial.window != window:
+            raise ValueError(
+                f"Cannot merge '{partial.window.key}' partials into '{window.key}'."
+            )
+        elif partial.distinct_fields != fields:
+            raise ValueError("Cannot merge partials with different distinct fields.")
+        for key, count in partial.counts.items():
+            counts[key] += count
+        for key, sketch in partial.sketches.items():
+            merge_sketch(merged, key, sketch)
+    return PartialAggregate(
+        window=window or resolve_window("day"),
+        counts=dict(counts),
+        distinct_fields=fields,
+        sketches=merged,
+    )
+
+
+def finalize_partial(
+    partial: PartialAggregate,
+    *,
+    detectors: Optional[Mapping[str, str]] = None,
+) -> List[AggregatedStat]:
+    """Reduce phase: baselines, trend and status over merged counts."""
+    return _finalize(partial, detectors)
+
+
+def _count(
+    records: Iterable[Dict[str, Any]],
+    window: WindowSpec,
+    rollups: Mapping[Tuple[str, str], int],
+    fields: Tuple[str, ...],
+    history_sketches: Mapping[Tuple[str, str, str], HyperLogLog],
+) -> PartialAggregate:
+    counts: Dict[Tuple[int, str], int] = defaultdict(int)
+    sketches: Dict[Tuple[int, str, str], HyperLogLog] = {}
+
+    bucket_of_key = _history_bucketer(window)
+    for (key, signal_type), count in rollups.items():
+        counts[(bucket_of_key(key), signal_type)] += count
+    for (key, signal_type, name), sketch in history_sketches.items():
+        if name in fields:
+            merge_sketch(sketches, (bucket_of_key(key), signal_type, name), sketch)
+
+    bucket_of = window.bucketer()
+    scanned = 0
     for record in records:
+        scanned += 1
         signal_type = record.get("type")
         timestamp_raw = record.get("timestamp")
         if not signal_type or not timestamp_raw:
@@ -59,34 +143,101 @@ def aggregate_signals(
             timestamp = parse_iso8601(timestamp_raw)
         except ValueError:
             continue
-        window_key = _window_key(timestamp, window)
-        counts[(window_key, signal_type)] += 1
-        windows.add(window_key)
-        types.add(signal_type)
+        bucket = bucket_of(timestamp)
+        counts[(bucket, signal_type)] += 1
+        for name in fields:
+            value = field_value(record, name)
+            if value is None:
+                continue
+            sketch = sketches.get((bucket, signal_type, name))
+            if sketch is None:
+                sketch = sketches[(bucket, signal_type, name)] = HyperLogLog()
+            sketch.add(value)
+    RECORDS_SCANNED.inc(scanned, window=window.name)
+    return PartialAggregate(
+        window=window,
+        counts=dict(counts),
+        distinct_fields=fields,
+        sketches=sketches,
+    )
+
+
+def _history_bucketer(window: WindowSpec) -> Callable[[str], int]:
+    """Bucket of a pre-counted history key: a UTC hour, or a UTC day in older rollups."""
 
-    sorted_windows = sorted(windows)
-    sorted_types = sorted(types)
+    @lru_cache(maxsize=None)
+    def bucket_of(key: str) -> int:
+        if len(key) == 10:
+            # A UTC day straddles two local dates and holds many sub-day windows.
+            if not window.calendar or window.tz != "UTC":
+                raise ValueError(
+                    f"History counted per UTC day (from before hourly rollups) cannot fill "
+                    f"'{window.key}' windows; use a UTC day, week or month window."
+                )
+            return window.bucket_of_day(date.fromisoformat(key))
+        return window.bucket_of_hour(parse_hour_key(key))
+
+    return bucket_of
+
+
+def _finalize(
+    partial: PartialAggregate,
+    detectors: Optional[Mapping[str, str]],
+) -> List[AggregatedStat]:
+    if detectors is None:
+        detectors = CONFIGURED_DETECTORS
+    counts = partial.counts
+    if not counts:
+        return []
+    first = min(bucket for bucket, _ in counts)
+    last = max(bucket for bucket, _ in counts)
+    if last - first >= MAX_WINDOWS:
+        raise ValueError(
+            f"{last - first + 1} '{partial.window.key}' windows exceed the limit of {MAX_WINDOWS}; "
+            "use a coarser window."
+        )
+    # Buckets are consecutive integers: empty windows in between count as zero.
+    windows = [(bucket, partial.window.start(bucket)) for bucket in range(first, last + 1)]
+    sorted_types = sorted({signal_type for _, signal_type in counts})
     results: List[AggregatedStat] = []
 
     for signal_type in sorted_types:
-        series = [
-            (window_key, counts.get((window_key, signal_type), 0))
-            for window_key in sorted_windows
-        ]
-        for index, (window_key, count) in enumerate(series):
-            history = [value for _, value in series[max(0, index - BASELINE_WINDOWS) : index]]
-            baseline = sum(history) / len(history) if history else 0.0
+        detector = detector_for(signal_type, detectors)
+        history: Deque[int] = deque()
+        history_total = 0
+        for bucket, window_start in windows:
+            count = counts.get((bucket, signal_type), 0)
+            baseline = history_total / len(history) if history else 0.0
             trend = _compute_trend(count, baseline)
-            status = evaluate_normality(count, baseline)
+            status = detector.update(window_start, count, baseline)
+            history.append(count)
+            history_total += count
+            if len(history) > BASELINE_WINDOWS:
+                history_total -= history.popleft()
             results.append(
                 AggregatedStat(
-                    window=_parse_window_key(window_key),
+                    window=window_start,
                     type=signal_type,
                     count=count,
                     baseline=baseline,
                     trend=trend,
                     status=status,
+                    distinct=_distinct(partial, bucket, signal_type),
                 )
             )
 
     return results
+
+
+def _distinct(
+    partial: PartialAggregate,
+    bucket: int,
+    signal_type: str,
+) -> Optional[Dict[str, int]]:
+    if not partial.distinct_fields:
+        return None
+    estimates: Dict[str, int] = {}
+    for name in partial.distinct_fields:
+        sketch = partial.sketches.get((bucket, signal_type, name))
+        estimates[name] = round(sketch.estimate()) if sketch is not None else 0
+    return estimates
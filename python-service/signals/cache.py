@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import mmap
+import multiprocessing
+import struct
+from typing import Dict, Iterable, Optional
+
+from .metrics import CACHE_REQUESTS
+
+# Each slot starts with (generation, body length) followed by the body bytes.
+_HEADER = struct.Struct("<QQ")
+DEFAULT_SLOT_SIZE = 4 * 1024 * 1024
+
+
+class SharedStatsCache:
+    """Serialized /stats bodies kept in an anonymous shared mmap.
+
+    Create the cache before forking workers: the mapping and its lock are
+    inherited, so one worker's aggregation result is reused by all of them
+    until the storage generation changes.
+    """
+
+    def __init__(
+        self,
+        keys: Iterable[str] = ("day", "week", "month"),
+        *,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+    ) -> None:
+        self._slot_size = slot_size
+        self._offsets: Dict[str, int] = {}
+        for index, key in enumerate(keys):
+            self._offsets[key] = index * slot_size
+        self._buffer = mmap.mmap(-1, max(1, len(self._offsets)) * slot_size)
+        self._lock = multiprocessing.Lock()
+
+    def get(self, key: str, generation: int) -> Optional[bytes]:
+        offset = self._offsets.get(key)
+        if offset is None:
+            # Not a cached key (time zones, sub-day windows, distinct); not a miss either.
+            return None
+        with self._lock:
+            stored_generation, length = _HEADER.unpack_from(self._buffer, offset)
+            if length == 0 or stored_generation != generation:
+                CACHE_REQUESTS.inc(cache="stats", result="miss")
+                return None
+            start = offset + _HEADER.size
+            body = self._buffer[start : start + length]
+        CACHE_REQUESTS.inc(cache="stats", result="hit")
+        return body
+
+    def put(self, key: str, generation: int, body: bytes) -> bool:
+        offset = self._offsets.get(key)
+        if offset is None or len(body) > self._slot_size - _HEADER.size:
+            return False
+        with self._lock:
+            start = offset + _HEADER.size
+            self._buffer[start : start + len(body)] = body
+            _HEADER.pack_into(self._buffer, offset, generation, len(body))
+        return True
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from .charts import CHART_NAMES, chart_data, render_chart
+from .metrics import CACHE_REQUESTS
+
+CONTENT_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+DEFAULT_MAX_ENTRIES = 32
+RENDER_TIMEOUT = 30.0
+
+ChartKey = Tuple[str, str, str, int]
+
+
+class ChartCache:
+    """Rendered chart images keyed by (name, format, window, data generation).
+
+    Rendering runs on a single background thread (pyplot is not thread-safe),
+    so request threads only wait on a future. Concurrent requests for the same
+    key share one render.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES) -> None:
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[ChartKey, bytes]" = OrderedDict()
+        self._inflight: Dict[ChartKey, Future] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="chart-render")
+
+    def get(
+        self,
+        name: str,
+        fmt: str,
+        window: str,
+        generation: int,
+        load_stats: Callable[[], Iterable[Any]],
+    ) -> Future:
+        """Return a future for the image bytes; already resolved on a cache hit."""
+        key = (name, fmt, window, generation)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                CACHE_REQUESTS.inc(cache="charts", result="hit")
+                done: Future = Future()
+                done.set_result(cached)
+                return done
+            CACHE_REQUESTS.inc(cache="charts", result="miss")
+            future = self._inflight.get(key)
+            # A future cancelled while still queued never runs _render to clear itself.
+            if future is None or future.done():
+                future = self._executor.submit(self._render, key, load_stats)
+                self._inflight[key] = future
+            return future
+
+    def _render(self, key: ChartKey, load_stats: Callable[[], Iterable[Any]]) -> bytes:
+        name, fmt, _, _ = key
+        try:
+            body = render_chart(name, chart_data(load_stats()), fmt)
+        except BaseException:
+            with self._lock:
+                self._inflight.pop(key, None)
+            raise
+        with self._lock:
+            self._entries[key] = body
+            self._inflight.pop(key, None)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return body
+
+
+def parse_chart_file(filename: str) -> Tuple[str, str]:
+    """Split ``counts_by_window.png`` into a known chart name and format."""
+    name, _, fmt = filename.rpartition(".")
+    if name not in CHART_NAMES or fmt not in CONTENT_TYPES:
+        raise ValueError(
+            f"Unknown chart '{filename}'. Expected one of {', '.join(CHART_NAMES)} "
+            "with a .png or .svg extension."
+        )
+    return name, fmt
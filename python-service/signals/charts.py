@@ -1,10 +1,48 @@
 from __future__ import annotations
 
+import hashlib
+import importlib.util
+import io
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
+from . import svgcharts
 from .models import AggregatedStat
 
+FORMATS = ("png", "svg")
+CHART_NAMES = ("counts_by_window", "stacked_by_type", "totals_by_type")
+MANIFEST_NAME = ".charts-manifest.json"
+# Below this many bars, process start-up costs more than rendering serially.
+PARALLEL_MIN_CELLS = 5_000
+# Laying out hundreds of rotated tick labels dominates render time and is unreadable.
+MAX_WINDOW_LABELS = 30
+
+
+@dataclass(frozen=True)
+class ChartData:
+    windows: List[str]
+    types: List[str]
+    matrix: List[List[int]]
+
+    def digest(self, renderer: str) -> str:
+        payload = json.dumps(
+            [renderer, self.windows, self.types, self.matrix],
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ChartUnavailableError(RuntimeError):
+    """Raised when a chart format needs a renderer that is not installed."""
+
+
+def has_matplotlib() -> bool:
+    return importlib.util.find_spec("matplotlib") is not None
+
 
 def _stats_to_dicts(stats: Iterable[Any]) -> List[Dict[str, Any]]:
     converted: List[Dict[str, Any]] = []
@@ -16,7 +54,7 @@ def _stats_to_dicts(stats: Iterable[Any]) -> List[Dict[str, Any]]:
     return converted
 
 
-def _build_matrix(stats: List[Dict[str, Any]]):
+def _build_matrix(stats: List[Dict[str, Any]]) -> ChartData:
     windows = sorted({str(item["window"]) for item in stats})
     types = sorted({item["type"] for item in stats})
     counts = {
@@ -27,73 +65,188 @@ def _build_matrix(stats: List[Dict[str, Any]]):
         [counts.get((window, signal_type), 0) for signal_type in types]
         for window in windows
     ]
-    return windows, types, matrix
+    return ChartData(windows, types, matrix)
+
+
+def _load_pyplot():
+    import matplotlib
+
+    # Never pick an interactive/GUI backend: charts are only written to files.
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def _set_window_ticks(axes: Any, windows: List[str]) -> None:
+    step = max(1, -(-len(windows) // MAX_WINDOW_LABELS))
+    positions = range(0, len(windows), step)
+    axes.set_xticks(list(positions), [windows[index] for index in positions])
+
+
+def _draw_chart(name: str, data: ChartData):
+    import numpy as np
+
+    plt = _load_pyplot()
+    matrix = np.asarray(data.matrix, dtype=np.int64).reshape(len(data.windows), len(data.types))
+    positions = np.arange(len(data.windows))
+
+    if name == "counts_by_window":
+        figure, axes = plt.subplots(figsize=(10, 4))
+        axes.plot(positions, matrix.sum(axis=1), marker="o")
+        _set_window_ticks(axes, data.windows)
+        axes.set_title("Total Signals by Window")
+        axes.set_xlabel("Window")
+    elif name == "stacked_by_type":
+        figure, axes = plt.subplots(figsize=(10, 4))
+        bottoms = np.zeros_like(matrix)
+        bottoms[:, 1:] = np.cumsum(matrix, axis=1)[:, :-1]
+        for index, signal_type in enumerate(data.types):
+            axes.bar(positions, matrix[:, index], bottom=bottoms[:, index], label=signal_type)
+        _set_window_ticks(axes, data.windows)
+        axes.set_title("Stacked Signals by Type")
+        axes.set_xlabel("Window")
+        axes.legend()
+    elif name == "totals_by_type":
+        figure, axes = plt.subplots(figsize=(8, 4))
+        axes.bar(data.types, matrix.sum(axis=0))
+        axes.set_title("Totals by Signal Type")
+        axes.set_xlabel("Signal Type")
+    else:
+        raise ValueError(f"Unknown chart '{name}'.")
+
+    axes.set_ylabel("Count")
+    plt.setp(axes.get_xticklabels(), rotation=30 if name == "totals_by_type" else 45, ha="right")
+    figure.tight_layout()
+    return plt, figure
+
+
+def _render_chart(name: str, data: ChartData, path: Path) -> Path:
+    """Render one chart to ``path``; top-level so worker processes can run it."""
+    plt, figure = _draw_chart(name, data)
+    try:
+        figure.savefig(path)
+    finally:
+        plt.close(figure)
+    return path
+
 
+def _svg_chart(name: str, data: ChartData) -> str:
+    if name == "counts_by_window":
+        return svgcharts.counts_by_window(data.windows, [sum(row) for row in data.matrix])
+    if name == "stacked_by_type":
+        return svgcharts.stacked_by_type(data.windows, data.types, data.matrix)
+    if name == "totals_by_type":
+        totals = [sum(row[index] for row in data.matrix) for index in range(len(data.types))]
+        return svgcharts.totals_by_type(data.types, totals)
+    raise ValueError(f"Unknown chart '{name}'.")
 
-def render_basic_charts(stats: Iterable[Any], output_dir: Path) -> List[Path]:
+
+def chart_data(stats: Iterable[Any]) -> ChartData:
+    return _build_matrix(_stats_to_dicts(stats))
+
+
+def render_chart(name: str, data: ChartData, fmt: str) -> bytes:
+    """Render one chart in memory as PNG or SVG.
+
+    SVG falls back to the pure-Python renderer without matplotlib; PNG raises
+    ``ChartUnavailableError`` in that case.
+    """
+    if name not in CHART_NAMES:
+        raise ValueError(f"Unknown chart '{name}'.")
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported chart format '{fmt}'.")
+    if not has_matplotlib():
+        if fmt == "svg":
+            return _svg_chart(name, data).encode("utf-8")
+        raise ChartUnavailableError("PNG charts require matplotlib; request .svg instead.")
+
+    plt, figure = _draw_chart(name, data)
+    buffer = io.BytesIO()
+    try:
+        figure.savefig(buffer, format=fmt)
+    finally:
+        plt.close(figure)
+    return buffer.getvalue()
+
+
+def _read_manifest(output_dir: Path) -> Dict[str, Any]:
+    try:
+        with (output_dir / MANIFEST_NAME).open("r", encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(output_dir: Path, digest: str, outputs: List[Path]) -> None:
+    with (output_dir / MANIFEST_NAME).open("w", encoding="utf-8") as handle:
+        json.dump({"digest": digest, "files": [path.name for path in outputs]}, handle)
+
+
+def _cached_outputs(output_dir: Path, digest: str) -> Optional[List[Path]]:
+    manifest = _read_manifest(output_dir)
+    if manifest.get("digest") != digest:
+        return None
+    outputs = [output_dir / name for name in manifest.get("files", [])]
+    if not outputs or not all(path.exists() for path in outputs):
+        return None
+    return outputs
+
+
+def _render_svg_files(data: ChartData, output_dir: Path) -> List[Path]:
+    outputs: List[Path] = []
+    for name in CHART_NAMES:
+        path = output_dir / f"{name}.svg"
+        path.write_text(_svg_chart(name, data), encoding="utf-8")
+        outputs.append(path)
+    return outputs
+
+
+def render_basic_charts(
+    stats: Iterable[Any],
+    output_dir: Path,
+    *,
+    parallel: Optional[bool] = None,
+) -> List[Path]:
+    """Write the basic charts, reusing the previous files when the input is unchanged.
+
+    ``parallel=None`` renders in worker processes only for large inputs.
+    """
     output_dir.mkdir(parents=True, exist_ok=True)
     stats_list = _stats_to_dicts(stats)
     if not stats_list:
         return []
 
-    windows, types, matrix = _build_matrix(stats_list)
-    totals = [sum(row) for row in matrix]
-    outputs: List[Path] = []
+    data = _build_matrix(stats_list)
+    use_matplotlib = has_matplotlib()
+    digest = data.digest("matplotlib" if use_matplotlib else "svg")
+    cached = _cached_outputs(output_dir, digest)
+    if cached is not None:
+        return cached
 
-    try:
-        import matplotlib.pyplot as plt
-
-        plt.figure(figsize=(10, 4))
-        plt.plot(windows, totals, marker="o")
-        plt.title("Total Signals by Window")
-        plt.xlabel("Window")
-        plt.ylabel("Count")
-        plt.xticks(rotation=45, ha="right")
-        plt.tight_layout()
-        line_path = output_dir / "counts_by_window.png"
-        plt.savefig(line_path)
-        plt.close()
-        outputs.append(line_path)
-
-        plt.figure(figsize=(10, 4))
-        bottoms = [0] * len(windows)
-        for index, signal_type in enumerate(types):
-            values = [row[index] for row in matrix]
-            plt.bar(windows, values, bottom=bottoms, label=signal_type)
-            bottoms = [bottoms[i] + values[i] for i in range(len(values))]
-        plt.title("Stacked Signals by Type")
-        plt.xlabel("Window")
-        plt.ylabel("Count")
-        plt.xticks(rotation=45, ha="right")
-        plt.legend()
-        plt.tight_layout()
-        stacked_path = output_dir / "stacked_by_type.png"
-        plt.savefig(stacked_path)
-        plt.close()
-        outputs.append(stacked_path)
-
-        plt.figure(figsize=(8, 4))
-        type_totals = [sum(row[index] for row in matrix) for index in range(len(types))]
-        plt.bar(types, type_totals)
-        plt.title("Totals by Signal Type")
-        plt.xlabel("Signal Type")
-        plt.ylabel("Count")
-        plt.xticks(rotation=30, ha="right")
-        plt.tight_layout()
-        totals_path = output_dir / "totals_by_type.png"
-        plt.savefig(totals_path)
-        plt.close()
-        outputs.append(totals_path)
-
-        return outputs
-    except Exception:
-        ascii_path = output_dir / "charts.txt"
-        with ascii_path.open("w", encoding="utf-8") as handle:
-            handle.write("Total signals by window\n")
-            for window, total in zip(windows, totals):
-                handle.write(f"{window} | {'#' * total} ({total})\n")
-            handle.write("\nSignals by type per window\n")
-            for window, row in zip(windows, matrix):
-                counts = ", ".join(f"{types[i]}={row[i]}" for i in range(len(types)))
-                handle.write(f"{window} | {counts}\n")
-        return [ascii_path]
+    outputs: Optional[List[Path]] = None
+    if use_matplotlib:
+        paths = [output_dir / f"{name}.png" for name in CHART_NAMES]
+        if parallel is None:
+            parallel = len(data.windows) * max(1, len(data.types)) >= PARALLEL_MIN_CELLS
+        try:
+            if parallel:
+                with ProcessPoolExecutor(max_workers=len(CHART_NAMES)) as pool:
+                    outputs = list(
+                        pool.map(_render_chart, CHART_NAMES, [data] * len(paths), paths)
+                    )
+            else:
+                outputs = [
+                    _render_chart(name, data, path) for name, path in zip(CHART_NAMES, paths)
+                ]
+        except (ImportError, OSError) as exc:
+            # A broken matplotlib install or an unwritable PNG; any other error is a bug.
+            print(f"matplotlib charts failed ({exc}); writing SVG instead.", file=sys.stderr)
+            outputs = None
+    if outputs is None:
+        outputs = _render_svg_files(data, output_dir)
+        digest = data.digest("svg")
+
+    _write_manifest(output_dir, digest, outputs)
+    return outputs
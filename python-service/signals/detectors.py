@@ -0,0 +1,234 @@
+"""Streaming "Is This Normal?" detectors.
+
+Each detector sees one signal type's series window by window and returns a
+status in O(1) per window, so they run inside the aggregation pass. Every
+detector still only looks at group counts, never at individual records.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from collections import deque
+from datetime import date
+from typing import Callable, Deque, Dict, List, Mapping, Optional
+
+from .normality import evaluate_normality
+
+NORMAL = "Normal"
+NEEDS_REVIEW = "Needs Review"
+DEFAULT_DETECTOR = "threshold"
+
+
+class Detector:
+    def update(self, window: date, count: int, baseline: float) -> str:
+        """Score ``count`` for ``window`` and then absorb it into the detector state."""
+        raise NotImplementedError
+
+
+class ThresholdDetector(Detector):
+    """The original rule: flag counts above ``threshold`` x the rolling baseline."""
+
+    def __init__(self, threshold: float = 2.0, min_count_for_review: int = 3) -> None:
+        self.threshold = threshold
+        self.min_count_for_review = min_count_for_review
+
+    def update(self, window: date, count: int, baseline: float) -> str:
+        return evaluate_normality(
+            count,
+            baseline,
+            threshold=self.threshold,
+            min_count_for_review=self.min_count_for_review,
+        )
+
+
+class RollingZScoreDetector(Detector):
+    """Z-score against the last ``size`` windows, with sliding Welford mean/variance.
+
+    The standard deviation is floored at ``min_std`` so a flat history (such as
+    a run of empty windows) does not turn every small increase into a spike.
+    """
+
+    def __init__(
+        self,
+        size: int = 7,
+        z_limit: float = 3.0,
+        min_history: int = 3,
+        min_std: float = 1.0,
+    ) -> None:
+        self.size = size
+        self.z_limit = z_limit
+        self.min_history = min_history
+        self.min_std = min_std
+        self._values: Deque[int] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _add(self, value: float) -> None:
+        n = len(self._values)
+        delta = value - self._mean
+        self._mean += delta / n
+        self._m2 += delta * (value - self._mean)
+
+    def _remove(self, value: float) -> None:
+        n = len(self._values)
+        if n == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / n
+        self._m2 = max(0.0, self._m2 - delta * (value - self._mean))
+
+    def update(self, window: date, count: int, baseline: float) -> str:
+        status = NORMAL
+        n = len(self._values)
+        if n >= self.min_history:
+            std = math.sqrt(self._m2 / (n - 1)) if n > 1 else 0.0
+            if (count - self._mean) / max(std, self.min_std) > self.z_limit:
+                status = NEEDS_REVIEW
+
+        self._values.append(count)
+        self._add(count)
+        if len(self._values) > self.size:
+            self._remove(self._values.popleft())
+        return status
+
+
+class EwmaDetector(Detector):
+    """EWMA control chart: flag when the smoothed count leaves the upper control limit."""
+
+    def __init__(self, alpha: float = 0.3, limit: float = 3.0, warmup: int = 3) -> None:
+        self.alpha = alpha
+        self.limit = limit
+        self.warmup = warmup
+        self._seen = 0
+        self._mean = 0.0
+        self._variance = 0.0
+        self._statistic = 0.0
+
+    def update(self, window: date, count: int, baseline: float) -> str:
+        status = NORMAL
+        if self._seen == 0:
+            self._mean = float(count)
+            self._statistic = float(count)
+        else:
+            statistic = self.alpha * count + (1 - self.alpha) * self._statistic
+            sigma = math.sqrt(self._variance * self.alpha / (2 - self.alpha))
+            if self._seen >= self.warmup and statistic > self._mean + self.limit * max(sigma, 0.5):
+                status = NEEDS_REVIEW
+            self._statistic = statistic
+            # In-control parameters follow the raw series, so one spike does not mask the next.
+            delta = count - self._mean
+            self._mean += self.alpha * delta
+            self._variance = (1 - self.alpha) * (self._variance + self.alpha * delta * delta)
+        self._seen += 1
+        return status
+
+
+class SeasonalDetector(Detector):
+    """Compare each window with the running mean of the same weekday.
+
+    Until a weekday has been seen once, the plain rolling baseline is used.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 2.0,
+        min_count_for_review: int = 3,
+        seasons: int = 4,
+    ) -> None:
+        self.threshold = threshold
+        self.min_count_for_review = min_count_for_review
+        self.alpha = 1.0 / seasons
+        self._baselines: Dict[int, float] = {}
+
+    def update(self, window: date, count: int, baseline: float) -> str:
+        weekday = window.weekday()
+        seasonal = self._baselines.get(weekday)
+        status = evaluate_normality(
+            count,
+            baseline if seasonal is None else seasonal,
+            threshold=self.threshold,
+            min_count_for_review=self.min_count_for_review,
+        )
+        if seasonal is None:
+            self._baselines[weekday] = float(count)
+        else:
+            self._baselines[weekday] = seasonal + self.alpha * (count - seasonal)
+        return status
+
+
+class CusumDetector(Detector):
+    """One-sided CUSUM on standardized counts; catches sustained upward drifts."""
+
+    def __init__(self, k: float = 0.5, h: float = 4.0, min_history: int = 3) -> None:
+        self.k = k
+        self.h = h
+        self.min_history = min_history
+        self._n = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._sum = 0.0
+
+    def update(self, window: date, count: int, baseline: float) -> str:
+        status = NORMAL
+        if self._n >= self.min_history:
+            std = math.sqrt(self._m2 / (self._n - 1)) or 1.0
+            self._sum = max(0.0, self._sum + (count - self._mean) / std - self.k)
+            if self._sum > self.h:
+                status = NEEDS_REVIEW
+                self._sum = 0.0
+
+        self._n += 1
+        delta = count - self._mean
+        self._mean += delta / self._n
+        self._m2 += delta * (count - self._mean)
+        return status
+
+
+DETECTORS: Dict[str, Callable[[], Detector]] = {
+    "threshold": ThresholdDetector,
+    "zscore": RollingZScoreDetector,
+    "ewma": EwmaDetector,
+    "seasonal": SeasonalDetector,
+    "cusum": CusumDetector,
+}
+
+
+def build_detector(name: str) -> Detector:
+    try:
+        return DETECTORS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown detector '{name}'. Choose from: {', '.join(sorted(DETECTORS))}."
+        ) from None
+
+
+def parse_detector_spec(spec: Optional[str]) -> Dict[str, str]:
+    """Parse ``"sudden_score_spikes=zscore,*=ewma"`` into a type -> detector mapping."""
+    selection: Dict[str, str] = {}
+    for item in (spec or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        signal_type, separator, name = item.partition("=")
+        if not separator:
+            signal_type, name = "*", signal_type
+        name = name.strip()
+        if name not in DETECTORS:
+            build_detector(name)
+        selection[signal_type.strip()] = name
+    return selection
+
+
+def detector_for(signal_type: str, selection: Mapping[str, str]) -> Detector:
+    return build_detector(selection.get(signal_type) or selection.get("*") or DEFAULT_DETECTOR)
+
+
+def available_detectors() -> List[str]:
+    return sorted(DETECTORS)
+
+
+# Deployment-wide default, e.g. SIGNALS_DETECTORS="sudden_score_spikes=zscore,*=threshold".
+CONFIGURED_DETECTORS = parse_detector_spec(os.environ.get("SIGNALS_DETECTORS"))
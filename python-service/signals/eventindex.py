@@ -0,0 +1,203 @@
+"""Secondary index from ``context.eventId`` to per-hour, per-type counts.
+
+The index keeps a snapshot next to the signals file, taken whenever storage
+rewrites it, and catches up by reading WAL frames appended since. A lookup
+therefore costs the new frames plus O(1), never a scan of the whole history.
+Counts survive compaction and sealing; a rebuild from scratch sees the raw
+signals file, sealed partitions and the WAL, but not compacted rollups. Snapshots taken before hourly counts hold UTC-day
+keys, which only serve UTC day, week and month windows.
+
+At most ``max_events`` distinct eventIds are kept; lookups for an event
+that may have been dropped by that cap return ``None``. Only counts are
+indexed: stats are reported per group, never per record.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import wal
+from .utils import hour_key, parse_iso8601
+
+ENABLED = os.environ.get("SIGNALS_EVENT_INDEX", "1") != "0"
+MAX_EVENTS = int(os.environ.get("SIGNALS_EVENT_INDEX_MAX_EVENTS", "20000"))
+SNAPSHOT_VERSION = 1
+
+# {(UTC hour key, type): count}
+HourCounts = Dict[Tuple[str, str], int]
+
+
+@dataclass
+class EventIndex:
+    max_events: int = MAX_EVENTS
+    counts: Dict[str, HourCounts] = field(default_factory=dict)
+    dropped_events: int = 0
+
+    def add(self, record: Dict[str, Any]) -> None:
+        context = record.get("context")
+        event_id = context.get("eventId") if isinstance(context, dict) else None
+        signal_type = record.get("type")
+        if not event_id or not signal_type:
+            return
+        try:
+            hour = hour_key(parse_iso8601(record["timestamp"]))
+        except (KeyError, TypeError, ValueError):
+            return
+        counts = self.counts.get(event_id)
+        if counts is None:
+            if len(self.counts) >= self.max_events:
+                self.dropped_events += 1
+                return
+            counts = self.counts[event_id] = defaultdict(int)
+        counts[(hour, signal_type)] += 1
+
+    def lookup(self, event_id: str) -> Optional[HourCounts]:
+        """Counts for ``event_id``; ``None`` when it may have been dropped by the cap."""
+        counts = self.counts.get(event_id)
+        if counts is not None:
+            return dict(counts)
+        return None if self.dropped_events else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "maxEvents": self.max_events,
+            "droppedEvents": self.dropped_events,
+            "events": {
+                event_id: {
+                    "counts": [[key, kind, count] for (key, kind), count in counts.items()],
+                }
+                for event_id, counts in self.counts.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "EventIndex":
+        # Older snapshots also carry record offsets; only the counts are read.
+        index = cls(
+            max_events=payload["maxEvents"],
+            dropped_events=payload["droppedEvents"],
+        )
+        for event_id, entry in payload["events"].items():
+            counts: HourCounts = defaultdict(int)
+            for key, signal_type, count in entry["counts"]:
+                counts[(key, signal_type)] = count
+            index.counts[event_id] = counts
+        return index
+
+
+@dataclass
+class _Cached:
+    index: EventIndex
+    base: Optional[List[int]]
+    wal_inode: Optional[int]
+    wal_offset: int
+
+
+_CACHE: Dict[str, _Cached] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def index_path(data_path: Path) -> Path:
+    return data_path.with_name(data_path.name + ".events.json")
+
+
+def _identity(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_ino, stat.st_size, stat.st_mtime_ns]
+
+
+def _wal_state(data_path: Path) -> Tuple[Optional[int], int]:
+    try:
+        stat = wal.wal_path(data_path).stat()
+    except FileNotFoundError:
+        return None, 0
+    return stat.st_ino, stat.st_size
+
+
+def _read_snapshot(data_path: Path, base: Optional[List[int]]) -> Optional[EventIndex]:
+    try:
+        with index_path(data_path).open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if payload.get("version") != SNAPSHOT_VERSION or payload.get("base") != base:
+        return None
+    try:
+        return EventIndex.from_dict(payload["index"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _rebuild(data_path: Path) -> EventIndex:
+    # segments imports storage, which imports this module.
+    from .segments import iter_segment_signals
+
+    index = EventIndex()
+    for record in iter_segment_signals(data_path):
+        index.add(record)
+    if data_path.exists():
+        with data_path.open("r", encoding="utf-8") as handle:
+            records = json.load(handle)
+        for record in records if isinstance(records, list) else []:
+            if isinstance(record, dict):
+                index.add(record)
+    return index
+
+
+def _current(data_path: Path) -> EventIndex:
+    """Bring the cached index up to date; called with ``_CACHE_LOCK`` held."""
+    key = str(data_path)
+    base = _identity(data_path)
+    wal_inode, wal_size = _wal_state(data_path)
+    cached = _CACHE.get(key)
+    if (
+        cached is None
+        or cached.base != base
+        or cached.wal_inode not in (None, wal_inode)
+        or wal_size < cached.wal_offset
+    ):
+        index = _read_snapshot(data_path, base) or _rebuild(data_path)
+        cached = _CACHE[key] = _Cached(index, base, wal_inode, 0)
+    if wal_size > cached.wal_offset:
+        records, end = wal.scan(wal.wal_path(data_path), cached.wal_offset)
+        for record in records:
+            cached.index.add(record)
+        cached.wal_offset = end
+        cached.wal_inode = wal_inode
+    return cached.index
+
+
+def lookup(data_path: Path, event_id: str) -> Optional[HourCounts]:
+    """Per-hour, per-type counts for ``event_id``; the caller holds the storage lock."""
+    with _CACHE_LOCK:
+        return _current(data_path).lookup(event_id)
+
+
+def current_index(data_path: Path) -> EventIndex:
+    """Index covering the data about to be rewritten; the caller holds the exclusive lock."""
+    with _CACHE_LOCK:
+        return _current(data_path)
+
+
+def encode_snapshot(data_path: Path, index: EventIndex) -> bytes:
+    """Re-point ``index`` at a freshly rewritten signals file.
+
+    Returns the snapshot for the caller to write next to the signals file.
+    """
+    base = _identity(data_path)
+    wal_inode, _ = _wal_state(data_path)
+    with _CACHE_LOCK:
+        _CACHE[str(data_path)] = _Cached(index, base, wal_inode, 0)
+    return json.dumps(
+        {"version": SNAPSHOT_VERSION, "base": base, "index": index.to_dict()},
+        separators=(",", ":"),
+    ).encode("utf-8")
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .storage import append_signals
+from .validation import SignalValidator
+
+FORMATS = ("json", "jsonl", "csv")
+DEFAULT_CHUNK_SIZE = 5_000
+_READ_SIZE = 1 << 20
+_WHITESPACE = re.compile(r"\s*")
+# Longest partial token a read can cut off: a \uXXXX escape or a literal like "false".
+_LOOKAHEAD = 6
+
+Row = Tuple[int, Any]
+Reject = Dict[str, Any]
+
+
+@dataclass
+class ImportSummary:
+    rows: int = 0
+    accepted: int = 0
+    rejected: int = 0
+    rejects_path: Optional[Path] = None
+
+
+@dataclass(frozen=True)
+class _Unparseable:
+    error: str
+
+
+def detect_format(path: Path) -> str:
+    suffix = path.suffix.lower()
+    if suffix in {".jsonl", ".ndjson"}:
+        return "jsonl"
+    if suffix == ".csv":
+        return "csv"
+    if suffix == ".json":
+        return "json"
+    raise ValueError(f"Cannot infer import format from '{path.name}'; pass --format.")
+
+
+def _may_be_truncated(exc: json.JSONDecodeError, buffer_end: int) -> bool:
+    """Whether more input could still make the value that failed to decode valid."""
+    if exc.msg.startswith("Unterminated string"):
+        return True
+    # A literal or escape cut short by the read ("tru", \u00) fails just before the end.
+    return exc.pos + _LOOKAHEAD >= buffer_end
+
+
+def _iter_json_array(handle: Any) -> Iterator[Any]:
+    """Yield the elements of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    raw = handle.read(_READ_SIZE)
+    buffer = raw.lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("JSON import file must contain a top-level list.")
+    # Characters already dropped from the front of the buffer, for error offsets.
+    consumed = len(raw) - len(buffer)
+    position = 1
+    eof = False
+    # After "[" or "," a value must follow; after a value, "," or "]".
+    expect_value = True
+    items = 0
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position == len(buffer):
+            if eof:
+                raise ValueError("JSON import file ends before the closing ']'.")
+            chunk = handle.read(_READ_SIZE)
+            eof = not chunk
+            consumed += position
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        char = buffer[position]
+        if not expect_value:
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(
+                    f"Expected ',' or ']' after JSON import item {items} "
+                    f"(char {consumed + position}), found {char!r}."
+                )
+            position += 1
+            expect_value = True
+            continue
+        if char == "]" and not items:
+            return
+        if char in ",]":
+            raise ValueError(
+                f"JSON import list is missing item {items + 1} (char {consumed + position}): "
+                "leading, doubled or trailing ','."
+            )
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as exc:
+            if eof or not _may_be_truncated(exc, len(buffer)):
+                raise ValueError(
+                    f"Invalid JSON in import item {items + 1} (char {consumed + exc.pos}): {exc.msg}."
+                ) from None
+            end = len(buffer)
+        if end == len(buffer) and not eof:
+            # The value may continue in the next read (e.g. a number split in two). Reading at
+            # least as much as is buffered keeps re-decoding one large item linear overall.
+            chunk = handle.read(max(_READ_SIZE, len(buffer) - position))
+            eof = not chunk
+            consumed += position
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = end
+        items += 1
+        expect_value = False
+        yield item
+
+
+def _csv_payload(row: Dict[str, str]) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "type": row.get("type") or None,
+        "timestamp": row.get("timestamp") or None,
+    }
+    context = {
+        key: row[key] for key in ("eventId", "note") if row.get(key)
+    }
+    if context:
+        payload["context"] = context
+    if row.get("source"):
+        payload["source"] = row["source"]
+    if row.get("signalId"):
+        payload["signalId"] = row["signalId"]
+    version = row.get("version")
+    if version:
+        payload["version"] = int(version) if version.strip().isdigit() else version
+    return payload
+
+
+def iter_payloads(path: Path, fmt: str) -> Iterator[Row]:
+    """Stream ``(row number, payload)`` pairs; row numbers start at 1."""
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        if fmt == "json":
+            yield from enumerate(_iter_json_array(handle), start=1)
+        elif fmt == "jsonl":
+            row = 0
+            for line in handle:
+                if not line.strip():
+                    continue
+                row += 1
+                try:
+                    yield row, json.loads(line)
+                except json.JSONDecodeError as exc:
+                    yield row, _Unparseable(f"Invalid JSON: {exc.msg}")
+        elif fmt == "csv":
+            yield from (
+                (row, _csv_payload(record))
+                for row, record in enumerate(csv.DictReader(handle), start=1)
+            )
+        else:
+            raise ValueError(f"Unsupported import format '{fmt}'.")
+
+
+def validate_chunk(
+    rows: List[Row],
+    now: Optional[datetime] = None,
+) -> Tuple[List[Dict[str, Any]], List[Reject]]:
+    """Validate one chunk against a fixed ``now`` so time bounds are computed once."""
+    now = now or datetime.now(timezone.utc)
+    validator = SignalValidator(clock=lambda: now)
+    accepted: List[Dict[str, Any]] = []
+    rejects: List[Reject] = []
+    for row, payload in rows:
+        if isinstance(payload, _Unparseable):
+            rejects.append({"row": row, "errors": [payload.error]})
+            continue
+        if isinstance(payload, dict) and not payload.get("source"):
+            payload = dict(payload, source="import")
+        try:
+            accepted.append(validator.normalize(payload))
+        except ValueError as exc:
+            rejects.append({"row": row, "errors": str(exc).split("; "), "payload": payload})
+    return accepted, rejects
+
+
+def _chunks(rows: Iterable[Row], size: int) -> Iterator[List[Row]]:
+    chunk: List[Row] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _validated(
+    chunks: Iterator[List[Row]],
+    workers: int,
+) -> Iterator[Tuple[List[Dict[str, Any]], List[Reject]]]:
+    # One reference time for the whole import keeps accept/reject decisions stable.
+    now = datetime.now(timezone.utc)
+    if workers <= 1:
+        yield from (validate_chunk(chunk, now) for chunk in chunks)
+        return
+    # Keep a bounded window of chunks in flight so huge files stream through.
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(validate_chunk, chunk, now))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def import_signals(
+    source: Path,
+    data_path: Path,
+    *,
+    fmt: Optional[str] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rejects_path: Optional[Path] = None,
+) -> ImportSummary:
+    """Validate a bulk dump in parallel and commit accepted rows in one append."""
+    fmt = fmt or detect_format(source)
+    workers = workers if workers is not None else (os.cpu_count() or 1)
+    rejects_path = rejects_path or source.with_name(source.name + ".rejects.jsonl")
+    summary = ImportSummary(rejects_path=rejects_path)
+    accepted: List[Dict[str, Any]] = []
+
+    with rejects_path.open("w", encoding="utf-8") as rejects_handle:
+        for chunk_accepted, chunk_rejects in _validated(
+            _chunks(iter_payloads(source, fmt), chunk_size), workers
+        ):
+            accepted.extend(chunk_accepted)
+            for reject in chunk_rejects:
+                rejects_handle.write(json.dumps(reject, default=str) + "\n")
+            summary.rejected += len(chunk_rejects)
+    summary.accepted = len(accepted)
+    summary.rows = summary.accepted + summary.rejected
+
+    if accepted:
+        append_signals(data_path, accepted)
+    if not summary.rejected:
+        rejects_path.unlink()
+        summary.rejects_path = None
+    return summary
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+MetricT = TypeVar("MetricT", bound="_Metric")
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(key)
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ""
+    rendered = ",".join(
+        '{}="{}"'.format(name, value.replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in items
+    )
+    return "{" + rendered + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+
+    def _sample_lines(self, constant: LabelKey = ()) -> List[str]:
+        raise NotImplementedError
+
+    def render(self, constant: LabelKey = ()) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._sample_lines(constant))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0.0)
+
+    def _sample_lines(self, constant: LabelKey = ()) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(constant + key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text)
+        self._buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., overflow count, sum]
+        self._values: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self._buckets) + 2)
+                self._values[key] = state
+            state[index] += 1
+            state[-1] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _sample_lines(self, constant: LabelKey = ()) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines: List[str] = []
+        for key, state in items:
+            key = constant + key
+            cumulative = 0.0
+            for bound, count in zip(self._buckets + (float("inf"),), state[:-1]):
+                cumulative += count
+                label = _format_labels(key, ("le", _format_value(bound)))
+                lines.append(f"{self.name}_bucket{label} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {repr(state[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(cumulative)}")
+        return lines
+
+
+class Registry:
+    """Process-local metric registry rendered in the Prometheus text format.
+
+    Constant labels are added to every sample; pre-fork workers set ``worker``
+    so each process reports its own series instead of overwriting the others.
+    """
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._constant: LabelKey = ()
+        self._lock = threading.Lock()
+
+    def set_constant_labels(self, **labels: str) -> None:
+        self._constant = _label_key(labels)
+
+    def _register(self, metric: MetricT) -> MetricT:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if isinstance(existing, type(metric)):
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._register(Counter(name, help_text))
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._register(Gauge(name, help_text))
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render(self._constant))
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "signals_http_request_duration_seconds",
+    "HTTP request latency by endpoint, method and status.",
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "signals_http_requests_in_flight",
+    "HTTP requests currently being served.",
+)
+STORAGE_SECONDS = REGISTRY.histogram(
+    "signals_storage_duration_seconds",
+    "Signal storage read/write latency by operation.",
+)
+AGGREGATION_SECONDS = REGISTRY.histogram(
+    "signals_aggregation_duration_seconds",
+    "Time spent in aggregate_signals by window.",
+)
+RECORDS_SCANNED = REGISTRY.counter(
+    "signals_aggregation_records_scanned_total",
+    "Signal records scanned by aggregate_signals.",
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "signals_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss).",
+)
+
+# Known routes; anything else is reported as "other" to keep label cardinality bounded.
+KNOWN_ENDPOINTS = {"/health", "/signal-types", "/signals", "/stats", "/stats/partial", "/metrics"}
+
+
+def endpoint_label(path: str) -> str:
+    if path.startswith("/charts/"):
+        return "/charts"
+    if path.startswith("/dossiers/"):
+        return "/dossiers"
+    return path if path in KNOWN_ENDPOINTS else "other"
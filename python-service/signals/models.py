@@ -3,11 +3,13 @@
 # helping with circular imports and improving compatibility with static analyzers.
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Tuple
 
+from .sketches import HyperLogLog, parse_fields
 from .utils import format_iso8601, parse_iso8601
+from .windows import WindowSpec, parse_window
 
 
 @dataclass(frozen=True)
@@ -43,15 +45,18 @@ class SignalRecord:
 
 @dataclass(frozen=True)
 class AggregatedStat:
+    # A date for day/week/month windows, an aware datetime for sub-day windows.
     window: date
     type: str
     count: int
     baseline: float
     trend: str
     status: str
+    # Estimated distinct values per requested field, e.g. {"eventId": 12}.
+    distinct: Optional[Dict[str, int]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        payload = {
             "window": self.window.isoformat(),
             "type": self.type,
             "count": self.count,
@@ -59,3 +64,83 @@ class AggregatedStat:
             "trend": self.trend,
             "status": self.status,
         }
+        if self.distinct is not None:
+            payload["distinct"] = dict(self.distinct)
+        return payload
+
+
+@dataclass(frozen=True)
+class PartialAggregate:
+    """Mergeable group counts for one window, keyed by (bucket id, type), before baselines and status."""
+
+    window: WindowSpec
+    counts: Dict[Tuple[int, str], int]
+    distinct_fields: Tuple[str, ...] = ()
+    # {(bucket, type, field): sketch} for each field in ``distinct_fields``.
+    sketches: Dict[Tuple[int, str, str], HyperLogLog] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        nested: Dict[str, Dict[str, int]] = {}
+        for (bucket, signal_type), count in sorted(self.counts.items()):
+            nested.setdefault(self.window.label(bucket), {})[signal_type] = count
+        payload: Dict[str, Any] = {
+            "version": 1,
+            "window": self.window.name,
+            "tz": self.window.tz,
+            "counts": nested,
+        }
+        if self.distinct_fields:
+            distinct: Dict[str, Dict[str, Dict[str, str]]] = {}
+            for (bucket, signal_type, name), sketch in sorted(
+                self.sketches.items(), key=lambda item: item[0]
+            ):
+                by_type = distinct.setdefault(self.window.label(bucket), {})
+                by_type.setdefault(signal_type, {})[name] = sketch.encode()
+            payload["distinctFields"] = list(self.distinct_fields)
+            payload["distinct"] = distinct
+        return payload
+
+    @classmethod
+    def from_dict(cls, payload: Dict[str, Any]) -> "PartialAggregate":
+        if not isinstance(payload, dict) or not isinstance(payload.get("window"), str):
+            raise ValueError("Partial aggregate must name its window.")
+        # Partials from before time zone support are always UTC.
+        window = parse_window(payload["window"], payload.get("tz"))
+        nested = payload.get("counts")
+        if not isinstance(nested, dict):
+            raise ValueError("Partial aggregate counts must be an object.")
+        counts: Dict[Tuple[int, str], int] = {}
+        for window_key, by_type in nested.items():
+            bucket = window.parse_label(window_key)
+            if not isinstance(by_type, dict):
+                raise ValueError(f"Counts for window {window_key} must be an object.")
+            for signal_type, count in by_type.items():
+                if not isinstance(count, int) or isinstance(count, bool) or count < 0:
+                    raise ValueError(
+                        f"Count for {window_key}/{signal_type} must be a non-negative integer."
+                    )
+                if count:
+                    counts[(bucket, signal_type)] = count
+
+        distinct_fields = parse_fields(payload.get("distinctFields"))
+        sketches: Dict[Tuple[int, str, str], HyperLogLog] = {}
+        distinct = payload.get("distinct", {})
+        if not isinstance(distinct, dict):
+            raise ValueError("Partial aggregate sketches must be an object.")
+        for window_key, by_type in distinct.items():
+            bucket = window.parse_label(window_key)
+            if not isinstance(by_type, dict):
+                raise ValueError(f"Sketches for window {window_key} must be an object.")
+            for signal_type, by_field in by_type.items():
+                if not isinstance(by_field, dict):
+                    raise ValueError(f"Sketches for {window_key}/{signal_type} must be an object.")
+                for name, text in by_field.items():
+                    if name not in distinct_fields:
+                        raise ValueError(f"Sketch for {name} is not listed in distinctFields.")
+                    sketches[(bucket, signal_type, name)] = HyperLogLog.decode(text)
+        return cls(
+            window=window,
+            counts=counts,
+            distinct_fields=distinct_fields,
+            sketches=sketches,
+        )
@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import cProfile
+import functools
+import os
+import random
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar, cast
+
+DEFAULT_OUTPUT_DIR = Path(__file__).resolve().parent.parent / "output" / "profiles"
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_SLOW_MS = 500.0
+DEFAULT_STACK_INTERVAL = 0.005
+ALLOCATION_TOP = 25
+
+FuncT = TypeVar("FuncT", bound=Callable[..., Any])
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _StackSampler:
+    """Samples one thread's Python stack into flamegraph "folded" counts."""
+
+    def __init__(self, thread_id: int, interval: float) -> None:
+        self._thread_id = thread_id
+        self._interval = interval
+        self._stop = threading.Event()
+        self.counts: Counter = Counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class Profiler:
+    """Opt-in sampled profiling of hot paths.
+
+    A sampled call runs under cProfile, a stack sampler and tracemalloc. When
+    it takes longer than ``slow_ms`` the evidence is written to ``output_dir``:
+    ``.pstats`` (cProfile), ``.folded`` (flamegraph.pl / speedscope input) and
+    ``.alloc.txt`` (top allocation growth during the call).
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.slow_ms = DEFAULT_SLOW_MS
+        self.output_dir = DEFAULT_OUTPUT_DIR
+        self.stack_interval = DEFAULT_STACK_INTERVAL
+        # cProfile (and sys.monitoring on 3.12+) allow one active profiler at a time.
+        self._busy = threading.Lock()
+        self._local = threading.local()
+
+    def configure(
+        self,
+        *,
+        enabled: bool = True,
+        sample_rate: Optional[float] = None,
+        slow_ms: Optional[float] = None,
+        output_dir: Optional[Path] = None,
+        stack_interval: Optional[float] = None,
+    ) -> None:
+        self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_ms is not None:
+            self.slow_ms = slow_ms
+        if output_dir is not None:
+            self.output_dir = Path(output_dir)
+        if stack_interval is not None:
+            self.stack_interval = stack_interval
+
+    def configure_from_env(self) -> None:
+        """SIGNALS_PROFILE=1 enables; *_SAMPLE_RATE, *_SLOW_MS and *_DIR tune it."""
+        if not _env_flag("SIGNALS_PROFILE"):
+            return
+        self.configure(
+            enabled=True,
+            sample_rate=float(os.environ.get("SIGNALS_PROFILE_SAMPLE_RATE", self.sample_rate)),
+            slow_ms=float(os.environ.get("SIGNALS_PROFILE_SLOW_MS", self.slow_ms)),
+            output_dir=Path(os.environ.get("SIGNALS_PROFILE_DIR", str(self.output_dir))),
+        )
+
+    @contextmanager
+    def capture(self, name: str) -> Iterator[None]:
+        if (
+            not self.enabled
+            or getattr(self._local, "active", False)
+            or random.random() >= self.sample_rate
+            or not self._busy.acquire(blocking=False)
+        ):
+            yield
+            return
+
+        self._local.active = True
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        sampler = _StackSampler(threading.get_ident(), self.stack_interval)
+        profile = cProfile.Profile()
+        sampler.start()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            sampler.stop()
+            try:
+                if elapsed_ms >= self.slow_ms:
+                    after = tracemalloc.take_snapshot()
+                    self._dump(name, elapsed_ms, profile, sampler.counts, before, after)
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+                self._local.active = False
+                self._busy.release()
+
+    def _dump(
+        self,
+        name: str,
+        elapsed_ms: float,
+        profile: cProfile.Profile,
+        stacks: Dict[str, int],
+        before: tracemalloc.Snapshot,
+        after: tracemalloc.Snapshot,
+    ) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+        slug = "".join(char if char.isalnum() else "_" for char in name).strip("_")
+        base = self.output_dir / f"{stamp}-{slug}-{os.getpid()}"
+
+        profile.dump_stats(str(base.with_suffix(".pstats")))
+        with base.with_suffix(".folded").open("w", encoding="utf-8") as handle:
+            for stack, count in stacks.items():
+                handle.write(f"{stack} {count}\n")
+        with base.with_suffix(".alloc.txt").open("w", encoding="utf-8") as handle:
+            handle.write(f"{name}: {elapsed_ms:.1f} ms\n")
+            for stat in after.compare_to(before, "lineno")[:ALLOCATION_TOP]:
+                handle.write(f"{stat}\n")
+
+    def profiled(self, name: str) -> Callable[[FuncT], FuncT]:
+        """Decorator form of ``capture``; costs one attribute check when disabled."""
+
+        def decorator(func: FuncT) -> FuncT:
+            @functools.wraps(func)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with self.capture(name):
+                    return func(*args, **kwargs)
+
+            return cast(FuncT, wrapper)
+
+        return decorator
+
+
+PROFILER = Profiler()
+PROFILER.configure_from_env()
+profiled = PROFILER.profiled
@@ -0,0 +1,204 @@
+"""Per-hour count rollups for signals past the raw retention window.
+
+Compaction folds raw signals older than a cutoff into an immutable segment of
+``{hour: {type: count}}`` keyed by UTC hour, plus per-hour distinct-value
+sketches, and rewrites the raw file without them. Hourly counts can be
+re-bucketed into any hour-multiple window in any whole-hour time zone.
+Version 1 segments are keyed by UTC day and only serve UTC day, week and
+month windows. Segments are never modified afterwards, so readers can cache
+them by file name.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from . import segments
+from .sketches import (
+    HourSketches,
+    decode_hour_sketches,
+    encode_hour_sketches,
+    merge_sketch,
+    sketch_hours,
+)
+from .storage import load_signals, replace_atomic, rewrite_signals, storage_lock
+from .utils import hour_key, parse_iso8601
+
+DEFAULT_RETENTION_DAYS = 90
+SEGMENT_VERSION = 2
+
+# {(UTC hour key, or UTC day for version 1 segments, type): count}
+HistoryCounts = Dict[Tuple[str, str], int]
+
+_SEGMENT_CACHE: Dict[str, HistoryCounts] = {}
+_SKETCH_CACHE: Dict[str, HourSketches] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class CompactionSummary:
+    rolled: int = 0
+    kept: int = 0
+    segment: Optional[Path] = None
+
+
+def rollup_dir(data_path: Path) -> Path:
+    return data_path.parent / "rollups"
+
+
+def _write_atomic(path: Path, payload: Any, **dump_options: Any) -> None:
+    replace_atomic(path, json.dumps(payload, **dump_options).encode("utf-8"))
+
+
+def _read_segment(path: Path) -> HistoryCounts:
+    with path.open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    counts: HistoryCounts = {}
+    for key, by_type in payload.get("counts", {}).items():
+        for signal_type, count in by_type.items():
+            counts[(key, signal_type)] = int(count)
+    return counts
+
+
+def _read_segment_sketches(path: Path) -> HourSketches:
+    with path.open("r", encoding="utf-8") as handle:
+        payload = json.load(handle)
+    # Rollups written before distinct counts existed carry no sketches.
+    return decode_hour_sketches(payload.get("distinct", {}))
+
+
+def rollup_paths(data_path: Path) -> List[Path]:
+    directory = rollup_dir(data_path)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob("rollup-*.json"))
+
+
+def load_rollups(data_path: Path) -> HistoryCounts:
+    """Sum every rollup segment into ``{(hour, type): count}``."""
+    totals: HistoryCounts = defaultdict(int)
+    for path in rollup_paths(data_path):
+        with _CACHE_LOCK:
+            counts = _SEGMENT_CACHE.get(path.name)
+        if counts is None:
+            counts = _read_segment(path)
+            with _CACHE_LOCK:
+                _SEGMENT_CACHE[path.name] = counts
+        for key, count in counts.items():
+            totals[key] += count
+    return dict(totals)
+
+
+def load_rollup_sketches(data_path: Path) -> HourSketches:
+    """Merge every rollup segment's ``{(hour, type, field): sketch}``."""
+    totals: HourSketches = {}
+    for path in rollup_paths(data_path):
+        with _CACHE_LOCK:
+            hour_sketches = _SKETCH_CACHE.get(path.name)
+        if hour_sketches is None:
+            hour_sketches = _read_segment_sketches(path)
+            with _CACHE_LOCK:
+                _SKETCH_CACHE[path.name] = hour_sketches
+        for key, sketch in hour_sketches.items():
+            merge_sketch(totals, key, sketch)
+    return totals
+
+
+def load_history_counts(data_path: Path) -> HistoryCounts:
+    """Pre-counted history outside the raw file: rollups plus sealed segments."""
+    totals: HistoryCounts = defaultdict(int, load_rollups(data_path))
+    for key, count in segments.count_by_hour(data_path).items():
+        totals[key] += count
+    return dict(totals)
+
+
+def load_history_sketches(data_path: Path) -> HourSketches:
+    """Distinct-value sketches for the same history as ``load_history_counts``."""
+    totals = load_rollup_sketches(data_path)
+    for key, sketch in segments.sketches_by_hour(data_path).items():
+        merge_sketch(totals, key, sketch)
+    return totals
+
+
+def _record_time(record: Dict[str, Any]) -> Optional[datetime]:
+    timestamp_raw = record.get("timestamp")
+    if not record.get("type") or not timestamp_raw:
+        return None
+    try:
+        return parse_iso8601(timestamp_raw)
+    except ValueError:
+        return None
+
+
+def _split(
+    records: Iterable[Dict[str, Any]],
+    cutoff: date,
+) -> Tuple[Dict[str, Dict[str, int]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    kept: List[Dict[str, Any]] = []
+    rolled: List[Dict[str, Any]] = []
+    for record in records:
+        timestamp = _record_time(record)
+        # Records aggregation cannot read stay raw rather than being silently dropped.
+        if timestamp is None or timestamp.date() >= cutoff:
+            kept.append(record)
+            continue
+        counts[hour_key(timestamp)][record["type"]] += 1
+        rolled.append(record)
+    return counts, kept, rolled
+
+
+def compact_signals(
+    data_path: Path,
+    *,
+    older_than_days: int = DEFAULT_RETENTION_DAYS,
+    now: Optional[datetime] = None,
+) -> CompactionSummary:
+    """Roll raw signals and closed partitions before ``now - older_than_days`` into a rollup."""
+    if older_than_days < 0:
+        raise ValueError("older_than_days must be zero or more.")
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=older_than_days)).date()
+
+    with storage_lock(data_path):
+        counts, kept, rolled_records = _split(load_signals(data_path), cutoff)
+        rolled = len(rolled_records)
+        hour_sketches = sketch_hours(rolled_records)
+        expired = segments.closed_segment_paths(data_path, cutoff)
+        for path in expired:
+            for (hour, signal_type), count in segments.segment_counts(path).items():
+                counts[hour][signal_type] += count
+                rolled += count
+            for key, sketch in segments.segment_sketches(path).items():
+                merge_sketch(hour_sketches, key, sketch)
+        summary = CompactionSummary(rolled=rolled, kept=len(kept))
+        if not rolled:
+            return summary
+
+        segment = rollup_dir(data_path) / (
+            f"rollup-{cutoff.isoformat()}-{now.strftime('%Y%m%dT%H%M%S%f')}.json"
+        )
+        _write_atomic(
+            segment,
+            {
+                "version": SEGMENT_VERSION,
+                "cutoff": cutoff.isoformat(),
+                "createdAt": now.isoformat(),
+                "counts": {hour: dict(by_type) for hour, by_type in sorted(counts.items())},
+                "distinct": encode_hour_sketches(hour_sketches),
+            },
+            sort_keys=True,
+        )
+        # The rollup is durable before the raw records and partitions go away:
+        # a crash in between may double count those hours but never loses signals.
+        rewrite_signals(data_path, kept)
+        for path in expired:
+            path.unlink()
+        summary.segment = segment
+    return summary
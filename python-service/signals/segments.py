@@ -0,0 +1,381 @@
+"""Memory-mapped columnar partitions for sealed (closed-period) signals.
+
+One immutable file per day or week partition, rows sorted by timestamp::
+
+    header      "<4sHHII": magic b"SIG1", version, reserved, rows, dictionary bytes
+    dictionary  UTF-8 JSON {"partition", "start", "types": [...], "sources": [...]}
+    epoch       int64[rows]   seconds since the Unix epoch, UTC (8-byte aligned)
+    type        uint8[rows]   index into dictionary["types"]
+    source      uint8[rows]   index into dictionary["sources"]
+    offsets     uint32[rows + 1] into the blob (4-byte aligned)
+    blob        UTF-8 JSON per row: {"signalId", "context", "version"}
+
+Counting reads only the epoch and type columns straight from the mapping.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import mmap
+import re
+import struct
+import sys
+import threading
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .sketches import HourSketches, merge_sketch, sketch_hours
+from .storage import load_signals, replace_atomic, rewrite_signals, storage_lock
+from .utils import format_iso8601, hour_key, parse_iso8601
+
+MAGIC = b"SIG1"
+VERSION = 1
+PARTITIONS = ("day", "week")
+DEFAULT_SEAL_AGE_DAYS = 1
+
+_HEADER = struct.Struct("<4sHHII")
+_DAY_SECONDS = 86_400
+_HOUR_SECONDS = 3_600
+_EPOCH = date(1970, 1, 1)
+_NAME = re.compile(r"^(day|week)-(\d{4}-\d{2}-\d{2})(?:\.\d+)?\.sig$")
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+# {(UTC hour key, type): count}
+HourCounts = Dict[Tuple[str, str], int]
+
+# Partitions are immutable, but a name can come back after compaction deleted it.
+_COUNT_CACHE: Dict[Tuple[str, int, int], HourCounts] = {}
+_SKETCH_CACHE: Dict[Tuple[str, int, int], HourSketches] = {}
+_CACHE_LOCK = threading.Lock()
+
+
+@dataclass
+class SealSummary:
+    sealed: int = 0
+    kept: int = 0
+    segments: List[Path] = field(default_factory=list)
+
+
+def segment_dir(data_path: Path) -> Path:
+    return data_path.parent / "segments"
+
+
+def _align(offset: int, size: int) -> int:
+    return -(-offset // size) * size
+
+
+def _day_epoch(day: date) -> int:
+    return (day - _EPOCH).days * _DAY_SECONDS
+
+
+def _partition_start(day: date, partition: str) -> date:
+    if partition == "day":
+        return day
+    if partition == "week":
+        return day - timedelta(days=day.weekday())
+    raise ValueError("Partition must be 'day' or 'week'.")
+
+
+def _partition_days(partition: str) -> int:
+    return 7 if partition == "week" else 1
+
+
+def _parse_name(path: Path) -> Optional[Tuple[str, date]]:
+    match = _NAME.match(path.name)
+    if match is None:
+        return None
+    return match.group(1), date.fromisoformat(match.group(2))
+
+
+def encode_segment(records: List[Dict[str, Any]], partition: str, start: date) -> bytes:
+    """Serialize one partition's records into the columnar layout."""
+    rows = sorted(
+        ((int(parse_iso8601(record["timestamp"]).timestamp()), record) for record in records),
+        key=lambda item: item[0],
+    )
+    types = sorted({record["type"] for _, record in rows})
+    sources = sorted({record.get("source", "form") for _, record in rows})
+    if len(types) > 256 or len(sources) > 256:
+        raise ValueError("A segment holds at most 256 distinct types and sources.")
+    type_codes = {name: code for code, name in enumerate(types)}
+    source_codes = {name: code for code, name in enumerate(sources)}
+
+    epochs = array("q")
+    type_column = array("B")
+    source_column = array("B")
+    offsets = array("I", [0])
+    blob = bytearray()
+    for epoch, record in rows:
+        epochs.append(epoch)
+        type_column.append(type_codes[record["type"]])
+        source_column.append(source_codes[record.get("source", "form")])
+        blob += json.dumps(
+            {
+                "signalId": record.get("signalId"),
+                "context": record.get("context", {}),
+                "version": record.get("version", 1),
+            },
+            separators=(",", ":"),
+            sort_keys=True,
+        ).encode("utf-8")
+        offsets.append(len(blob))
+    if not _LITTLE_ENDIAN:
+        epochs.byteswap()
+        offsets.byteswap()
+
+    dictionary = json.dumps(
+        {"partition": partition, "start": start.isoformat(), "types": types, "sources": sources},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    out = bytearray(_HEADER.pack(MAGIC, VERSION, 0, len(rows), len(dictionary)))
+    out += dictionary
+    out += b"\0" * (_align(len(out), 8) - len(out))
+    out += epochs.tobytes()
+    out += type_column.tobytes()
+    out += source_column.tobytes()
+    out += b"\0" * (_align(len(out), 4) - len(out))
+    out += offsets.tobytes()
+    out += blob
+    return bytes(out)
+
+
+class Segment:
+    """Read-only view over one partition file; columns are memoryviews into the mmap."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        with path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, _, rows, dictionary_size = _HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{path.name} is not a version {VERSION} signal segment.")
+        position = _HEADER.size
+        dictionary = json.loads(bytes(view[position : position + dictionary_size]))
+        self.rows = rows
+        self.partition: str = dictionary["partition"]
+        self.start = date.fromisoformat(dictionary["start"])
+        self.types: List[str] = dictionary["types"]
+        self.sources: List[str] = dictionary["sources"]
+
+        position = _align(position + dictionary_size, 8)
+        self.epochs = self._column(view, position, rows, "q")
+        position += rows * 8
+        self.type_codes = view[position : position + rows]
+        position += rows
+        self.source_codes = view[position : position + rows]
+        position = _align(position + rows, 4)
+        self._offsets = self._column(view, position, rows + 1, "I")
+        self._blob = view[position + (rows + 1) * 4 :]
+        self._view = view
+
+    @staticmethod
+    def _column(view: memoryview, position: int, length: int, typecode: str) -> Any:
+        raw = view[position : position + length * struct.calcsize(typecode)]
+        if _LITTLE_ENDIAN:
+            return raw.cast(typecode)
+        column = array(typecode, raw.tobytes())
+        column.byteswap()
+        return column
+
+    def close(self) -> None:
+        for column in (self.epochs, self.type_codes, self.source_codes, self._offsets, self._blob):
+            if isinstance(column, memoryview):
+                column.release()
+        self._view.release()
+        self._mmap.close()
+
+    def __enter__(self) -> "Segment":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def count_by_hour(self) -> HourCounts:
+        """``{(UTC hour, type): count}`` from the epoch and type columns only."""
+        counts: HourCounts = {}
+        first = _day_epoch(self.start)
+        last = first + _partition_days(self.partition) * _DAY_SECONDS
+        high = bisect.bisect_left(self.epochs, first)
+        for hour_start in range(first, last, _HOUR_SECONDS):
+            low = high
+            high = bisect.bisect_left(self.epochs, hour_start + _HOUR_SECONDS, low)
+            if low == high:
+                continue
+            hour = hour_key(datetime.fromtimestamp(hour_start, tz=timezone.utc))
+            codes = bytes(self.type_codes[low:high])
+            for code, signal_type in enumerate(self.types):
+                count = codes.count(code)
+                if count:
+                    counts[(hour, signal_type)] = count
+        return counts
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Rebuild the stored signal dicts; only needed when callers want raw records."""
+        for row in range(self.rows):
+            extra = json.loads(bytes(self._blob[self._offsets[row] : self._offsets[row + 1]]))
+            yield {
+                "signalId": extra["signalId"],
+                "type": self.types[self.type_codes[row]],
+                "timestamp": format_iso8601(
+                    datetime.fromtimestamp(self.epochs[row], tz=timezone.utc)
+                ),
+                "context": extra["context"],
+                "source": self.sources[self.source_codes[row]],
+                "version": extra["version"],
+            }
+
+
+def _partition_files(data_path: Path) -> Iterator[Tuple[Path, date, date]]:
+    directory = segment_dir(data_path)
+    if not directory.is_dir():
+        return
+    for path in sorted(directory.glob("*.sig")):
+        parsed = _parse_name(path)
+        if parsed is not None:
+            partition, first_day = parsed
+            yield path, first_day, first_day + timedelta(days=_partition_days(partition))
+
+
+def segment_paths(
+    data_path: Path,
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Path]:
+    """Partition files overlapping ``[start, end)``, chosen by file name alone."""
+    return [
+        path
+        for path, first_day, end_day in _partition_files(data_path)
+        if (start is None or end_day > start) and (end is None or first_day < end)
+    ]
+
+
+def closed_segment_paths(data_path: Path, before: date) -> List[Path]:
+    """Partition files that end on or before ``before``."""
+    return [path for path, _, end_day in _partition_files(data_path) if end_day <= before]
+
+
+def segment_counts(path: Path) -> HourCounts:
+    stat = path.stat()
+    key = (path.name, stat.st_ino, stat.st_mtime_ns)
+    with _CACHE_LOCK:
+        counts = _COUNT_CACHE.get(key)
+    if counts is None:
+        with Segment(path) as segment:
+            counts = segment.count_by_hour()
+        with _CACHE_LOCK:
+            _COUNT_CACHE[key] = counts
+    return counts
+
+
+def segment_sketches(path: Path) -> HourSketches:
+    """Per-hour distinct-value sketches for one partition; decodes its rows once per file."""
+    stat = path.stat()
+    key = (path.name, stat.st_ino, stat.st_mtime_ns)
+    with _CACHE_LOCK:
+        hour_sketches = _SKETCH_CACHE.get(key)
+    if hour_sketches is None:
+        with Segment(path) as segment:
+            hour_sketches = sketch_hours(segment.iter_records())
+        with _CACHE_LOCK:
+            _SKETCH_CACHE[key] = hour_sketches
+    return hour_sketches
+
+
+def sketches_by_hour(data_path: Path) -> HourSketches:
+    """Merge ``{(hour, type, field): sketch}`` over every sealed partition."""
+    totals: HourSketches = {}
+    for path in segment_paths(data_path):
+        for key, sketch in segment_sketches(path).items():
+            merge_sketch(totals, key, sketch)
+    return totals
+
+
+def count_by_hour(
+    data_path: Path,
+    *,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> HourCounts:
+    """Sum ``{(hour, type): count}`` over sealed partitions, optionally within days ``[start, end)``."""
+    totals: HourCounts = defaultdict(int)
+    low = start.isoformat() if start else None
+    high = end.isoformat() if end else None
+    for path in segment_paths(data_path, start=start, end=end):
+        for (hour, signal_type), count in segment_counts(path).items():
+            day = hour[:10]
+            if (low is None or day >= low) and (high is None or day < high):
+                totals[(hour, signal_type)] += count
+    return dict(totals)
+
+
+def iter_segment_signals(data_path: Path) -> Iterator[Dict[str, Any]]:
+    """Every sealed record, rebuilt from the columns; for recovery and index rebuilds, not stats."""
+    for path in segment_paths(data_path):
+        with Segment(path) as segment:
+            yield from segment.iter_records()
+
+
+def _free_path(directory: Path, partition: str, start: date) -> Path:
+    base = f"{partition}-{start.isoformat()}"
+    path = directory / f"{base}.sig"
+    index = 0
+    while path.exists():
+        index += 1
+        path = directory / f"{base}.{index}.sig"
+    return path
+
+
+def seal_signals(
+    data_path: Path,
+    *,
+    older_than_days: int = DEFAULT_SEAL_AGE_DAYS,
+    partition: str = "day",
+    now: Optional[datetime] = None,
+) -> SealSummary:
+    """Move raw signals from closed partitions into segment files.
+
+    A partition is closed once it ends on or before ``now - older_than_days``.
+    """
+    if older_than_days < 0:
+        raise ValueError("older_than_days must be zero or more.")
+    if partition not in PARTITIONS:
+        raise ValueError("Partition must be 'day' or 'week'.")
+    now = now or datetime.now(timezone.utc)
+    cutoff = (now - timedelta(days=older_than_days)).date()
+    span = timedelta(days=_partition_days(partition))
+
+    with storage_lock(data_path):
+        grouped: Dict[date, List[Dict[str, Any]]] = defaultdict(list)
+        kept: List[Dict[str, Any]] = []
+        for record in load_signals(data_path):
+            try:
+                day = parse_iso8601(record["timestamp"]).date()
+            except (KeyError, TypeError, ValueError):
+                kept.append(record)
+                continue
+            start = _partition_start(day, partition)
+            if not record.get("type") or start + span > cutoff:
+                kept.append(record)
+            else:
+                grouped[start].append(record)
+
+        summary = SealSummary(kept=len(kept))
+        if not grouped:
+            return summary
+        directory = segment_dir(data_path)
+        for start, records in sorted(grouped.items()):
+            path = _free_path(directory, partition, start)
+            replace_atomic(path, encode_segment(records, partition, start))
+            summary.segments.append(path)
+            summary.sealed += len(records)
+        rewrite_signals(data_path, kept)
+    return summary
@@ -0,0 +1,198 @@
+"""HyperLogLog sketches for approximate distinct counts per group.
+
+A sketch is ``2 ** precision`` one-byte registers however many values are
+added, and two sketches merge by taking the register-wise maximum. Per-hour
+sketches from raw signals, rollups, sealed partitions and other nodes can
+therefore be combined into any window. The standard error is about
+``1.04 / sqrt(2 ** precision)``: 1.6% at the default precision of 12.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import math
+import os
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+
+from .utils import hour_key, parse_iso8601
+
+# Fields a distinct count may be requested for; only group-level identifiers.
+DISTINCT_FIELDS = ("eventId", "source")
+PRECISION = int(os.environ.get("SIGNALS_HLL_PRECISION", "12"))
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+# Per-hour sketches: {(UTC hour key, type, field): sketch}.
+HourSketches = Dict[Tuple[str, str, str], "HyperLogLog"]
+
+
+class HyperLogLog:
+    __slots__ = ("precision", "registers")
+
+    def __init__(self, precision: int = PRECISION, registers: Optional[bytearray] = None) -> None:
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(
+                f"Sketch precision must be between {MIN_PRECISION} and {MAX_PRECISION}."
+            )
+        if registers is None:
+            registers = bytearray(1 << precision)
+        elif len(registers) != 1 << precision:
+            raise ValueError("Sketch registers do not match its precision.")
+        self.precision = precision
+        self.registers = registers
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, HyperLogLog):
+            return NotImplemented
+        return self.precision == other.precision and self.registers == other.registers
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def add(self, value: str) -> None:
+        hashed = int.from_bytes(
+            hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little"
+        )
+        index = hashed & ((1 << self.precision) - 1)
+        # Position of the lowest set bit among the remaining 64 - precision bits.
+        rest = hashed >> self.precision
+        rank = (rest & -rest).bit_length() if rest else 65 - self.precision
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> None:
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision.")
+        self.registers[:] = bytes(map(max, self.registers, other.registers))
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.precision, bytearray(self.registers))
+
+    def estimate(self) -> float:
+        size = len(self.registers)
+        harmonic = 0.0
+        for rank in range(66 - self.precision):
+            occurrences = self.registers.count(rank)
+            if occurrences:
+                harmonic += occurrences * 2.0**-rank
+        raw = _alpha(size) * size * size / harmonic
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * size and zeros:
+            # Linear counting is more accurate while many registers are still empty.
+            return size * math.log(size / zeros)
+        return raw
+
+    def encode(self) -> str:
+        """Compact text form: base64 of the precision byte and zlib-compressed registers."""
+        packed = bytes([self.precision]) + zlib.compress(bytes(self.registers))
+        return base64.b64encode(packed).decode("ascii")
+
+    @classmethod
+    def decode(cls, text: str) -> "HyperLogLog":
+        try:
+            packed = base64.b64decode(text, validate=True)
+            registers = bytearray(zlib.decompress(packed[1:]))
+        except (binascii.Error, zlib.error, TypeError) as exc:
+            raise ValueError(f"Invalid sketch encoding: {exc}") from None
+        if not packed:
+            raise ValueError("Invalid sketch encoding: empty.")
+        return cls(packed[0], registers)
+
+
+def _alpha(size: int) -> float:
+    if size == 16:
+        return 0.673
+    if size == 32:
+        return 0.697
+    if size == 64:
+        return 0.709
+    return 0.7213 / (1 + 1.079 / size)
+
+
+def parse_fields(spec: Union[None, str, Iterable[str]]) -> Tuple[str, ...]:
+    """``"eventId,source"`` (or an iterable of names) as a validated tuple, in first-seen order."""
+    if not spec:
+        return ()
+    names = spec.split(",") if isinstance(spec, str) else spec
+    fields: Dict[str, None] = {}
+    for name in names:
+        name = name.strip()
+        if not name:
+            continue
+        if name not in DISTINCT_FIELDS:
+            raise ValueError(
+                f"Unknown distinct field: {name} (expected {' or '.join(DISTINCT_FIELDS)})."
+            )
+        fields[name] = None
+    return tuple(fields)
+
+
+def field_value(record: Dict[str, Any], field: str) -> Optional[str]:
+    if field == "eventId":
+        context = record.get("context")
+        value = context.get("eventId") if isinstance(context, dict) else None
+    else:
+        value = record.get(field)
+    if value is None or value == "":
+        return None
+    return str(value)
+
+
+def merge_sketch(
+    sketches: Dict[Any, HyperLogLog],
+    key: Any,
+    sketch: HyperLogLog,
+) -> None:
+    """Fold ``sketch`` into ``sketches[key]`` without mutating ``sketch``."""
+    existing = sketches.get(key)
+    if existing is None:
+        sketches[key] = sketch.copy()
+    else:
+        existing.merge(sketch)
+
+
+def sketch_hours(
+    records: Iterable[Dict[str, Any]],
+    fields: Iterable[str] = DISTINCT_FIELDS,
+) -> HourSketches:
+    """Per-hour sketches of ``fields`` for records with a type and readable timestamp."""
+    fields = tuple(fields)
+    sketches: HourSketches = {}
+    for record in records:
+        signal_type = record.get("type")
+        if not signal_type:
+            continue
+        try:
+            hour = hour_key(parse_iso8601(record["timestamp"]))
+        except (KeyError, TypeError, ValueError):
+            continue
+        for name in fields:
+            value = field_value(record, name)
+            if value is None:
+                continue
+            key = (hour, signal_type, name)
+            sketch = sketches.get(key)
+            if sketch is None:
+                sketch = sketches[key] = HyperLogLog()
+            sketch.add(value)
+    return sketches
+
+
+def encode_hour_sketches(sketches: HourSketches) -> Dict[str, Dict[str, Dict[str, str]]]:
+    nested: Dict[str, Dict[str, Dict[str, str]]] = defaultdict(lambda: defaultdict(dict))
+    for (hour, signal_type, name), sketch in sorted(sketches.items(), key=lambda item: item[0]):
+        nested[hour][signal_type][name] = sketch.encode()
+    return {hour: dict(by_type) for hour, by_type in nested.items()}
+
+
+def decode_hour_sketches(nested: Dict[str, Dict[str, Dict[str, str]]]) -> HourSketches:
+    """Inverse of ``encode_hour_sketches``; rollups written before hourly history have day keys."""
+    sketches: HourSketches = {}
+    for key, by_type in nested.items():
+        for signal_type, by_field in by_type.items():
+            for name, text in by_field.items():
+                sketches[(key, signal_type, name)] = HyperLogLog.decode(text)
+    return sketches
@@ -1,11 +1,134 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+from . import eventindex, wal
+from .metrics import STORAGE_SECONDS
+from .profiling import profiled
+from .sketches import HourSketches
 
-def load_signals(path: Path) -> List[Dict[str, Any]]:
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows has no flock.
+    fcntl = None
+
+# Fold the WAL into signals.json once it grows past this many bytes.
+CHECKPOINT_BYTES = int(os.environ.get("SIGNALS_WAL_CHECKPOINT_BYTES", str(4 << 20)))
+# fsync every append; set SIGNALS_WAL_FSYNC=0 to trade durability for latency.
+WAL_FSYNC = os.environ.get("SIGNALS_WAL_FSYNC", "1") != "0"
+
+# Fallback for platforms without flock; only serializes threads of one process.
+_THREAD_LOCK = threading.Lock()
+# Lock files held by the current thread, so nested storage_lock() calls are no-ops.
+_HELD = threading.local()
+# Per WAL file: (generation, offset) up to which this process has verified the frames.
+_VERIFIED: Dict[str, Tuple[Optional[bytes], int]] = {}
+
+
+@dataclass
+class StatsInputs:
+    """Everything an aggregation reads, taken under one shared lock."""
+
+    records: List[Dict[str, Any]]
+    history: Dict[Tuple[str, str], int]
+    sketches: Optional[HourSketches] = None
+
+
+@dataclass
+class RecoverySummary:
+    replayed: int = 0
+    duplicates: int = 0
+    torn_bytes: int = 0
+    quarantined: Optional[Path] = None
+
+
+def _lock_path(path: Path) -> Path:
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def storage_lock(path: Path, *, shared: bool = False) -> Iterator[None]:
+    """Lock shared by every process using ``path``: exclusive for writers, shared for readers."""
+    held: Optional[Dict[str, bool]] = getattr(_HELD, "paths", None)
+    if held is None:
+        held = _HELD.paths = {}
+    key = str(_lock_path(path))
+    if key in held:
+        if held[key] and not shared:
+            raise RuntimeError("Cannot upgrade a shared storage lock to exclusive.")
+        yield
+        return
+
+    held[key] = shared
+    try:
+        if fcntl is None:
+            with _THREAD_LOCK:
+                yield
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _lock_path(path).open("a") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+    finally:
+        del held[key]
+
+
+def _file_mode(path: Path) -> int:
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def replace_atomic(path: Path, data: bytes) -> None:
+    """Write ``data`` to a temp file next to ``path``, fsync it and rename it into place."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+    try:
+        # mkstemp creates 0600 files; keep the mode a plain open() would have given.
+        os.fchmod(fd, _file_mode(path))
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def data_generation(path: Path) -> int:
+    """Cheap token that changes whenever the signals file or its WAL changes."""
+    parts = []
+    for candidate in (path, wal.wal_path(path)):
+        try:
+            stat = candidate.stat()
+        except FileNotFoundError:
+            parts.append(None)
+            continue
+        parts.append((stat.st_mtime_ns, stat.st_size, stat.st_ino))
+    if parts == [None, None]:
+        return 0
+    return hash(tuple(parts)) & 0x7FFFFFFFFFFFFFFF
+
+
+def _read_base(path: Path) -> List[Dict[str, Any]]:
     if not path.exists():
         return []
     with path.open("r", encoding="utf-8") as handle:
@@ -15,9 +138,153 @@ def load_signals(path: Path) -> List[Dict[str, Any]]:
     return data
 
 
+def _read_all(path: Path) -> List[Dict[str, Any]]:
+    signals = _read_base(path)
+    records, _ = wal.scan(wal.wal_path(path))
+    signals.extend(records)
+    return signals
+
+
+@profiled("load_signals")
+def load_signals(path: Path) -> List[Dict[str, Any]]:
+    """The checkpointed signals file plus every intact record in its WAL.
+
+    Sealed partitions are not included: stats read their counts through
+    ``load_stats_inputs`` and ``segments.iter_segment_signals`` yields their records.
+    """
+    if not path.exists() and not wal.wal_path(path).exists():
+        return []
+    with STORAGE_SECONDS.time(operation="load"), storage_lock(path, shared=True):
+        return _read_all(path)
+
+
+@profiled("load_stats_inputs")
+def load_stats_inputs(path: Path, *, sketches: bool = False) -> StatsInputs:
+    """Raw records plus pre-counted history (and its sketches) as one consistent snapshot.
+
+    compact and seal move records from the log into rollups and segments under
+    the exclusive lock, so reading them separately could count a day twice or
+    find a segment already deleted.
+    """
+    # rollups imports this module, so it can only be imported once storage is loaded.
+    from .rollups import load_history_counts, load_history_sketches
+
+    with STORAGE_SECONDS.time(operation="load"), storage_lock(path, shared=True):
+        return StatsInputs(
+            records=_read_all(path),
+            history=load_history_counts(path),
+            sketches=load_history_sketches(path) if sketches else None,
+        )
+
+
 def append_signal(path: Path, record: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    signals = load_signals(path)
-    signals.append(record)
-    with path.open("w", encoding="utf-8") as handle:
-        json.dump(signals, handle, indent=2, sort_keys=True)
+    append_signals(path, [record])
+
+
+def append_signals(path: Path, records: List[Dict[str, Any]]) -> None:
+    """Append records to the WAL (one write, one fsync); checkpoint when it grows large."""
+    log = wal.wal_path(path)
+    with STORAGE_SECONDS.time(operation="append"), storage_lock(path):
+        _drop_torn_tail(log)
+        size = wal.append(log, records, fsync=WAL_FSYNC)
+        _VERIFIED[str(log)] = (wal.generation(log), size)
+        if size >= CHECKPOINT_BYTES:
+            _checkpoint(path)
+
+
+def _drop_torn_tail(log: Path) -> int:
+    """Cut off frames a crashed writer left half-written; caller holds the exclusive lock.
+
+    Only bytes appended since this process last looked are checked, and only
+    while the log is still the generation it looked at; other processes
+    checkpoint too.
+    """
+    try:
+        stat = log.stat()
+    except FileNotFoundError:
+        return 0
+    current = wal.generation(log)
+    seen, offset = _VERIFIED.get(str(log), (None, 0))
+    if current is None or seen != current or offset > stat.st_size:
+        offset = 0
+    _, valid_end = wal.scan(log, offset, decode=False)
+    if offset and valid_end < stat.st_size:
+        # Never cut frames on the word of a remembered offset alone.
+        _, valid_end = wal.scan(log, 0, decode=False)
+    torn = stat.st_size - valid_end
+    if torn:
+        wal.truncate(log, valid_end)
+    _VERIFIED[str(log)] = (current, valid_end)
+    return torn
+
+
+def rewrite_signals(path: Path, records: List[Dict[str, Any]]) -> None:
+    """Atomically replace the whole dataset and empty the WAL; caller holds the exclusive lock."""
+    index = eventindex.current_index(path) if eventindex.ENABLED else None
+    replace_atomic(path, json.dumps(records, indent=2, sort_keys=True).encode("utf-8"))
+    log = wal.wal_path(path)
+    # A new file rather than an in-place truncate, so other processes see the new generation.
+    _VERIFIED[str(log)] = (wal.reset(log, fsync=WAL_FSYNC), wal.HEADER_SIZE)
+    if index is not None:
+        replace_atomic(
+            eventindex.index_path(path),
+            eventindex.encode_snapshot(path, index),
+        )
+
+
+def event_counts(path: Path, event_id: str) -> Optional[Dict[Tuple[str, str], int]]:
+    """``{(day, type): count}`` for one eventId from the secondary index.
+
+    Returns ``None`` when the index is disabled or the event may have been
+    dropped by its cardinality cap.
+    """
+    if not eventindex.ENABLED:
+        return None
+    if not path.exists() and not wal.wal_path(path).exists():
+        return {}
+    with storage_lock(path, shared=True):
+        return eventindex.lookup(path, event_id)
+
+
+def _checkpoint(path: Path) -> None:
+    with STORAGE_SECONDS.time(operation="checkpoint"):
+        rewrite_signals(path, _read_all(path))
+
+
+def recover_storage(path: Path) -> RecoverySummary:
+    """Startup replay: truncate a torn WAL tail and fold the log into the signals file.
+
+    A signals file left unreadable by an older in-place writer is moved aside to
+    ``<name>.corrupt-<timestamp>`` so the service can start. WAL records already
+    present in the signals file or a sealed partition (a crash between checkpoint
+    or seal steps) are skipped.
+    """
+    summary = RecoverySummary()
+    log = wal.wal_path(path)
+    if not path.exists() and not log.exists():
+        return summary
+    with storage_lock(path):
+        try:
+            base = _read_base(path)
+        except ValueError:
+            summary.quarantined = path.with_name(f"{path.name}.corrupt-{int(time.time())}")
+            os.replace(path, summary.quarantined)
+            base = []
+        summary.torn_bytes = _drop_torn_tail(log)
+        records, _ = wal.scan(log)
+        if not records and summary.quarantined is None:
+            return summary
+        # segments imports this module, so it can only be imported once storage is loaded.
+        from .segments import iter_segment_signals
+
+        known = {record.get("signalId") for record in base if isinstance(record, dict)}
+        known.update(record["signalId"] for record in iter_segment_signals(path))
+        known.discard(None)
+        for record in records:
+            if record.get("signalId") in known:
+                summary.duplicates += 1
+                continue
+            base.append(record)
+            summary.replayed += 1
+        rewrite_signals(path, base)
+    return summary
@@ -0,0 +1,145 @@
+"""Dependency-free SVG versions of the basic charts, used when matplotlib is absent."""
+
+from __future__ import annotations
+
+from typing import List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+WIDTH = 1000
+HEIGHT = 400
+MARGIN_LEFT = 60
+MARGIN_RIGHT = 20
+MARGIN_TOP = 40
+MARGIN_BOTTOM = 90
+MAX_X_LABELS = 30
+Y_TICKS = 5
+# matplotlib's default colour cycle, so both renderers look alike.
+PALETTE = (
+    "#1f77b4",
+    "#ff7f0e",
+    "#2ca02c",
+    "#d62728",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#7f7f7f",
+    "#bcbd22",
+    "#17becf",
+)
+
+
+class _Canvas:
+    def __init__(self, title: str, x_label: str, y_max: int) -> None:
+        self.parts: List[str] = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+            f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="sans-serif" font-size="11">',
+            f'<rect width="{WIDTH}" height="{HEIGHT}" fill="white"/>',
+            f'<text x="{WIDTH / 2}" y="22" text-anchor="middle" font-size="14">{escape(title)}</text>',
+            f'<text x="{WIDTH / 2}" y="{HEIGHT - 8}" text-anchor="middle">{escape(x_label)}</text>',
+            f'<text x="14" y="{HEIGHT / 2}" text-anchor="middle" '
+            f'transform="rotate(-90 14 {HEIGHT / 2})">Count</text>',
+        ]
+        self.left = MARGIN_LEFT
+        self.top = MARGIN_TOP
+        self.width = WIDTH - MARGIN_LEFT - MARGIN_RIGHT
+        self.height = HEIGHT - MARGIN_TOP - MARGIN_BOTTOM
+        self.y_max = max(1, y_max)
+        self._axes()
+
+    def y(self, value: float) -> float:
+        return self.top + self.height - value / self.y_max * self.height
+
+    def _axes(self) -> None:
+        bottom = self.top + self.height
+        self.parts.append(
+            f'<path d="M{self.left},{self.top} V{bottom} H{self.left + self.width}" '
+            'stroke="black" fill="none"/>'
+        )
+        for step in range(Y_TICKS + 1):
+            value = self.y_max * step / Y_TICKS
+            y = self.y(value)
+            label = f"{value:.0f}" if self.y_max >= Y_TICKS else f"{value:.1f}"
+            self.parts.append(
+                f'<line x1="{self.left - 4}" y1="{y:.1f}" x2="{self.left}" y2="{y:.1f}" stroke="black"/>'
+                f'<text x="{self.left - 6}" y="{y + 4:.1f}" text-anchor="end">{label}</text>'
+            )
+
+    def slot(self, index: int, count: int) -> Tuple[float, float]:
+        """Left edge and width of category ``index`` out of ``count``."""
+        width = self.width / max(1, count)
+        return self.left + index * width, width
+
+    def x_labels(self, labels: Sequence[str]) -> None:
+        step = max(1, -(-len(labels) // MAX_X_LABELS))
+        bottom = self.top + self.height
+        for index in range(0, len(labels), step):
+            left, width = self.slot(index, len(labels))
+            x = left + width / 2
+            self.parts.append(
+                f'<text x="{x:.1f}" y="{bottom + 14}" text-anchor="end" '
+                f'transform="rotate(-45 {x:.1f} {bottom + 14})">{escape(labels[index])}</text>'
+            )
+
+    def legend(self, labels: Sequence[str]) -> None:
+        x = self.left + self.width - 220
+        for index, label in enumerate(labels):
+            y = self.top + 6 + index * 16
+            self.parts.append(
+                f'<rect x="{x}" y="{y}" width="10" height="10" fill="{PALETTE[index % len(PALETTE)]}"/>'
+                f'<text x="{x + 14}" y="{y + 9}">{escape(label)}</text>'
+            )
+
+    def render(self) -> str:
+        return "".join(self.parts) + "</svg>"
+
+
+def counts_by_window(windows: Sequence[str], totals: Sequence[int]) -> str:
+    canvas = _Canvas("Total Signals by Window", "Window", max(totals, default=0))
+    points = []
+    for index, total in enumerate(totals):
+        left, width = canvas.slot(index, len(totals))
+        points.append((left + width / 2, canvas.y(total)))
+    if points:
+        path = " ".join(f"{x:.1f},{y:.1f}" for x, y in points)
+        canvas.parts.append(f'<polyline points="{path}" fill="none" stroke="{PALETTE[0]}"/>')
+        canvas.parts.extend(
+            f'<circle cx="{x:.1f}" cy="{y:.1f}" r="3" fill="{PALETTE[0]}"/>' for x, y in points
+        )
+    canvas.x_labels(windows)
+    return canvas.render()
+
+
+def stacked_by_type(
+    windows: Sequence[str],
+    types: Sequence[str],
+    matrix: Sequence[Sequence[int]],
+) -> str:
+    canvas = _Canvas("Stacked Signals by Type", "Window", max((sum(row) for row in matrix), default=0))
+    for index, row in enumerate(matrix):
+        left, width = canvas.slot(index, len(matrix))
+        bottom = 0
+        for type_index, value in enumerate(row):
+            if value:
+                top = canvas.y(bottom + value)
+                canvas.parts.append(
+                    f'<rect x="{left + width * 0.1:.1f}" y="{top:.1f}" width="{width * 0.8:.1f}" '
+                    f'height="{canvas.y(bottom) - top:.1f}" '
+                    f'fill="{PALETTE[type_index % len(PALETTE)]}"/>'
+                )
+            bottom += value
+    canvas.x_labels(windows)
+    canvas.legend(types)
+    return canvas.render()
+
+
+def totals_by_type(types: Sequence[str], totals: Sequence[int]) -> str:
+    canvas = _Canvas("Totals by Signal Type", "Signal Type", max(totals, default=0))
+    for index, total in enumerate(totals):
+        left, width = canvas.slot(index, len(totals))
+        top = canvas.y(total)
+        canvas.parts.append(
+            f'<rect x="{left + width * 0.1:.1f}" y="{top:.1f}" width="{width * 0.8:.1f}" '
+            f'height="{canvas.y(0) - top:.1f}" fill="{PALETTE[0]}"/>'
+        )
+    canvas.x_labels(types)
+    return canvas.render()
@@ -14,6 +14,15 @@ def format_iso8601(value: datetime) -> str:
     return value.astimezone(timezone.utc).replace(microsecond=0).isoformat().replace("+00:00", "Z")
 
 
+def hour_key(value: datetime) -> str:
+    """``YYYY-MM-DDTHH`` of the UTC hour holding ``value``; keys pre-counted history."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H")
+
+
+def parse_hour_key(key: str) -> datetime:
+    return datetime.strptime(key, "%Y-%m-%dT%H").replace(tzinfo=timezone.utc)
+
+
 def normalize_text(value: Optional[str]) -> Optional[str]:
     if value is None:
         return None
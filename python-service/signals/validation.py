@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from uuid import uuid4
 
+from .profiling import profiled
 from .types import ALLOWED_SIGNAL_TYPES
 from .utils import format_iso8601, normalize_text, parse_iso8601
 
@@ -14,89 +15,151 @@ MAX_DAYS_PAST = 365
 MAX_MINUTES_FUTURE = 10
 
 
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class SignalValidator:
+    """Validation plan compiled once from the limits above.
+
+    ``check`` returns the errors together with the parsed timestamp so that
+    ``normalize`` never parses twice. Inject ``clock`` for batch work: when it
+    keeps returning the same ``datetime`` object the bounds are reused too.
+    """
+
+    def __init__(
+        self,
+        *,
+        clock: Callable[[], datetime] = _utcnow,
+        allowed_types: Iterable[str] = ALLOWED_SIGNAL_TYPES,
+        allowed_sources: Iterable[str] = ALLOWED_SOURCES,
+        max_note_length: int = MAX_NOTE_LENGTH,
+        max_event_id_length: int = MAX_EVENT_ID_LENGTH,
+        max_days_past: int = MAX_DAYS_PAST,
+        max_minutes_future: int = MAX_MINUTES_FUTURE,
+    ) -> None:
+        self._clock = clock
+        self._allowed_types = frozenset(allowed_types)
+        self._allowed_sources = frozenset(allowed_sources)
+        self._max_note_length = max_note_length
+        self._max_event_id_length = max_event_id_length
+        self._past = timedelta(days=max_days_past)
+        self._future = timedelta(minutes=max_minutes_future)
+        self._note_too_long = f"Context note exceeds {max_note_length} characters."
+        self._event_id_too_long = f"Context eventId exceeds {max_event_id_length} characters."
+        self._bounds_for: Optional[datetime] = None
+        self._bounds: Tuple[datetime, datetime] = (datetime.min, datetime.max)
+
+    def _time_bounds(self) -> Tuple[datetime, datetime]:
+        now = self._clock()
+        if now is not self._bounds_for:
+            self._bounds = (now - self._past, now + self._future)
+            self._bounds_for = now
+        return self._bounds
+
+    def check(self, payload: Any) -> Tuple[List[str], Optional[datetime]]:
+        """Return ``(errors, parsed timestamp)``; the timestamp is None when invalid."""
+        if not isinstance(payload, dict):
+            return ["Payload must be a JSON object."], None
+        errors: List[str] = []
+        timestamp: Optional[datetime] = None
+
+        signal_type = payload.get("type")
+        if not signal_type or not isinstance(signal_type, str):
+            errors.append("Signal type is required.")
+        elif signal_type not in self._allowed_types:
+            errors.append(f"Signal type '{signal_type}' is not allowed.")
+
+        timestamp_raw = payload.get("timestamp")
+        if not timestamp_raw or not isinstance(timestamp_raw, str):
+            errors.append("Timestamp is required and must be a string.")
+        else:
+            try:
+                timestamp = parse_iso8601(timestamp_raw)
+            except ValueError:
+                errors.append("Timestamp must be valid ISO-8601.")
+            else:
+                earliest, latest = self._time_bounds()
+                if timestamp < earliest:
+                    errors.append("Timestamp is too far in the past.")
+                if timestamp > latest:
+                    errors.append("Timestamp is too far in the future.")
+
+        context = payload.get("context")
+        if context is not None:
+            if not isinstance(context, dict):
+                errors.append("Context must be an object when provided.")
+            else:
+                note = context.get("note")
+                if note is not None:
+                    if not isinstance(note, str):
+                        errors.append("Context note must be a string.")
+                    elif (
+                        len(note) > self._max_note_length
+                        and len(note.strip()) > self._max_note_length
+                    ):
+                        errors.append(self._note_too_long)
+
+                event_id = context.get("eventId")
+                if event_id is not None:
+                    if not isinstance(event_id, str):
+                        errors.append("Context eventId must be a string.")
+                    elif (
+                        len(event_id) > self._max_event_id_length
+                        and len(event_id.strip()) > self._max_event_id_length
+                    ):
+                        errors.append(self._event_id_too_long)
+
+        source = payload.get("source")
+        if source is not None:
+            if not isinstance(source, str):
+                errors.append("Source must be a string.")
+            elif source not in self._allowed_sources:
+                errors.append("Source is not allowed.")
+
+        version = payload.get("version")
+        if version is not None:
+            if not isinstance(version, int):
+                errors.append("Version must be an integer.")
+            elif version < 1:
+                errors.append("Version must be >= 1.")
+
+        return errors, (timestamp if not errors else None)
+
+    def normalize(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize optional fields so aggregation logic is consistent."""
+        errors, timestamp = self.check(payload)
+        if errors:
+            raise ValueError("; ".join(errors))
+
+        context = payload.get("context") or {}
+        normalized_context = {}
+        note = normalize_text(context.get("note"))
+        event_id = normalize_text(context.get("eventId"))
+        if note:
+            normalized_context["note"] = note
+        if event_id:
+            normalized_context["eventId"] = event_id
+
+        return {
+            "signalId": payload.get("signalId") or str(uuid4()),
+            "type": payload["type"],
+            "timestamp": format_iso8601(timestamp),
+            "context": normalized_context,
+            "source": payload.get("source") or "form",
+            "version": payload.get("version") or 1,
+        }
+
+
+DEFAULT_VALIDATOR = SignalValidator()
+
+
 def validate_signal_payload(payload: Dict[str, Any]) -> List[str]:
     """Validation protects storage integrity and keeps aggregation safe."""
-    errors: List[str] = []
-
-    if not isinstance(payload, dict):
-        return ["Payload must be a JSON object."]
-
-    signal_type = payload.get("type")
-    if not signal_type or not isinstance(signal_type, str):
-        errors.append("Signal type is required.")
-    elif signal_type not in ALLOWED_SIGNAL_TYPES:
-        errors.append(f"Signal type '{signal_type}' is not allowed.")
-
-    timestamp_raw = payload.get("timestamp")
-    if not timestamp_raw or not isinstance(timestamp_raw, str):
-        errors.append("Timestamp is required and must be a string.")
-    else:
-        try:
-            timestamp = parse_iso8601(timestamp_raw)
-            now = datetime.now(timezone.utc)
-            if timestamp < now - timedelta(days=MAX_DAYS_PAST):
-                errors.append("Timestamp is too far in the past.")
-            if timestamp > now + timedelta(minutes=MAX_MINUTES_FUTURE):
-                errors.append("Timestamp is too far in the future.")
-        except ValueError:
-            errors.append("Timestamp must be valid ISO-8601.")
-
-    context = payload.get("context")
-    if context is not None and not isinstance(context, dict):
-        errors.append("Context must be an object when provided.")
-
-    if isinstance(context, dict):
-        note = context.get("note")
-        if note is not None and not isinstance(note, str):
-            errors.append("Context note must be a string.")
-        elif isinstance(note, str) and len(note.strip()) > MAX_NOTE_LENGTH:
-            errors.append(f"Context note exceeds {MAX_NOTE_LENGTH} characters.")
-
-        event_id = context.get("eventId")
-        if event_id is not None and not isinstance(event_id, str):
-            errors.append("Context eventId must be a string.")
-        elif isinstance(event_id, str) and len(event_id.strip()) > MAX_EVENT_ID_LENGTH:
-            errors.append(f"Context eventId exceeds {MAX_EVENT_ID_LENGTH} characters.")
-
-    source = payload.get("source")
-    if source is not None:
-        if not isinstance(source, str):
-            errors.append("Source must be a string.")
-        elif source not in ALLOWED_SOURCES:
-            errors.append("Source is not allowed.")
-
-    version = payload.get("version")
-    if version is not None:
-        if not isinstance(version, int):
-            errors.append("Version must be an integer.")
-        elif version < 1:
-            errors.append("Version must be >= 1.")
-
-    return errors
+    return DEFAULT_VALIDATOR.check(payload)[0]
 
 
+@profiled("validate_and_normalize")
 def validate_and_normalize(payload: Dict[str, Any]) -> Dict[str, Any]:
     """Normalize optional fields so aggregation logic is consistent."""
-    errors = validate_signal_payload(payload)
-    if errors:
-        raise ValueError("; ".join(errors))
-
-    context = payload.get("context") or {}
-    normalized_context = {}
-    note = normalize_text(context.get("note"))
-    event_id = normalize_text(context.get("eventId"))
-    if note:
-        normalized_context["note"] = note
-    if event_id:
-        normalized_context["eventId"] = event_id
-
-    timestamp = format_iso8601(parse_iso8601(payload["timestamp"]))
-
-    return {
-        "signalId": payload.get("signalId") or str(uuid4()),
-        "type": payload["type"],
-        "timestamp": timestamp,
-        "context": normalized_context,
-        "source": payload.get("source") or "form",
-        "version": payload.get("version") or 1,
-    }
+    return DEFAULT_VALIDATOR.normalize(payload)
@@ -0,0 +1,143 @@
+"""Write-ahead log for signal appends.
+
+Each frame is ``<uint32 length><uint32 crc32>`` followed by one record as
+compact UTF-8 JSON. A frame that is short or fails its checksum marks a torn
+tail from an interrupted write; everything before it is intact.
+
+The log starts with a header holding a random generation id. A checkpoint
+swaps in a fresh log with a new generation, so an offset remembered by
+another process is only reused while the generation still matches.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+FRAME = struct.Struct("<II")
+MAX_FRAME_BYTES = 1 << 24
+MAGIC = b"SIGWAL1\0"
+HEADER_SIZE = len(MAGIC) + 8
+
+
+def wal_path(data_path: Path) -> Path:
+    return data_path.with_name(data_path.name + ".wal")
+
+
+def _header() -> bytes:
+    return MAGIC + os.urandom(8)
+
+
+def generation(path: Path) -> Optional[bytes]:
+    """The log's generation id; ``None`` when it is missing or has no header."""
+    try:
+        with path.open("rb") as handle:
+            header = handle.read(HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    if len(header) < HEADER_SIZE or not header.startswith(MAGIC):
+        return None
+    return header[len(MAGIC) :]
+
+
+def encode(records: Iterable[Dict[str, Any]]) -> bytes:
+    frames = bytearray()
+    for record in records:
+        payload = json.dumps(record, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        frames += FRAME.pack(len(payload), zlib.crc32(payload))
+        frames += payload
+    return bytes(frames)
+
+
+def scan(
+    path: Path,
+    start: int = 0,
+    *,
+    decode: bool = True,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """Read frames from ``start``; returns the records and the offset where valid data ends."""
+    records: List[Dict[str, Any]] = []
+    try:
+        with path.open("rb") as handle:
+            handle.seek(start)
+            data = handle.read()
+    except FileNotFoundError:
+        return records, 0
+    position = 0
+    if start == 0 and data.startswith(MAGIC) and len(data) >= HEADER_SIZE:
+        position = HEADER_SIZE
+    while position + FRAME.size <= len(data):
+        length, checksum = FRAME.unpack_from(data, position)
+        end = position + FRAME.size + length
+        if length > MAX_FRAME_BYTES or end > len(data):
+            break
+        payload = data[position + FRAME.size : end]
+        if zlib.crc32(payload) != checksum:
+            break
+        if decode:
+            try:
+                records.append(json.loads(payload))
+            except ValueError:
+                break
+        position = end
+    return records, start + position
+
+
+def append(path: Path, records: Iterable[Dict[str, Any]], *, fsync: bool = True) -> int:
+    """Append frames in one write and return the new log size.
+
+    An empty log gets its header in the same write; callers hold the storage lock.
+    """
+    frames = encode(records)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        if os.fstat(fd).st_size == 0:
+            frames = _header() + frames
+        view = memoryview(frames)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        if fsync:
+            os.fsync(fd)
+        return os.fstat(fd).st_size
+    finally:
+        os.close(fd)
+
+
+def reset(path: Path, *, fsync: bool = True) -> bytes:
+    """Atomically replace the log with an empty one of a new generation; returns the generation."""
+    header = _header()
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, header)
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp, path)
+    return header[len(MAGIC) :]
+
+
+def truncate(path: Path, length: int, *, fsync: bool = True) -> None:
+    try:
+        fd = os.open(path, os.O_WRONLY)
+    except FileNotFoundError:
+        return
+    try:
+        os.ftruncate(fd, length)
+        if fsync:
+            os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def size(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,164 @@
+"""Aggregation windows as integer bucket ids.
+
+Every window numbers its buckets on the wall clock of its time zone: days
+since 1970-01-01 for ``day``, Monday-aligned weeks for ``week``, months since
+January 1970 for ``month``, and N-minute slots for ``hour`` and ``<N>min``.
+Consecutive windows are consecutive integers, so gaps are filled with
+``range()`` and dates or labels are only built for output.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone, tzinfo
+from functools import lru_cache
+from typing import Callable, Optional, Union
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:  # pragma: no cover - Python < 3.9 only supports UTC.
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+CALENDAR_WINDOWS = ("day", "week", "month")
+# Longest run of windows one aggregation may produce once gaps are filled.
+MAX_WINDOWS = int(os.environ.get("SIGNALS_MAX_WINDOWS", "100000"))
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# 1970-01-01 was a Thursday; shifting by three days puts week boundaries on Mondays.
+_WEEK_SHIFT = 3
+_MINUTES_PER_DAY = 24 * 60
+_MINUTES = re.compile(r"^(\d+)min$")
+
+
+@lru_cache(maxsize=64)
+def _zone(name: str) -> tzinfo:
+    if name.upper() == "UTC":
+        return timezone.utc
+    if ZoneInfo is None:
+        raise ValueError("Time zones other than UTC need Python 3.9+.")
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}") from None
+
+
+@dataclass(frozen=True)
+class WindowSpec:
+    name: str
+    tz: str = "UTC"
+    # Slot length for sub-day windows; 0 for day, week and month.
+    minutes: int = 0
+
+    @property
+    def key(self) -> str:
+        """Stable identifier for caches and error messages."""
+        return self.name if self.tz == "UTC" else f"{self.name}@{self.tz}"
+
+    @property
+    def calendar(self) -> bool:
+        return not self.minutes
+
+    def bucketer(self) -> Callable[[datetime], int]:
+        """Function from a UTC datetime (as ``parse_iso8601`` returns) to its bucket id."""
+        of_local = self._local_bucketer()
+        zone = _zone(self.tz)
+        if zone is timezone.utc:
+            return of_local
+        return lambda timestamp: of_local(timestamp.astimezone(zone))
+
+    def bucket_of_day(self, day: date) -> int:
+        """Bucket holding a local calendar date; only defined for day, week and month."""
+        if not self.calendar:
+            raise ValueError(f"'{self.name}' windows cannot be built from daily counts.")
+        return self._local_bucketer()(day)
+
+    def bucket_of_hour(self, hour: datetime) -> int:
+        """Bucket holding a whole UTC hour; ValueError when the hour would straddle two buckets."""
+        if self.minutes % 60:
+            raise ValueError(
+                f"'{self.name}' windows are finer than the hourly counts kept for compacted, "
+                "sealed and eventId history; use an hour-multiple window."
+            )
+        zone = _zone(self.tz)
+        local = hour if zone is timezone.utc else hour.astimezone(zone)
+        if local.minute or local.second:
+            raise ValueError(
+                f"{self.tz} is not a whole number of hours from UTC at {hour:%Y-%m-%d %H}:00Z, "
+                "so hourly history cannot be split into its windows."
+            )
+        return self._local_bucketer()(local)
+
+    def start(self, bucket: int) -> Union[date, datetime]:
+        """First day (calendar windows) or aware start time (sub-day windows) of a bucket."""
+        if self.name == "day":
+            return date.fromordinal(bucket + _EPOCH_ORDINAL)
+        if self.name == "week":
+            return date.fromordinal(bucket * 7 - _WEEK_SHIFT + _EPOCH_ORDINAL)
+        if self.name == "month":
+            year, month = divmod(bucket, 12)
+            return date(1970 + year, month + 1, 1)
+        days, minute = divmod(bucket * self.minutes, _MINUTES_PER_DAY)
+        return datetime.combine(
+            date.fromordinal(days + _EPOCH_ORDINAL),
+            time(minute // 60, minute % 60),
+            tzinfo=_zone(self.tz),
+        )
+
+    def label(self, bucket: int) -> str:
+        return self.start(bucket).isoformat()
+
+    def parse_label(self, label: str) -> int:
+        """Inverse of ``label``; rejects values that do not start a window."""
+        if self.calendar:
+            day = date.fromisoformat(label)
+            bucket = self.bucket_of_day(day)
+            if self.start(bucket) != day:
+                raise ValueError(f"{label} does not start a '{self.name}' window.")
+            return bucket
+        moment = datetime.fromisoformat(label)
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(_zone(self.tz))
+        bucket = self._local_bucketer()(moment)
+        if self.start(bucket).replace(tzinfo=None) != moment.replace(tzinfo=None):
+            raise ValueError(f"{label} does not start a '{self.name}' window.")
+        return bucket
+
+    def _local_bucketer(self) -> Callable[[date], int]:
+        if self.name == "day":
+            return lambda moment: moment.toordinal() - _EPOCH_ORDINAL
+        if self.name == "week":
+            return lambda moment: (moment.toordinal() - _EPOCH_ORDINAL + _WEEK_SHIFT) // 7
+        if self.name == "month":
+            return lambda moment: (moment.year - 1970) * 12 + moment.month - 1
+        minutes = self.minutes
+        return lambda moment: (
+            (moment.toordinal() - _EPOCH_ORDINAL) * _MINUTES_PER_DAY
+            + moment.hour * 60
+            + moment.minute
+        ) // minutes
+
+
+def parse_window(name: str, tz: Optional[str] = None) -> WindowSpec:
+    """``day``, ``week``, ``month``, ``hour`` or ``<N>min`` in an IANA time zone (default UTC)."""
+    tz = (tz or "UTC").strip() or "UTC"
+    _zone(tz)
+    if tz.upper() == "UTC":
+        tz = "UTC"
+    if name in CALENDAR_WINDOWS:
+        return WindowSpec(name, tz)
+    if name == "hour":
+        return WindowSpec(name, tz, 60)
+    match = _MINUTES.match(name or "")
+    if match:
+        minutes = int(match.group(1))
+        if 0 < minutes <= _MINUTES_PER_DAY and _MINUTES_PER_DAY % minutes == 0:
+            return WindowSpec(name, tz, minutes)
+        raise ValueError("Minute windows must evenly divide a day (e.g. 5min, 15min, 120min).")
+    raise ValueError("Window must be 'day', 'week', 'month', 'hour' or '<N>min'.")
+
+
+def resolve_window(window: Union[str, WindowSpec]) -> WindowSpec:
+    return window if isinstance(window, WindowSpec) else parse_window(window)
@@ -1,25 +1,83 @@
 from __future__ import annotations
 
+import argparse
 import json
+import os
+import signal
+import time
+import traceback
+from concurrent.futures import TimeoutError as FutureTimeout
 from datetime import datetime, timezone
 from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from urllib.parse import parse_qs, urlparse
 
-from signals.aggregation import aggregate_signals
-from signals.storage import append_signal, load_signals
+from signals.admission import IngestAdmission
+from signals.aggregation import aggregate_signals, count_groups
+from signals.cache import SharedStatsCache
+from signals.chartcache import CONTENT_TYPES, RENDER_TIMEOUT, ChartCache, parse_chart_file
+from signals.charts import ChartUnavailableError
+from signals.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    REGISTRY,
+    endpoint_label,
+)
+from signals.profiling import PROFILER
+from signals.sketches import parse_fields
+from signals.storage import (
+    append_signal,
+    data_generation,
+    event_counts,
+    load_stats_inputs,
+    recover_storage,
+)
 from signals.types import SIGNAL_TYPES
 from signals.utils import format_iso8601
-from signals.validation import validate_and_normalize
+from signals.validation import MAX_EVENT_ID_LENGTH, validate_and_normalize
+from signals.windows import WindowSpec, parse_window
 
 DATA_PATH = Path(__file__).parent / "data" / "signals.json"
 
+# Shared between pre-forked workers; created in main() before forking.
+STATS_CACHE: Optional[SharedStatsCache] = None
+# Rendered chart images; per process, rendered off the request threads.
+CHART_CACHE = ChartCache()
+# Rate limits and the ingest queue are per process (per worker when pre-forked).
+INGEST_ADMISSION = IngestAdmission.from_env()
 
-def _json_response(handler: BaseHTTPRequestHandler, status: int, payload: Any) -> None:
-    body = json.dumps(payload, indent=2).encode("utf-8")
+
+def _json_response(
+    handler: BaseHTTPRequestHandler,
+    status: int,
+    payload: Any,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    _send_json_body(handler, status, json.dumps(payload, indent=2).encode("utf-8"), headers)
+
+
+def _send_json_body(
+    handler: BaseHTTPRequestHandler,
+    status: int,
+    body: bytes,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
+    _send_body(handler, status, body, "application/json; charset=utf-8", headers)
+
+
+def _send_body(
+    handler: BaseHTTPRequestHandler,
+    status: int,
+    body: bytes,
+    content_type: str,
+    headers: Optional[Dict[str, str]] = None,
+) -> None:
     handler.send_response(status)
-    handler.send_header("Content-Type", "application/json; charset=utf-8")
+    handler.send_header("Content-Type", content_type)
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
     handler.send_header("Content-Length", str(len(body)))
     # CORS (dev-friendly). In production, restrict Access-Control-Allow-Origin.
     handler.send_header("Access-Control-Allow-Origin", "*")
@@ -41,7 +99,55 @@ def _read_json(handler: BaseHTTPRequestHandler) -> Tuple[bool, Any]:
         return False, {"error": "Body must be valid JSON"}
 
 
+def _load_stats(window: WindowSpec, distinct: Tuple[str, ...] = ()) -> List[Any]:
+    inputs = load_stats_inputs(DATA_PATH, sketches=bool(distinct))
+    return aggregate_signals(
+        inputs.records,
+        window=window,
+        rollups=inputs.history,
+        distinct=distinct,
+        sketches=inputs.sketches,
+    )
+
+
+def _stats_body(window: WindowSpec, distinct: Tuple[str, ...] = ()) -> bytes:
+    generation = data_generation(DATA_PATH)
+    key = f"{window.key}|{','.join(distinct)}" if distinct else window.key
+    if STATS_CACHE is not None:
+        cached = STATS_CACHE.get(key, generation)
+        if cached is not None:
+            return cached
+
+    stats = _load_stats(window, distinct)
+    body = json.dumps([stat.to_dict() for stat in stats], indent=2).encode("utf-8")
+    if STATS_CACHE is not None:
+        STATS_CACHE.put(key, generation, body)
+    return body
+
+
 class Handler(BaseHTTPRequestHandler):
+    _status = 0
+
+    def send_response(self, code: int, message: Optional[str] = None) -> None:
+        self._status = code
+        super().send_response(code, message)
+
+    def _instrumented(self, method: str, handle: Callable[[], None]) -> None:
+        endpoint = endpoint_label(urlparse(self.path).path.rstrip("/") or "/")
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            with PROFILER.capture(f"http {method} {endpoint}"):
+                handle()
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                endpoint=endpoint,
+                method=method,
+                status=str(self._status or 500),
+            )
+
     def log_message(self, format: str, *args: Any) -> None:  # noqa: A003
         # Keep output minimal for hackathon demos.
         return
@@ -54,6 +160,12 @@ class Handler(BaseHTTPRequestHandler):
         self.end_headers()
 
     def do_GET(self) -> None:  # noqa: N802
+        self._instrumented("GET", self._handle_get)
+
+    def do_POST(self) -> None:  # noqa: N802
+        self._instrumented("POST", self._handle_post)
+
+    def _handle_get(self) -> None:
         parsed = urlparse(self.path)
         path = parsed.path.rstrip("/") or "/"
         query = parse_qs(parsed.query)
@@ -62,6 +174,10 @@ class Handler(BaseHTTPRequestHandler):
             _json_response(self, 200, {"status": "ok"})
             return
 
+        if path == "/metrics":
+            _send_body(self, 200, REGISTRY.render().encode("utf-8"), METRICS_CONTENT_TYPE)
+            return
+
         if path == "/signal-types":
             _json_response(
                 self,
@@ -71,19 +187,125 @@ class Handler(BaseHTTPRequestHandler):
             return
 
         if path == "/stats":
-            window = (query.get("window", ["day"])[0] or "day").strip()
-            if window not in {"day", "week"}:
-                _json_response(self, 400, {"error": "window must be 'day' or 'week'"})
+            window = self._window_param(query)
+            if window is None:
                 return
 
-            signals = load_signals(DATA_PATH)
-            stats = aggregate_signals(signals, window=window)
-            _json_response(self, 200, [stat.to_dict() for stat in stats])
+            try:
+                distinct = parse_fields(query.get("distinct", [""])[0])
+            except ValueError as exc:
+                _json_response(self, 400, {"error": str(exc)})
+                return
+
+            event_id = (query.get("eventId", [""])[0] or "").strip()
+            if event_id:
+                if distinct:
+                    _json_response(self, 400, {"error": "distinct is not available with eventId"})
+                    return
+                self._send_event_stats(event_id, window)
+                return
+
+            try:
+                body = _stats_body(window, distinct)
+            except ValueError as exc:
+                _json_response(self, 400, {"error": str(exc)})
+                return
+            _send_json_body(self, 200, body)
+            return
+
+        if path == "/stats/partial":
+            window = self._window_param(query)
+            if window is None:
+                return
+            try:
+                distinct = parse_fields(query.get("distinct", [""])[0])
+            except ValueError as exc:
+                _json_response(self, 400, {"error": str(exc)})
+                return
+
+            try:
+                inputs = load_stats_inputs(DATA_PATH, sketches=bool(distinct))
+                partial = count_groups(
+                    inputs.records,
+                    window=window,
+                    rollups=inputs.history,
+                    distinct=distinct,
+                    sketches=inputs.sketches,
+                )
+            except ValueError as exc:
+                _json_response(self, 400, {"error": str(exc)})
+                return
+            _json_response(self, 200, partial.to_dict())
+            return
+
+        if path.startswith("/charts/"):
+            self._send_chart(path[len("/charts/") :], query)
             return
 
         _json_response(self, 404, {"error": "Not found"})
 
-    def do_POST(self) -> None:  # noqa: N802
+    def _window_param(self, query: Dict[str, List[str]]) -> Optional[WindowSpec]:
+        """``window`` and ``tz`` query parameters; sends a 400 and returns None when invalid."""
+        try:
+            return parse_window(
+                (query.get("window", ["day"])[0] or "day").strip(),
+                query.get("tz", [""])[0],
+            )
+        except ValueError as exc:
+            _json_response(self, 400, {"error": str(exc)})
+            return None
+
+    def _send_event_stats(self, event_id: str, window: WindowSpec) -> None:
+        if len(event_id) > MAX_EVENT_ID_LENGTH:
+            _json_response(self, 400, {"error": "eventId is too long"})
+            return
+        counts = event_counts(DATA_PATH, event_id)
+        if counts is None:
+            _json_response(self, 404, {"error": "eventId is not indexed"})
+            return
+        try:
+            stats = aggregate_signals([], window=window, rollups=counts)
+        except ValueError as exc:
+            _json_response(self, 400, {"error": str(exc)})
+            return
+        _json_response(self, 200, [stat.to_dict() for stat in stats])
+
+    def _send_chart(self, filename: str, query: Dict[str, List[str]]) -> None:
+        try:
+            name, fmt = parse_chart_file(filename)
+        except ValueError as exc:
+            _json_response(self, 404, {"error": str(exc)})
+            return
+        window = self._window_param(query)
+        if window is None:
+            return
+
+        future = CHART_CACHE.get(
+            name,
+            fmt,
+            window.key,
+            data_generation(DATA_PATH),
+            lambda: _load_stats(window),
+        )
+        try:
+            body = future.result(timeout=RENDER_TIMEOUT)
+        except ChartUnavailableError as exc:
+            _json_response(self, 501, {"error": str(exc)})
+            return
+        except ValueError as exc:
+            _json_response(self, 400, {"error": str(exc)})
+            return
+        except FutureTimeout:
+            _json_response(self, 503, {"error": "Chart rendering timed out"}, {"Retry-After": "5"})
+            return
+        except Exception:
+            # log_message is silenced, so report the failure on stderr directly.
+            traceback.print_exc()
+            _json_response(self, 500, {"error": "Chart rendering failed"})
+            return
+        _send_body(self, 200, body, CONTENT_TYPES[fmt])
+
+    def _handle_post(self) -> None:
         parsed = urlparse(self.path)
         path = parsed.path.rstrip("/") or "/"
 
@@ -91,6 +313,21 @@ class Handler(BaseHTTPRequestHandler):
             _json_response(self, 404, {"error": "Not found"})
             return
 
+        admission = INGEST_ADMISSION.admit(self.client_address[0])
+        if not admission.allowed:
+            _json_response(
+                self,
+                admission.status,
+                {"error": "Ingest is saturated, retry later", "reason": admission.reason},
+                {"Retry-After": str(admission.retry_after)},
+            )
+            return
+        try:
+            self._ingest()
+        finally:
+            INGEST_ADMISSION.release()
+
+    def _ingest(self) -> None:
         ok, body = _read_json(self)
         if not ok:
             _json_response(self, 400, body)
@@ -127,15 +364,106 @@ class Handler(BaseHTTPRequestHandler):
         _json_response(self, 201, {"ok": True, "signal": normalized})
 
 
-def main() -> None:
-    host = "127.0.0.1"
-    port = 8000
-    server = ThreadingHTTPServer((host, port), Handler)
-    print(f"Serving on http://{host}:{port}")
-    print("Endpoints: GET /health, GET /signal-types, POST /signals, GET /stats?window=day|week")
-    server.serve_forever()
+def _serve_prefork(server: ThreadingHTTPServer, workers: int) -> None:
+    # Workers inherit the bound socket and race on accept(); a non-blocking
+    # listener lets the losers go back to select() instead of stalling.
+    server.socket.setblocking(False)
+    # pid -> (worker index, start time)
+    children: Dict[int, Tuple[int, float]] = {}
+
+    def spawn(index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # Each worker has its own registry; label it so scrapes never mix processes.
+            REGISTRY.set_constant_labels(worker=str(index))
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children[pid] = (index, time.monotonic())
+
+    def stop(signum: int, frame: Any) -> None:
+        raise KeyboardInterrupt
+
+    # SIGTERM stops the whole pool instead of orphaning the workers.
+    signal.signal(signal.SIGTERM, stop)
+    for index in range(workers):
+        spawn(index)
+
+    try:
+        # Replace every worker that exits, so a crash never shrinks the pool.
+        while True:
+            pid, status = os.wait()
+            if pid not in children:
+                continue
+            index, started = children.pop(pid)
+            print(f"Worker {index} (pid {pid}) exited with status {status}; restarting it")
+            if time.monotonic() - started < 1.0:
+                # Do not spin when a worker dies right after starting.
+                time.sleep(1.0)
+            spawn(index)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        server.server_close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Dependency-free integrity signals API")
+    parser.add_argument("--host", default=os.environ.get("SIMPLE_API_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.environ.get("SIMPLE_API_PORT", "8000")),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.environ.get("SIMPLE_API_WORKERS", "1")),
+        help="Number of pre-forked worker processes sharing the listening socket",
+    )
+    return parser
+
+
+def _recover() -> None:
+    summary = recover_storage(DATA_PATH)
+    if summary.quarantined:
+        print(f"Unreadable signals file moved to {summary.quarantined}")
+    if summary.replayed or summary.torn_bytes:
+        print(
+            f"Recovered {summary.replayed} signal(s) from the write-ahead log"
+            f" (dropped {summary.torn_bytes} torn byte(s))"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    global STATS_CACHE
+
+    args = build_parser().parse_args(argv)
+    if args.workers > 1 and not hasattr(os, "fork"):
+        raise SystemExit("--workers > 1 requires a platform with os.fork().")
+
+    _recover()
+    STATS_CACHE = SharedStatsCache(("day", "week", "month"))
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving on http://{args.host}:{args.port} ({args.workers} worker(s))")
+    print(
+        "Endpoints: GET /health, GET /signal-types, POST /signals, "
+        "GET /stats?window=day|week|month|hour|<N>min[&tz=][&distinct=][&eventId=], "
+        "GET /stats/partial, GET /charts/{name}.png|svg, GET /metrics"
+    )
+    if args.workers > 1:
+        _serve_prefork(server, args.workers)
+    else:
+        server.serve_forever()
 
 
 if __name__ == "__main__":
     main()
-